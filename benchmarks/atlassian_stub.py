@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Jira and Bitbucket REST endpoints used by lambda_handler
+Serves synthetic data over keep-alive HTTP/1.1 so benchmarks run offline
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import socket
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, urlencode
+
+WORKSPACE = "bench"
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def load_fixture(name):
+    """Recorded API object from benchmarks/fixtures/<name>.json"""
+    with open(os.path.join(FIXTURES_DIR, f"{name}.json")) as f:
+        return json.load(f)
+
+def overlay(target, item):
+    for key, value in item.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            overlay(target[key], value)
+        else:
+            target[key] = value
+    return target
+
+def dress(template, item):
+    """Deep-merge a synthetic item over a recorded object so it carries the full upstream shape.
+
+    template may be the object or its JSON text; decoding the text is ~4x
+    faster than deep-copying the object, which matters for every served page.
+    """
+    return overlay(json.loads(template) if isinstance(template, str) else copy.deepcopy(template), item)
+
+QUERY_TOKEN = re.compile(r'\s*(\(|\)|"(?:[^"\\]|\\.)*"|[^\s()"]+)')
+
+def lookup(item, path):
+    for part in path.split("."):
+        item = item.get(part) if isinstance(item, dict) else None
+    return item
+
+def compare(actual, op, expected):
+    if op in ("~", "!~"):
+        found = expected.lower() in str(actual or "").lower()
+        return found if op == "~" else not found
+    if isinstance(actual, str) and re.match(r"\d{4}-\d{2}-\d{2}", expected):
+        actual, expected = [datetime.fromisoformat(v.replace("Z", "+00:00")).replace(tzinfo=None) for v in (actual, expected)]
+    return {"=": actual == expected, "!=": actual != expected, ">": actual > expected,
+            ">=": actual >= expected, "<": actual < expected, "<=": actual <= expected}[op]
+
+def query_filter(q):
+    """Compile the subset of Bitbucket's q= language the tools emit (AND / OR / parens,
+    = != ~ !~ > >= < <=) into a predicate; raises ValueError on anything else"""
+    tokens = QUERY_TOKEN.findall(q)
+    position = [0]
+
+    def take():
+        if position[0] >= len(tokens):
+            raise ValueError("unexpected end of query")
+        position[0] += 1
+        return tokens[position[0] - 1]
+
+    def peek():
+        return tokens[position[0]] if position[0] < len(tokens) else None
+
+    def factor():
+        token = take()
+        if token == "(":
+            node = expression()
+            if take() != ")":
+                raise ValueError("expected )")
+            return node
+        field, op, value = token, take(), take()
+        if op not in ("=", "!=", "~", "!~", ">", ">=", "<", "<="):
+            raise ValueError(f"unknown operator {op}")
+        value = json.loads(value) if value.startswith('"') else value
+        return lambda item: compare(lookup(item, field), op, value)
+
+    def conjunction():
+        nodes = [factor()]
+        while peek() == "AND":
+            take()
+            nodes.append(factor())
+        return lambda item: all(node(item) for node in nodes)
+
+    def expression():
+        nodes = [conjunction()]
+        while peek() == "OR":
+            take()
+            nodes.append(conjunction())
+        return lambda item: any(node(item) for node in nodes)
+
+    predicate = expression()
+    if peek() is not None:
+        raise ValueError(f"unexpected {peek()}")
+    return predicate
+
+def project(value, paths):
+    """Apply Bitbucket partial-response paths (e.g. values.author.display_name) to a payload"""
+    if isinstance(value, list):
+        return [project(item, paths) for item in value]
+    if not isinstance(value, dict):
+        return value
+    nested = {}
+    for path in paths:
+        head, _, rest = path.partition(".")
+        nested.setdefault(head, []).append(rest)
+    projected = {}
+    for head, rests in nested.items():
+        if head in value:
+            projected[head] = value[head] if "" in rests else project(value[head], rests)
+    return projected
+
+class GeneratedItems:
+    """Per-repository item lists built on first use and kept in a small LRU,
+    so workspaces of hundreds of repositories start instantly and stay small"""
+
+    def __init__(self, names, build, cache_size=64):
+        self.names = set(names)
+        self.build = build
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __contains__(self, repo):
+        return repo in self.names
+
+    def __getitem__(self, repo):
+        if repo not in self.names:
+            raise KeyError(repo)
+        with self.lock:
+            if repo in self.cache:
+                self.cache.move_to_end(repo)
+                return self.cache[repo]
+        items = self.build(repo)
+        with self.lock:
+            self.cache[repo] = items
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return items
+
+class StubState:
+    """Synthetic workspace contents, simulated latency / rate limits, and request counters"""
+
+    def __init__(self, repos=5, prs_per_repo=20, commits_per_repo=30, issues=50, latency=0.0, jitter=0.0, etags=True,
+                 throttle_every=0, retry_after="1", rate_limit=0, fixtures=False, query_filters=True, seed=1,
+                 description_chars=0, write_delay=0.0):
+        self.latency = latency
+        # Extra seconds before a POST is applied, e.g. to outlast the caller's deadline
+        self.write_delay = write_delay
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.rate_limit = rate_limit
+        self.window = (0, 0)  # (second, requests served in it)
+        self.query_filters = query_filters
+        self.fixtures = fixtures
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.throttled = 0
+        self.etags = etags
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self.issues = issues
+        # Filler padding issue / PR descriptions to description_chars, with a Jira key at the very end
+        self.padding = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * (description_chars // 57 + 1))[:description_chars]
+        self.created_issues = []  # issues POSTed to issue / issue/bulk, searchable by label
+        self.requests = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.repos = [f"repo-{i}" for i in range(repos)]
+        self.repositories = [
+            {"name": repo, "slug": repo, "full_name": f"{WORKSPACE}/{repo}", "language": "python", "is_private": True, "description": ""}
+            for repo in self.repos
+        ]
+        self.issue_template = None
+        self.templates = {}
+        if fixtures:
+            # Pad every served object out to its recorded size and shape (links, rendered text, custom fields ...)
+            self.issue_template = json.dumps(load_fixture("jira_issue"))
+            self.repositories = [dress(load_fixture("bitbucket_repository"), repo) for repo in self.repositories]
+            self.templates = {kind: json.dumps(load_fixture(f"bitbucket_{kind}")) for kind in ("pullrequest", "commit", "branch")}
+
+        self.prs = GeneratedItems(self.repos, lambda repo: [
+            {
+                "id": n + 1,
+                "title": f"PROJ-{n + 1} change {n + 1} in {repo}",
+                "description": f"Implements PROJ-{n + 1}" + (f"\n\n{self.padding} PROJ-{n + 2}" if self.padding else ""),
+                "state": "OPEN",
+                "author": {"display_name": "Bench User"},
+                "source": {"branch": {"name": f"feature/PROJ-{n + 1}"}},
+                "destination": {"branch": {"name": "main"}},
+                "updated_on": (datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(hours=n)).isoformat()
+            }
+            for n in range(prs_per_repo)
+        ])
+        self.commits = GeneratedItems(self.repos, lambda repo: [
+            {
+                "hash": f"{self.repos.index(repo):08x}{n:032x}",
+                "message": f"PROJ-{n + 1}: commit {n} in {repo}\n\nDetails",
+                "date": "2024-01-01T00:00:00+00:00",
+                "author": {"user": {"display_name": "Bench User"}}
+            }
+            for n in range(commits_per_repo)
+        ])
+        self.branches = GeneratedItems(self.repos, lambda repo: [
+            {"name": name, "target": {"date": "2024-01-01T00:00:00+00:00"}}
+            for name in ["main", "develop", "feature/PROJ-1-login", "bugfix/PROJ-2"]
+        ])
+
+    def delay(self):
+        """Simulated server time for one request: fixed latency plus uniform jitter"""
+        if not (self.latency or self.jitter):
+            return 0.0
+        with self.lock:
+            return self.latency + self.random.uniform(0, self.jitter)
+
+    def admit(self):
+        """Count a request against the per-second rate limit; returns (allowed, remaining, reset epoch)"""
+        now = time.time()
+        second = math.floor(now)
+        with self.lock:
+            self.requests += 1
+            if self.throttle_every and self.requests % self.throttle_every == 0:
+                self.throttled += 1
+                return False, None, None
+            if not self.rate_limit:
+                return True, None, None
+            window, served = self.window
+            if window != second:
+                window, served = second, 0
+            if served >= self.rate_limit:
+                self.throttled += 1
+                return False, 0, second + 1
+            self.window = (window, served + 1)
+            return True, self.rate_limit - served - 1, second + 1
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Routes the subset of Jira / Bitbucket endpoints that make_request uses"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; avoid Nagle / delayed-ACK stalls
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.state.lock:
+            self.server.state.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, limits=None):
+        state = self.server.state
+        body = json.dumps(payload).encode()
+        etag = None
+        if state.etags and self.command == "GET" and status == 200:
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()
+            if self.headers.get("If-None-Match") == etag:
+                with state.lock:
+                    state.not_modified += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        if limits and limits[0] is not None:
+            self.send_header("X-RateLimit-Limit", str(state.rate_limit))
+            self.send_header("X-RateLimit-Remaining", str(limits[0]))
+            self.send_header("X-RateLimit-Reset", str(limits[1]))
+        self.end_headers()
+        # Counted before the write so the client never sees a response that is not yet tallied
+        with state.lock:
+            state.bytes_sent += len(body)
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # Client gave up (e.g. its invocation deadline passed)
+            self.close_connection = True
+
+    def throttle(self):
+        """Apply simulated latency and answer 429 when over the rate limit; returns (throttled, limit headers)"""
+        state = self.server.state
+        allowed, remaining, reset_at = state.admit()
+        delay = state.delay()
+        if delay:
+            time.sleep(delay)
+        if allowed:
+            return False, (remaining, reset_at)
+        self.send_response(429)
+        if reset_at is None:
+            self.send_header("Retry-After", state.retry_after)
+        else:
+            self.send_header("Retry-After", f"{max(0.0, reset_at - time.time()):.3f}")
+            self.send_header("X-RateLimit-Limit", str(state.rate_limit))
+            self.send_header("X-RateLimit-Remaining", "0")
+            self.send_header("X-RateLimit-Reset", str(reset_at))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        return True, None
+
+    def do_GET(self):
+        throttled, limits = self.throttle()
+        if throttled:
+            return
+
+        parsed = urlparse(self.path)
+        parts = [p for p in parsed.path.split("/") if p]
+
+        if parts[:3] == ["rest", "api", "2"]:
+            self.send_json(*self.route_jira(parts[3:], parse_qs(parsed.query)), limits)
+        elif parts[:1] == ["2.0"]:
+            self.send_json(*self.route_bitbucket(parts[1:], parse_qs(parsed.query)), limits)
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        throttled, limits = self.throttle()
+        if throttled:
+            return
+        if self.server.state.write_delay:
+            time.sleep(self.server.state.write_delay)
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            body = {}
+
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        if parts[:3] == ["rest", "api", "2"]:
+            self.send_json(*self.create_jira(parts[3:], body), limits)
+        elif parts[:1] == ["2.0"]:
+            self.send_json(*self.create_bitbucket(parts[1:], body), limits)
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def create_issue(self, fields):
+        """Store one issue; returns (created issue, None) or (None, Jira error collection)"""
+        errors = {}
+        if not (fields.get("project") or {}).get("key"):
+            errors["project"] = "project is required"
+        if not fields.get("summary"):
+            errors["summary"] = "You must specify a summary of the issue."
+        if (fields.get("issuetype") or {}).get("name") == "Invalid":
+            errors["issuetype"] = "valid issue type is required"
+        if errors:
+            return None, {"errorMessages": [], "errors": errors}
+        state = self.server.state
+        with state.lock:
+            number = state.issues + len(state.created_issues) + 1
+            issue = {"id": str(10000 + number), "key": f"{fields['project']['key']}-{number}", "fields": dict(fields)}
+            state.created_issues.append(issue)
+        return {"id": issue["id"], "key": issue["key"], "self": f"{self.server.base_url}/rest/api/2/issue/{issue['id']}"}, None
+
+    def create_jira(self, parts, body):
+        if parts == ["issue"]:
+            created, errors = self.create_issue(body.get("fields") or {})
+            return (201, created) if created else (400, errors)
+        if parts == ["issue", "bulk"]:
+            # Created issues in order, plus the position of every rejected element
+            issues, errors = [], []
+            for position, update in enumerate(body.get("issueUpdates") or []):
+                created, element_errors = self.create_issue(update.get("fields") or {})
+                if created:
+                    issues.append(created)
+                else:
+                    errors.append({"status": 400, "elementErrors": element_errors, "failedElementNumber": position})
+            return (201 if issues else 400), {"issues": issues, "errors": errors}
+        return 404, {"errorMessages": ["not found"]}
+
+    def create_bitbucket(self, parts, body):
+        state = self.server.state
+        if len(parts) == 4 and parts[0] == "repositories" and parts[3] == "pullrequests":
+            repo = parts[2]
+            if repo not in state.prs:
+                return 404, {"type": "error", "error": {"message": "Repository not found"}}
+            source = ((body.get("source") or {}).get("branch") or {}).get("name")
+            destination = ((body.get("destination") or {}).get("branch") or {}).get("name") or "main"
+            if not body.get("title") or not source or source == destination:
+                return 400, {"type": "error", "error": {"message": "source and destination must be different branches"}}
+            prs = state.prs[repo]  # created PRs live as long as the repository's generated list stays cached
+            with state.lock:
+                pr = {
+                    "id": max((existing["id"] for existing in prs), default=0) + 1,
+                    "title": body["title"],
+                    "description": body.get("description", ""),
+                    "state": "OPEN",
+                    "author": {"display_name": "Bench User"},
+                    "source": {"branch": {"name": source}},
+                    "destination": {"branch": {"name": destination}},
+                    "updated_on": datetime.now(timezone.utc).isoformat()
+                }
+                prs.append(pr)
+            return 201, pr
+        return 404, {"type": "error", "error": {"message": "not found"}}
+
+    do_PUT = do_POST
+
+    def route_jira(self, parts, query):
+        if parts == ["search"] and "labels" in query.get("jql", [""])[0]:
+            # `labels in ("a", "b")` lookups are answered from the issues created through this stub
+            wanted = set(re.findall(r'"([^"]*)"', query["jql"][0]))
+            state = self.server.state
+            with state.lock:
+                issues = [self.jira_issue(json.loads(json.dumps(issue)), query)
+                          for issue in state.created_issues if wanted & set(issue["fields"].get("labels") or ())]
+            return 200, {"startAt": 0, "maxResults": len(issues), "total": len(issues), "issues": issues}
+        if parts == ["search"]:
+            start_at = int(query.get("startAt", ["0"])[0])
+            max_results = min(int(query.get("maxResults", ["50"])[0]), 100)
+            total = self.server.state.issues
+            padding = self.server.state.padding
+            issues = [
+                self.jira_issue({
+                    "key": f"PROJ-{n + 1}",
+                    "fields": {
+                        "summary": f"Issue {n + 1}",
+                        "status": {"name": "To Do"},
+                        "assignee": None,
+                        "description": f"See {WORKSPACE}/repo-{n % 5}" + (f"\n\n{padding} {WORKSPACE}/repo-{(n + 1) % 5}" if padding else "")
+                    }
+                }, query)
+                for n in range(start_at, min(start_at + max_results, total))
+            ]
+            return 200, {"startAt": start_at, "maxResults": max_results, "total": total, "issues": issues}
+        if len(parts) == 2 and parts[0] == "issue":
+            return 200, self.jira_issue({"key": parts[1], "fields": {
+                "summary": f"Summary of {parts[1]}", "description": "", "status": {"name": "In Progress"}, "assignee": None
+            }}, query)
+        return 404, {"errorMessages": ["not found"]}
+
+    def jira_issue(self, issue, query):
+        """Dress an issue as a recorded one and apply a Jira `fields=` list"""
+        template = self.server.state.issue_template
+        if template:
+            issue = dress(template, issue)
+        if "fields" in query:
+            wanted = set(query["fields"][0].split(","))
+            if "*all" not in wanted:
+                issue["fields"] = {name: value for name, value in issue["fields"].items() if name in wanted}
+        return issue
+
+    def paginate(self, values, query, kind=None):
+        """Slice a Bitbucket-style page and attach a `next` link when more remain.
+
+        Synthetic items are dressed with the recorded `kind` fixture only once
+        they are on the served page, so filtering stays cheap at large volumes.
+        """
+        pagelen = int(query.get("pagelen", ["10"])[0])
+        page = int(query.get("page", ["1"])[0])
+        start = (page - 1) * pagelen
+        served = values[start:start + pagelen]
+        template = self.server.state.templates.get(kind)
+        if template:
+            served = [dress(template, item) for item in served]
+        payload = {"pagelen": pagelen, "page": page, "size": len(values), "values": served}
+        if start + pagelen < len(values):
+            query = dict(query, page=[str(page + 1)])
+            payload["next"] = f"{self.server.base_url}{urlparse(self.path).path}?{urlencode(query, doseq=True)}"
+        if "fields" in query:
+            payload = project(payload, query["fields"][0].split(","))
+        return payload
+
+    def route_bitbucket(self, parts, query):
+        state = self.server.state
+        if len(parts) == 2 and parts[0] == "repositories":
+            return 200, self.paginate(state.repositories, query)
+        if len(parts) >= 4 and parts[0] == "repositories":
+            repo = parts[2]
+            if repo not in state.prs:
+                return 404, {"type": "error", "error": {"message": "Repository not found"}}
+            if parts[3] == "pullrequests":
+                states = query.get("state", ["OPEN"])
+                values = [pr for pr in state.prs[repo] if pr["state"] in states]
+                if "q" in query:
+                    if not state.query_filters:
+                        return 400, {"type": "error", "error": {"message": "q= filtering is not supported"}}
+                    try:
+                        predicate = query_filter(query["q"][0])
+                    except ValueError as e:
+                        return 400, {"type": "error", "error": {"message": f"Invalid query: {e}"}}
+                    values = [pr for pr in values if predicate(pr)]
+                return 200, self.paginate(values, query, "pullrequest")
+            if parts[3:5] == ["refs", "branches"]:
+                return 200, self.paginate(state.branches[repo], query, "branch")
+            if parts[3] == "commits":
+                return 200, self.paginate(state.commits[repo], query, "commit")
+        return 404, {"type": "error", "error": {"message": "not found"}}
+
+def start_stub(port=0, **options):
+    """Start the stub server on localhost (a free port by default); returns (server, base_url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.state = StubState(**options)
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, server.base_url
+
+def configure_environment(base_url, environ):
+    """Point lambda_handler's configuration at the stub (call before importing it)"""
+    environ.update({
+        "JIRA_URL": base_url,
+        "JIRA_EMAIL": "bench@example.com",
+        "JIRA_API_TOKEN": "bench-token",
+        "BITBUCKET_WORKSPACE": WORKSPACE,
+        "BITBUCKET_USERNAME": "bench",
+        "BITBUCKET_APP_PASSWORD": "bench-password",
+        "BITBUCKET_API_URL": f"{base_url}/2.0"
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--repos", type=int, default=5)
+    parser.add_argument("--prs", type=int, default=20, help="Pull requests per repository")
+    parser.add_argument("--commits", type=int, default=30, help="Commits per repository")
+    parser.add_argument("--issues", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra seconds per response")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests per second before answering 429")
+    parser.add_argument("--fixtures", action="store_true", help="Serve recorded-shape objects")
+    parser.add_argument("--description-chars", type=int, default=0, help="Pad issue and PR descriptions to this length")
+    args = parser.parse_args()
+
+    server, url = start_stub(port=args.port, repos=args.repos, prs_per_repo=args.prs, commits_per_repo=args.commits,
+                             issues=args.issues, latency=args.latency, jitter=args.jitter,
+                             rate_limit=args.rate_limit, fixtures=args.fixtures, description_chars=args.description_chars)
+    print(f"Atlassian stub listening on {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold-start cost of lambda_handler per HTTP_CLIENT
+Measures `python -X importtime` for `import lambda_handler` and the init path
+of a fresh process (import, first list_tools, first upstream tool call against
+the stub). Exits non-zero when the median import exceeds --max-import-ms, so it
+can guard against import-time regressions
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from atlassian_stub import start_stub, configure_environment
+
+# Runs in a fresh interpreter; times each init step the first invocation of a cold container goes through
+INIT_SCRIPT = r"""
+import json, sys, time
+started = time.perf_counter()
+import lambda_handler
+imported = time.perf_counter()
+lambda_handler.METRICS_LOG_ENABLED = False
+lambda_handler.lambda_handler({"action": "list_tools"}, None)
+listed = time.perf_counter()
+response = lambda_handler.lambda_handler({"action": "call_tool", "tool_name": "list_branches", "arguments": {"repo_name": "repo-0"}}, None)
+called = time.perf_counter()
+assert json.loads(response["body"])["result"].startswith("Found"), response
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "list_tools_ms": (listed - imported) * 1000,
+    "first_call_ms": (called - listed) * 1000,
+    "modules": len(sys.modules)
+}))
+"""
+
+def import_profile(env):
+    """(cumulative µs of `import lambda_handler`, [(self µs, module)] imported on its behalf)"""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "import lambda_handler"],
+                               env=env, capture_output=True, text=True, check=True)
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(own), int(cumulative), name))
+    # importtime prints children before their parent; lambda_handler's subtree is what follows the site imports
+    total = next(cumulative for _, cumulative, name in rows if name.strip() == "lambda_handler")
+    start = max(index for index, (_, _, name) in enumerate(rows) if name.strip() in ("site", "usercustomize", "sitecustomize")) + 1
+    return total, [(own, name.strip()) for own, _, name in rows[start:]]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=15, help="Fresh interpreters per measurement")
+    parser.add_argument("--clients", default="requests,pooled", help="HTTP_CLIENT values to measure")
+    parser.add_argument("--top", type=int, default=8, help="Slowest imported modules to list")
+    parser.add_argument("--max-import-ms", type=float, help="Fail when the median import of any client exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print the measurements as JSON")
+    args = parser.parse_args()
+
+    server, base_url = start_stub(repos=1)
+    env = dict(os.environ)
+    configure_environment(base_url, env)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_DIR, env.get("PYTHONPATH")]))
+
+    report = {}
+    for client in [name.strip() for name in args.clients.split(",") if name.strip()]:
+        env["HTTP_CLIENT"] = client
+        totals, steps, walls = [], [], []
+        slowest = {}
+        for _ in range(args.runs):
+            total, modules = import_profile(env)
+            totals.append(total / 1000)
+            for own, name in modules:
+                slowest[name] = slowest.get(name, 0) + own / args.runs
+            started = time.perf_counter()
+            completed = subprocess.run([sys.executable, "-c", INIT_SCRIPT], env=env, capture_output=True, text=True)
+            walls.append((time.perf_counter() - started) * 1000)
+            if completed.returncode != 0:
+                raise RuntimeError(f"{client} init failed:\n{completed.stderr}")
+            steps.append(json.loads(completed.stdout))
+
+        report[client] = {
+            "importtime_ms": round(statistics.median(totals), 2),
+            "import_ms": round(statistics.median(step["import_ms"] for step in steps), 2),
+            "list_tools_ms": round(statistics.median(step["list_tools_ms"] for step in steps), 2),
+            "first_call_ms": round(statistics.median(step["first_call_ms"] for step in steps), 2),
+            "process_ms": round(statistics.median(walls), 2),
+            "modules": steps[0]["modules"],
+            "slowest_imports": [
+                {"module": name, "self_ms": round(own / 1000, 2)}
+                for name, own in sorted(slowest.items(), key=lambda item: -item[1])[:args.top]
+            ]
+        }
+    server.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"median of {args.runs} fresh interpreters\n")
+        print(f"{'HTTP_CLIENT':<12} {'importtime':>11} {'import':>9} {'list_tools':>11} {'first call':>11} {'process':>9} {'modules':>8}")
+        for client, row in report.items():
+            print(f"{client:<12} {row['importtime_ms']:8.1f} ms {row['import_ms']:6.1f} ms {row['list_tools_ms']:8.2f} ms "
+                  f"{row['first_call_ms']:8.1f} ms {row['process_ms']:6.1f} ms {row['modules']:8d}")
+        for client, row in report.items():
+            print(f"\nslowest imports under lambda_handler ({client}):")
+            for entry in row["slowest_imports"]:
+                print(f"  {entry['self_ms']:7.2f} ms  {entry['module']}")
+
+    if args.max_import_ms is not None:
+        over = {client: row["importtime_ms"] for client, row in report.items() if row["importtime_ms"] > args.max_import_ms}
+        if over:
+            print(f"\n❌ import lambda_handler exceeds {args.max_import_ms} ms: {over}")
+            sys.exit(1)
+        print(f"\n✅ import lambda_handler within {args.max_import_ms} ms")
+
+if __name__ == "__main__":
+    main()
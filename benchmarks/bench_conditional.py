@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full re-download vs ETag revalidation of expired cache entries
+Lists a large PR set repeatedly against the ETag-emitting stub and checks that
+every revalidation after the first round is answered with 304 Not Modified
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from atlassian_stub import start_stub, configure_environment
+from handler_harness import prepare
+
+def run(label, lambda_handler, server, rounds, limit):
+    sent = server.state.bytes_sent
+    requests = server.state.requests
+    outputs = set()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        outputs.add(lambda_handler.list_pull_requests("repo-0", "OPEN", limit))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<26} {elapsed * 1000 / rounds:8.2f} ms/call   "
+          f"{(server.state.bytes_sent - sent) / 1024:9.1f} KiB sent   "
+          f"{server.state.requests - requests:4d} upstream requests")
+    return outputs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--prs", type=int, default=500, help="Pull requests in the listed repository")
+    args = parser.parse_args()
+
+    server, base_url = start_stub(repos=1, prs_per_repo=args.prs)
+    configure_environment(base_url, os.environ)
+
+    import lambda_handler
+
+    # Measure transfer and revalidation, not the rate limiter
+    prepare(lambda_handler)
+
+    # Expire every entry immediately so each call has to go back upstream
+    lambda_handler.CACHE_TTLS = []
+    lambda_handler.CACHE_DEFAULT_TTL = 1e-6
+    pages = -(-args.prs // lambda_handler.BITBUCKET_PR_MAX_PAGELEN)
+
+    print(f"{args.rounds} x list_pull_requests(limit={args.prs}) = {pages} pages per call\n")
+
+    lambda_handler.CACHE_ENABLED = False
+    baseline = run("before (full download)", lambda_handler, server, args.rounds, args.prs)
+
+    lambda_handler.CACHE_ENABLED = True
+    not_modified = server.state.not_modified
+    conditional = run("after (If-None-Match)", lambda_handler, server, args.rounds, args.prs)
+
+    stats = lambda_handler.response_cache.stats()
+    print(f"\n304 rate {stats['not_modified_rate']:.1%}   bytes saved {stats['bytes_saved'] / 1024:.1f} KiB")
+
+    # Correctness checks: same rendering, and every revalidation after round one is a 304
+    assert baseline == conditional and len(conditional) == 1, "conditional responses changed tool output"
+    assert server.state.not_modified - not_modified == pages * (args.rounds - 1), "expected a 304 for every revalidated page"
+    assert stats["not_modified"] == pages * (args.rounds - 1)
+    print("✅ ETag revalidation checks passed")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
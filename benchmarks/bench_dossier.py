@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: get_issue_dossier vs. the serial tool chain it replaces
+For each issue key, an agent would call search_jira_issues,
+search_cross_references, then list_branches and get_commits per repository,
+one invocation at a time. Runs that chain and one get_issue_dossier call
+against the stub (cold cache each time) and checks both find the same PRs,
+branches and commits
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from atlassian_stub import start_stub, configure_environment
+from handler_harness import prepare, call
+
+def rows(listing):
+    """Records of a columnar json listing"""
+    return [dict(listing.get("shared", {}), **dict(zip(listing["columns"], row))) for row in listing["rows"]]
+
+def serial_chain(lambda_handler, keys, repos):
+    """What the agent finds with one tool call per step: {key: (prs, branches, commits)}, invocations"""
+    found = {}
+    invocations = 0
+    branches = {}
+    commits = {}
+    for key in keys:
+        call(lambda_handler, "search_jira_issues", {"jql": f"key = {key}", "max_results": 1, "output_format": "json"})
+        references = json.loads(call(lambda_handler, "search_cross_references", {"jira_issue_key": key, "state": "ALL", "output_format": "json"}))
+        invocations += 2
+        for repo in repos:
+            if repo not in branches:
+                branches[repo] = rows(json.loads(call(lambda_handler, "list_branches", {"repo_name": repo, "limit": 100, "output_format": "json"})))
+                commits[repo] = rows(json.loads(call(lambda_handler, "get_commits", {"repo_name": repo, "limit": 100, "output_format": "json"})))
+                invocations += 2
+        mentions = re.compile(rf"\b{re.escape(key)}\b")
+        found[key] = (
+            sorted((pr["repo"], pr["id"]) for pr in references.get("pull_requests", [])),
+            sorted((repo, branch["name"]) for repo in repos for branch in branches[repo] if mentions.search(branch["name"])),
+            sorted((repo, commit["hash"]) for repo in repos for commit in commits[repo] if mentions.search(commit["message"]))
+        )
+    return found, invocations
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=3, help="Issue keys per dossier")
+    parser.add_argument("--repos", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=40.0, help="Milliseconds added to every stub response")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    server, base_url = start_stub(repos=args.repos, prs_per_repo=40, commits_per_repo=60, latency=args.latency / 1000)
+    configure_environment(base_url, os.environ)
+
+    import lambda_handler
+
+    prepare(lambda_handler)
+
+    keys = [f"PROJ-{n + 1}" for n in range(args.keys)]
+    repos = [f"repo-{n}" for n in range(args.repos)]
+
+    serial_times, dossier_times = [], []
+    for _ in range(args.rounds):
+        lambda_handler.response_cache.clear()
+        before = server.state.requests
+        started = time.perf_counter()
+        expected, invocations = serial_chain(lambda_handler, keys, repos)
+        serial_times.append(time.perf_counter() - started)
+        serial_requests = server.state.requests - before
+
+        lambda_handler.response_cache.clear()
+        before = server.state.requests
+        started = time.perf_counter()
+        dossier = json.loads(call(lambda_handler, "get_issue_dossier", {"jira_issue_keys": keys, "output_format": "json"}))
+        dossier_times.append(time.perf_counter() - started)
+        dossier_requests = server.state.requests - before
+
+        for issue in dossier["issues"]:
+            found = (
+                sorted((pr["repo"], pr["id"]) for pr in issue.get("pull_requests", [])),
+                sorted((branch["repo"], branch["name"]) for branch in issue.get("branches", [])),
+                sorted((commit["repo"], commit["hash"]) for commit in issue.get("commits", []))
+            )
+            assert found == expected[issue["issue_key"]], f"{issue['issue_key']}: dossier {found} != serial chain {expected[issue['issue_key']]}"
+
+    serial_ms, dossier_ms = min(serial_times) * 1000, min(dossier_times) * 1000
+    print(f"{len(keys)} issue keys x {len(repos)} repositories, {args.latency:.0f} ms stub latency, best of {args.rounds}\n")
+    print(f"{'approach':<18} {'invocations':>11} {'upstream':>9} {'wall ms':>9}")
+    print(f"{'serial tool chain':<18} {invocations:11d} {serial_requests:9d} {serial_ms:9.1f}")
+    print(f"{'get_issue_dossier':<18} {1:11d} {dossier_requests:9d} {dossier_ms:9.1f}")
+    print(f"\n✅ Same PRs, branches and commits in one invocation, {serial_ms / dossier_ms:.1f}x faster")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
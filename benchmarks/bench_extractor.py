@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: legacy per-call re.findall extractors vs the single-pass scan_references
+Runs over a synthetic corpus of commit messages and PR / issue descriptions
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import lambda_handler
+
+WORDS = ("fix", "update", "refactor", "login", "payment", "retry", "cache", "timeout", "handler",
+         "well-known", "end-to-end", "follow-up", "re-run", "user", "api", "tests", "config")
+REPOS = [f"service-{n}" for n in range(40)]
+# Keys joined to a slug or path, which the repo alternative matches as one token
+KEY_REGRESSIONS = [
+    "Merged in user/ABC-9 (pull request #3)",
+    "refs/heads/PROJ-1 merged",
+    "jdoe/PROJ-42-login",
+    "pre-PROJ-7 done",
+    "api-ABC-12",
+]
+
+def legacy_extract_jira_references(text):
+    if not text:
+        return []
+    pattern = r'\b[A-Z]{2,10}-\d+\b'
+    return list(set(re.findall(pattern, text)))
+
+def legacy_extract_bitbucket_references(text):
+    if not text:
+        return []
+    pattern = r'\b(?:[\w-]+/)?[\w-]+(?:\.git)?\b'
+    matches = re.findall(pattern, text)
+    return [m for m in matches if '-' in m or '/' in m]
+
+def make_corpus(size, seed=7):
+    rng = random.Random(seed)
+    corpus = []
+    for n in range(size):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 40))]
+        if rng.random() < 0.6:
+            words.insert(0, f"PROJ-{rng.randint(1, 5000)}:")
+        if rng.random() < 0.3:
+            words.append(f"see feature/OPS-{rng.randint(1, 900)}-{rng.choice(WORDS)}")
+        if rng.random() < 0.3:
+            words.append(f"in acme/{rng.choice(REPOS)}")
+        if rng.random() < 0.2:
+            words.append(f"{rng.choice(WORDS)}/{rng.choice(['ABC', 'OPS'])}-{rng.randint(1, 900)}")
+        if rng.random() < 0.1:
+            words.append(f"https://bitbucket.org/acme/{rng.choice(REPOS)}/pull-requests/{n}")
+        corpus.append(" ".join(words) + ("\n\n" + " ".join(rng.choice(WORDS) for _ in range(30)) if n % 3 == 0 else ""))
+    return corpus
+
+def timed(label, fn, corpus, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        found = fn(corpus)
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<34} {best * 1000:8.2f} ms   {len(corpus) / best:>10.0f} texts/s   {found:6d} repo refs")
+    return best
+
+def legacy(corpus):
+    repo_refs = 0
+    for text in corpus:
+        legacy_extract_jira_references(text)
+        repo_refs += len(legacy_extract_bitbucket_references(text))
+    return repo_refs
+
+def legacy_all_kinds(corpus):
+    # Like-for-like: the legacy style also needs separate passes for branches and PR URLs
+    repo_refs = 0
+    for text in corpus:
+        legacy_extract_jira_references(text)
+        repo_refs += len(legacy_extract_bitbucket_references(text))
+        re.findall(r'\b(?:feature|bugfix|hotfix|release|fix)/[\w./-]*[\w-]', text)
+        re.findall(r'https?://bitbucket\.org/[\w.-]+/[\w.-]+/pull-requests/\d+', text)
+    return repo_refs
+
+def single_pass(corpus, known_repos=None):
+    repo_refs = 0
+    for text in corpus:
+        repo_refs += len(lambda_handler.scan_references(text, known_repos).repos)
+    return repo_refs
+
+def check_jira_keys(corpus, known_repos=None):
+    """scan_references must find exactly the keys the legacy extractor finds"""
+    for text in KEY_REGRESSIONS + corpus:
+        expected = set(legacy_extract_jira_references(text))
+        found = set(lambda_handler.scan_references(text, known_repos).jira_keys)
+        assert found == expected, f"{text!r}: expected {sorted(expected)}, got {sorted(found)}"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.texts)
+    print(f"{len(corpus)} texts, {sum(map(len, corpus)) / 1024:.0f} KiB\n")
+    lambda_handler.JIRA_PROJECT_KEYS = set()
+    check_jira_keys(corpus)
+
+    timed("legacy keys + repos (2 passes)", legacy, corpus, args.rounds)
+    before = timed("legacy all kinds (4 passes)", legacy_all_kinds, corpus, args.rounds)
+    after = timed("scan_references (unfiltered)", single_pass, corpus, args.rounds)
+    known_repos = frozenset(REPOS)
+    filtered = timed("scan_references (known repos)", lambda corpus: single_pass(corpus, known_repos), corpus, args.rounds)
+    check_jira_keys(corpus, known_repos)
+    print(f"\nspeed-up vs 4 passes: {before / after:.2f}x (unfiltered), {before / filtered:.2f}x (known repos)")
+    print("✅ Same Jira keys as the legacy extractor, with and without known repos")
+
+if __name__ == "__main__":
+    main()
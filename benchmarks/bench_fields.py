@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full upstream objects vs TOOL_FIELDS projection
+Runs each read tool against the stub serving recorded-shape fixtures
+(benchmarks/fixtures/*.json) and reports bytes received and JSON decode time
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from atlassian_stub import start_stub, configure_environment
+from handler_harness import prepare
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--items", type=int, default=100, help="Issues / PRs / commits per listing")
+    args = parser.parse_args()
+
+    server, base_url = start_stub(repos=5, prs_per_repo=args.items, commits_per_repo=args.items,
+                                  issues=args.items, fixtures=True)
+    configure_environment(base_url, os.environ)
+
+    import lambda_handler
+
+    # Every call must reach the stub
+    lambda_handler.CACHE_ENABLED = False
+    prepare(lambda_handler)
+
+    def traced(tool, arguments):
+        """(output, seconds spent decoding upstream JSON) of one call, streamed pages included"""
+        trace = lambda_handler.InvocationTrace("bench")
+        token = lambda_handler._current_trace.set(trace)
+        try:
+            output = lambda_handler.TOOL_HANDLERS[tool](arguments)
+        finally:
+            lambda_handler._current_trace.reset(token)
+        return output, sum(call.decode for call in trace.calls)
+
+    calls = [
+        ("search_jira_issues", {"jql": "project = PROJ", "max_results": args.items}),
+        ("list_bitbucket_repositories", {"limit": 5}),
+        ("list_pull_requests", {"repo_name": "repo-0", "limit": args.items}),
+        ("list_branches", {"repo_name": "repo-0"}),
+        ("get_commits", {"repo_name": "repo-0", "limit": args.items}),
+        ("search_cross_references", {"jira_issue_key": "PROJ-1"}),
+    ]
+
+    print(f"{args.rounds} rounds per tool, {args.items} items per listing\n")
+    print(f"{'tool':<28} {'full KiB':>10} {'lean KiB':>10} {'saved':>7} {'full decode':>12} {'lean decode':>12}")
+    totals = {False: [0, 0.0], True: [0, 0.0]}
+    for tool, arguments in calls:
+        row = {}
+        outputs = set()
+        for enabled in (False, True):
+            lambda_handler.FIELD_PROJECTION_ENABLED = enabled
+            sent = server.state.bytes_sent
+            decode = 0.0
+            for _ in range(args.rounds):
+                output, seconds = traced(tool, arguments)
+                outputs.add(output)
+                decode += seconds
+            row[enabled] = ((server.state.bytes_sent - sent) / args.rounds, decode / args.rounds)
+            totals[enabled][0] += row[enabled][0]
+            totals[enabled][1] += row[enabled][1]
+
+        # Projection must not change what the tool renders
+        assert len(outputs) == 1, f"{tool} output differs with field projection"
+        (full_bytes, full_decode), (lean_bytes, lean_decode) = row[False], row[True]
+        print(f"{tool:<28} {full_bytes / 1024:10.1f} {lean_bytes / 1024:10.1f} {1 - lean_bytes / full_bytes:7.1%} "
+              f"{full_decode * 1000:9.2f} ms {lean_decode * 1000:9.2f} ms")
+
+    (full_bytes, full_decode), (lean_bytes, lean_decode) = totals[False], totals[True]
+    print(f"\n{'total per round':<28} {full_bytes / 1024:10.1f} {lean_bytes / 1024:10.1f} {1 - lean_bytes / full_bytes:7.1%} "
+          f"{full_decode * 1000:9.2f} ms {lean_decode * 1000:9.2f} ms")
+    print("✅ Tool output identical with and without projection")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
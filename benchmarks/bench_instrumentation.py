@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of per-invocation tracing (EMF log line and debug _timings)
+Invokes lambda_handler against the stub with tracing off, with the EMF line,
+and with debug timings, and checks the recorded upstream calls against what
+the stub actually served
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from atlassian_stub import start_stub, configure_environment
+from handler_harness import prepare
+
+def invoke(lambda_handler, event):
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        response = lambda_handler.lambda_handler(event, None)
+    return json.loads(response["body"]), log.getvalue()
+
+def measure(lambda_handler, event, mode, rounds):
+    lambda_handler.METRICS_LOG_ENABLED = mode != "off"
+    event = dict(event, debug=mode == "debug")
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        invoke(lambda_handler, event)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5, help="Interleaved repetitions per mode")
+    args = parser.parse_args()
+
+    server, base_url = start_stub(repos=8, prs_per_repo=40, commits_per_repo=40)
+    configure_environment(base_url, os.environ)
+
+    import lambda_handler
+
+    prepare(lambda_handler)
+
+    workloads = [
+        ("list_pull_requests (cached)", True,
+         {"action": "call_tool", "tool_name": "list_pull_requests", "arguments": {"repo_name": "repo-0", "limit": 20}}),
+        ("search_cross_references (live)", False,
+         {"action": "call_tool", "tool_name": "search_cross_references", "arguments": {"jira_issue_key": "PROJ-1"}}),
+        ("call_tools x3 (live)", False,
+         {"action": "call_tools", "calls": [
+             {"tool_name": "list_branches", "arguments": {"repo_name": "repo-1"}},
+             {"tool_name": "get_commits", "arguments": {"repo_name": "repo-2", "limit": 20}},
+             {"tool_name": "search_jira_issues", "arguments": {"jql": "project = PROJ", "max_results": 20}}]}),
+    ]
+
+    print(f"median of {args.rounds} invocations, best of {args.repeats} interleaved repeats\n")
+    print(f"{'workload':<32} {'upstream':>8} {'off ms':>9} {'emf ms':>9} {'debug ms':>9} {'emf cost':>9}")
+    for label, cached, event in workloads:
+        lambda_handler.CACHE_ENABLED = cached
+        lambda_handler.response_cache.clear()
+
+        # Check the trace against the stub before timing anything
+        lambda_handler.METRICS_LOG_ENABLED = True
+        requests_before = server.state.requests
+        body, log = invoke(lambda_handler, dict(event, debug=True))
+        sent = server.state.requests - requests_before
+        timings = body["_timings"]
+        emf = json.loads(log)
+        recorded = sum(1 for call in timings["calls"] if call["cache"] not in ("hit", "coalesced"))
+        assert recorded == sent, f"{label}: trace saw {recorded} upstream requests, stub served {sent}"
+        assert emf["UpstreamCalls"] == len(timings["calls"])
+        assert all(metric["Name"] in emf for metric in emf["_aws"]["CloudWatchMetrics"][0]["Metrics"])
+        assert [tool["tool"] for tool in timings["tools"]]
+
+        best = {"off": float("inf"), "emf": float("inf"), "debug": float("inf")}
+        for _ in range(args.repeats):
+            for mode in best:
+                best[mode] = min(best[mode], measure(lambda_handler, event, mode, args.rounds))
+        print(f"{label:<32} {len(timings['calls']):8d} {best['off'] * 1000:9.3f} {best['emf'] * 1000:9.3f} "
+              f"{best['debug'] * 1000:9.3f} {(best['emf'] - best['off']) * 1e6:6.0f} µs")
+
+    # Per-call cost in isolation: a cache hit is make_request's cheapest path
+    lambda_handler.CACHE_ENABLED = True
+    endpoint = "repositories/acme/repo-0/refs/branches?pagelen=10"
+    lambda_handler.make_request("bitbucket", "GET", endpoint)
+    hits = args.rounds * 100
+    best = {False: float("inf"), True: float("inf")}
+    for _ in range(args.repeats):
+        for traced in best:
+            token = lambda_handler._current_trace.set(lambda_handler.InvocationTrace("bench") if traced else None)
+            started = time.perf_counter()
+            for _ in range(hits):
+                lambda_handler.make_request("bitbucket", "GET", endpoint)
+            best[traced] = min(best[traced], (time.perf_counter() - started) / hits)
+            lambda_handler._current_trace.reset(token)
+    print(f"\nmake_request cache hit: {best[False] * 1e6:.2f} µs untraced, {best[True] * 1e6:.2f} µs traced")
+
+    print("\n✅ Traced upstream calls match the requests the stub served")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: client-side PR scan vs q= pushdown in search_cross_references
+Reports upstream requests, bytes and PRs fetched vs. kept per planner strategy,
+and checks that every strategy (including the fallback when q= is rejected)
+finds the same pull requests
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from atlassian_stub import start_stub, configure_environment
+from handler_harness import prepare
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repos", type=int, default=10)
+    parser.add_argument("--prs", type=int, default=300, help="Pull requests per repository")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    server, base_url = start_stub(repos=args.repos, prs_per_repo=args.prs, fixtures=True)
+    configure_environment(base_url, os.environ)
+
+    import lambda_handler
+
+    lambda_handler.CACHE_ENABLED = False
+    # Measure request volume, not the production rate limits
+    prepare(lambda_handler)
+
+    # `title ~ "PROJ-7"` also matches PROJ-70..79: the residual check must drop those
+    key = "PROJ-7"
+    scenarios = [
+        ("scan (pushdown off)", False, {}),
+        ("server (q= pushdown)", True, {}),
+        ("scan + updated_since", False, {"updated_since": "2024-01-01T03:00:00Z"}),
+        ("server + updated_since", True, {"updated_since": "2024-01-01T03:00:00Z"}),
+    ]
+
+    print(f"search_cross_references({key}) over {args.repos} repos x {args.prs} PRs, {args.rounds} rounds\n")
+    print(f"{'scenario':<26} {'ms/call':>9} {'requests':>9} {'KiB':>9} {'fetched':>8} {'kept':>6}")
+    outputs = {}
+    for label, pushdown, extra in scenarios:
+        lambda_handler.PR_QUERY_PUSHDOWN = pushdown
+        lambda_handler.planner_stats = lambda_handler.PlannerStats()
+        requests_before, sent = server.state.requests, server.state.bytes_sent
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            output = lambda_handler.search_cross_references(key, **extra)
+        elapsed = time.perf_counter() - started
+        stats = lambda_handler.planner_stats.snapshot()
+        fetched = sum(counters["prs_fetched"] for counters in stats.values()) // args.rounds
+        kept = sum(counters["prs_matched"] for counters in stats.values()) // args.rounds
+        print(f"{label:<26} {elapsed * 1000 / args.rounds:9.1f} {(server.state.requests - requests_before) // args.rounds:9d} "
+              f"{(server.state.bytes_sent - sent) / 1024 / args.rounds:9.1f} {fetched:8d} {kept:6d}")
+        outputs.setdefault(bool(extra), set()).add(output.split("\n\n🔎")[0])
+
+    # A server that rejects q= must fall back to the client-side scan with the same result
+    lambda_handler.PR_QUERY_PUSHDOWN = True
+    lambda_handler.planner_stats = lambda_handler.PlannerStats()
+    server.state.query_filters = False
+    outputs[False].add(lambda_handler.search_cross_references(key).split("\n\n🔎")[0])
+    fallbacks = lambda_handler.planner_stats.snapshot()["server"]["fallbacks"]
+    print(f"\nq= rejected: {fallbacks} repositories fell back to a client-side scan")
+
+    assert all(len(found) == 1 for found in outputs.values()), "strategies disagree on matching PRs"
+    assert fallbacks == args.repos
+    print("✅ All strategies found the same pull requests")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
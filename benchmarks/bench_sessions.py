@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-call requests.get (old make_request) vs pooled keep-alive sessions
+Reports requests/sec and p50/p99 latency against the local Atlassian stub
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from atlassian_stub import start_stub, configure_environment, WORKSPACE
+from handler_harness import prepare
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def run(label, call, iterations):
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<24} {iterations / elapsed:>9.1f} req/s   "
+          f"p50 {statistics.median(samples):6.2f} ms   p99 {percentile(samples, 99):6.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated server latency in seconds")
+    args = parser.parse_args()
+
+    server, base_url = start_stub(latency=args.latency)
+    configure_environment(base_url, os.environ)
+
+    import requests
+    from requests.auth import HTTPBasicAuth
+    import lambda_handler
+
+    # Measure the connection layer only, not the response cache or the rate limiter
+    lambda_handler.CACHE_ENABLED = False
+    prepare(lambda_handler)
+
+    endpoint = f"repositories/{WORKSPACE}?pagelen=10"
+    auth = HTTPBasicAuth("bench", "bench-password")
+
+    def before():
+        # Equivalent of the original make_request: module-level requests.get per call
+        response = requests.get(f"{base_url}/2.0/{endpoint}", auth=auth)
+        response.raise_for_status()
+        return response.json()
+
+    def after():
+        return lambda_handler.make_request("bitbucket", "GET", endpoint)
+
+    print(f"{args.iterations} sequential GETs against {base_url}\n")
+    connections = server.state.connections
+    run("before (requests.get)", before, args.iterations)
+    print(f"{'':<24} {server.state.connections - connections} TCP connections opened")
+    connections = server.state.connections
+    run("after (pooled session)", after, args.iterations)
+    print(f"{'':<24} {server.state.connections - connections} TCP connections opened")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
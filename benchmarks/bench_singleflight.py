@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: request coalescing (single-flight) under concurrent load
+Fires concurrent lambda_handler invocations that start with the same GETs
+against a stub with latency, with SINGLE_FLIGHT_ENABLED off and on, and
+compares the upstream requests the stub served, wall time and outputs
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from atlassian_stub import start_stub, configure_environment
+from handler_harness import prepare
+
+def tool(name, arguments):
+    return {"action": "call_tool", "tool_name": name, "arguments": arguments}
+
+# Scenario -> event for the i-th concurrent invocation
+SCENARIOS = {
+    "same listing from every session": lambda i: tool("list_pull_requests", {"repo_name": "repo-0", "limit": 20}),
+    "cross references, distinct keys": lambda i: tool("search_cross_references", {"jira_issue_key": f"PROJ-{i + 1}"}),
+    "call_tools batches": lambda i: {"action": "call_tools", "calls": [
+        {"tool_name": "list_branches", "arguments": {"repo_name": f"repo-{i % 2}"}},
+        {"tool_name": "get_commits", "arguments": {"repo_name": "repo-0", "limit": 20}},
+        {"tool_name": "search_cross_references", "arguments": {"jira_issue_key": f"PROJ-{i + 1}"}}]},
+}
+
+def burst(lambda_handler, build, concurrency):
+    """Start concurrency invocations at once; returns (results in order, wall seconds)"""
+    results = [None] * concurrency
+    gate = threading.Barrier(concurrency + 1)
+
+    def invoke(i):
+        gate.wait()
+        response = lambda_handler.lambda_handler(build(i), None)
+        results[i] = json.loads(response["body"])
+
+    threads = [threading.Thread(target=invoke, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    gate.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=16, help="Simultaneous invocations per burst")
+    parser.add_argument("--latency", type=float, default=40.0, help="Milliseconds added to every stub response")
+    parser.add_argument("--repos", type=int, default=8)
+    parser.add_argument("--cache", action="store_true", help="Keep the response cache on (emptied before each burst)")
+    args = parser.parse_args()
+
+    server, base_url = start_stub(repos=args.repos, prs_per_repo=40, commits_per_repo=40, latency=args.latency / 1000)
+    configure_environment(base_url, os.environ)
+
+    import lambda_handler
+
+    prepare(lambda_handler)
+    lambda_handler.CACHE_ENABLED = args.cache
+
+    print(f"{args.concurrency} concurrent invocations, {args.latency:.0f} ms stub latency, cache {'on' if args.cache else 'off'}\n")
+    print(f"{'scenario':<34} {'upstream off':>12} {'upstream on':>12} {'wall off':>10} {'wall on':>10} {'coalesced':>10}")
+    for label, build in SCENARIOS.items():
+        measured = {}
+        for enabled in (False, True):
+            lambda_handler.SINGLE_FLIGHT_ENABLED = enabled
+            lambda_handler.response_cache.clear()
+            before_requests = server.state.requests
+            before_coalesced = lambda_handler.single_flight.stats()["coalesced"]
+            before_misses = lambda_handler.response_cache.stats()["misses"]
+            with contextlib.redirect_stdout(io.StringIO()):
+                results, wall = burst(lambda_handler, build, args.concurrency)
+            measured[enabled] = (results, wall, server.state.requests - before_requests,
+                                 lambda_handler.single_flight.stats()["coalesced"] - before_coalesced,
+                                 lambda_handler.response_cache.stats()["misses"] - before_misses)
+
+        (plain, plain_wall, plain_sent, _, _), (shared, shared_wall, shared_sent, coalesced, misses) = measured[False], measured[True]
+        assert plain == shared, f"{label}: coalesced results differ from independent requests"
+        assert shared_sent < plain_sent, f"{label}: coalescing did not reduce upstream requests ({shared_sent} vs {plain_sent})"
+        assert args.cache or shared_sent + coalesced == plain_sent, f"{label}: {shared_sent} sent + {coalesced} coalesced != {plain_sent}"
+        # Only requests that went upstream count as cache misses, not the callers coalesced onto them
+        assert not args.cache or misses == shared_sent, f"{label}: {misses} cache misses for {shared_sent} upstream requests"
+        print(f"{label:<34} {plain_sent:12d} {shared_sent:12d} {plain_wall * 1000:7.1f} ms {shared_wall * 1000:7.1f} ms {coalesced:10d}")
+
+    assert lambda_handler.single_flight.stats()["in_flight"] == 0
+    print(f"\nsingle_flight metrics: {json.dumps(lambda_handler.get_metrics()['single_flight'])}")
+    print("\n✅ Identical results with fewer upstream requests")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
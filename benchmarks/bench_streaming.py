@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak memory of list tools vs. response size, with and without streaming
+Serves one search_jira_issues page (100 issues) and one list_pull_requests
+page (50 PRs) whose descriptions are padded to growing lengths, and measures
+each call in a fresh interpreter with STREAM_RESPONSES off and on: peak RSS
+growth over the warmed-up process, and the tool output, which must not change
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from atlassian_stub import start_stub, configure_environment
+
+# Runs in a fresh interpreter: warm up, reset the RSS high-water mark, then make one tool call
+WORKER = r"""
+import hashlib, json, sys
+import lambda_handler
+from handler_harness import prepare, call
+
+def status(field):
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field + ":"))
+
+prepare(lambda_handler)
+call(lambda_handler, "list_branches", {"repo_name": "repo-0"})  # loads the HTTP client and JSON machinery
+tool, arguments = json.loads(sys.argv[1])
+try:
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")  # reset VmHWM to the current RSS
+except OSError:
+    pass
+baseline = status("VmRSS")
+result = call(lambda_handler, tool, arguments)
+print(json.dumps({"growth_kib": max(0, status("VmHWM") - baseline), "output": hashlib.sha256(result.encode()).hexdigest(),
+                  "preview": result[:200]}))
+"""
+
+CALLS = {
+    "search_jira_issues": {"jql": "project = PROJ", "max_results": 100},
+    "list_pull_requests": {"repo_name": "repo-0", "limit": 50},
+}
+
+def check_chunk_boundaries():
+    """stream_items must parse the same page wherever the chunks split it, numbers included"""
+    import lambda_handler
+
+    document = {"size": 12.5, "values": [1.5e10, -3, 12.25, "PROJ-1", True, None, {"a": [1, 2.5e-3]}, 0],
+                "page": 1, "next": None, "total": -0.125}
+    body = json.dumps(document).encode()
+    expected = {key: value for key, value in document.items() if key != "values"}
+    for step in (1, 7, len(body)):
+        for split in range(len(body) + 1):
+            chunks = [body[:split]] + [body[offset:offset + step] for offset in range(split, len(body), step)]
+            page = {}
+            assert list(lambda_handler.stream_items(chunks, "values", page)) == document["values"], (step, split)
+            assert page == expected, (step, split, page)
+
+def measure(env, tool, streaming):
+    env = dict(env, STREAM_RESPONSES="true" if streaming else "false")
+    completed = subprocess.run([sys.executable, "-c", WORKER, json.dumps([tool, CALLS[tool]])],
+                               env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{tool} worker failed:\n{completed.stderr}")
+    return json.loads(completed.stdout)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--description-chars", default="0,2000,20000,100000,400000",
+                        help="Comma-separated description lengths to serve")
+    parser.add_argument("--client", default="auto", help="HTTP_CLIENT for the workers")
+    parser.add_argument("--json", action="store_true", help="Print the measurements as JSON")
+    args = parser.parse_args()
+
+    check_chunk_boundaries()
+    report = []
+    for chars in [int(value) for value in args.description_chars.split(",")]:
+        server, base_url = start_stub(repos=1, prs_per_repo=50, issues=100, description_chars=chars)
+        env = dict(os.environ)
+        configure_environment(base_url, env)
+        env["HTTP_CLIENT"] = args.client
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_DIR, BENCH_DIR, env.get("PYTHONPATH")]))
+        for tool in CALLS:
+            before = server.state.bytes_sent
+            whole = measure(env, tool, streaming=False)
+            response_bytes = server.state.bytes_sent - before
+            streamed = measure(env, tool, streaming=True)
+            assert whole["output"] == streamed["output"], f"{tool} at {chars} chars: output changed\n{whole['preview']}\n{streamed['preview']}"
+            # bytes_sent also counts the worker's warm-up listing, a few hundred bytes
+            report.append({"tool": tool, "description_chars": chars, "response_kib": response_bytes // 1024,
+                           "whole_kib": whole["growth_kib"], "streamed_kib": streamed["growth_kib"]})
+        server.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"peak RSS growth of one tool call over a warmed-up process (HTTP_CLIENT={args.client})\n")
+        print(f"{'tool':<20} {'description':>12} {'response':>10} {'decoded whole':>14} {'streamed':>10}")
+        for row in report:
+            print(f"{row['tool']:<20} {row['description_chars']:12d} {row['response_kib']:7d} KiB "
+                  f"{row['whole_kib']:10d} KiB {row['streamed_kib']:6d} KiB")
+
+    for tool in CALLS:
+        rows = [row for row in report if row["tool"] == tool]
+        smallest, largest = rows[0], rows[-1]
+        if largest["response_kib"] > 4 * 1024:
+            assert largest["streamed_kib"] < largest["whole_kib"] / 2, f"{tool}: streaming did not bound memory {largest}"
+            assert largest["streamed_kib"] - smallest["streamed_kib"] < largest["response_kib"] / 4, f"{tool}: streamed peak grows with size"
+    print("\n✅ Same output at every chunk boundary; streamed peak memory stays flat as responses grow")
+
+if __name__ == "__main__":
+    main()
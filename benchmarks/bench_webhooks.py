@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: webhook ingestion vs. re-polling Bitbucket for cross-references
+Replays the signed Bitbucket / Jira deliveries in benchmarks/fixtures/webhooks
+through lambda_handler as function URL events, then checks that index-mode
+search_cross_references sees the new PR, commits and issue summary (and no
+longer sees the deleted branch) with at most the repository listing upstream,
+where a lookup after XREF_INDEX_MAX_AGE re-polls every repository
+"""
+
+import argparse
+import glob
+import hashlib
+import hmac
+import json
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+
+from atlassian_stub import start_stub, configure_environment
+from handler_harness import prepare, invoke
+
+SECRET = "bench-webhook-secret"
+
+def delivery(path, secret=SECRET):
+    """Function URL event for a fixture, signed the way Bitbucket and Jira sign deliveries"""
+    with open(path) as f:
+        fixture = json.load(f)
+    body = json.dumps(fixture["payload"])
+    signature = "sha256=" + hmac.new(secret.encode(), body.encode(), hashlib.sha256).hexdigest()
+    return {
+        "requestContext": {"http": {"method": "POST", "path": "/"}},
+        "headers": dict(fixture["headers"], **{"Content-Type": "application/json", "X-Hub-Signature": signature}),
+        "body": body,
+        "isBase64Encoded": False
+    }
+
+def lookup(lambda_handler, server, key, index_mode):
+    """(references, upstream requests, ms) of one search_cross_references call, starting with an empty cache"""
+    lambda_handler.response_cache.clear()
+    before = server.state.requests
+    started = time.perf_counter()
+    _, body = invoke(lambda_handler, {"action": "call_tool", "tool_name": "search_cross_references",
+                                      "arguments": {"jira_issue_key": key, "index_mode": index_mode, "output_format": "json"}})
+    return json.loads(body["result"]), server.state.requests - before, (time.perf_counter() - started) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repos", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=20.0, help="Milliseconds added to every stub response")
+    args = parser.parse_args()
+
+    server, base_url = start_stub(repos=args.repos, prs_per_repo=40, commits_per_repo=60, latency=args.latency / 1000)
+    configure_environment(base_url, os.environ)
+    workdir = tempfile.mkdtemp()
+    os.environ.update({"XREF_INDEX_PATH": os.path.join(workdir, "xref.sqlite3"), "XREF_INDEX_SNAPSHOT": "", "WEBHOOK_SECRET": SECRET})
+
+    import lambda_handler
+    import xref_index
+
+    prepare(lambda_handler)
+    index = xref_index.get_index(lambda_handler.BITBUCKET_WORKSPACE)
+
+    def expire_sync_state():
+        # As if XREF_INDEX_MAX_AGE had passed since every repository was polled
+        with index.lock:
+            index.conn.execute("UPDATE sync_state SET synced_at = 0")
+
+    # Initial full sync, then the cost of keeping up by polling
+    lookup(lambda_handler, server, "PROJ-1", "index")
+    expire_sync_state()
+    _, polled, polled_ms = lookup(lambda_handler, server, "PROJ-1", "index")
+
+    print(f"{args.repos} repositories, {args.latency:.0f} ms stub latency\n")
+    print(f"{'delivery':<34} {'status':>6} {'upserted':>9} {'removed':>8} {'invalidated':>12} {'fresh':>6}")
+    fixtures = sorted(glob.glob(os.path.join(BENCH_DIR, "fixtures", "webhooks", "*.json")))
+    before = server.state.requests
+    for path in fixtures:
+        status, body = invoke(lambda_handler, delivery(path))
+        assert status == 200 and body["ingested"], (path, status, body)
+        print(f"{os.path.basename(path):<34} {status:6d} {body['upserted']:9d} {body['removed']:8d} {body['invalidated']:12d} "
+              f"{str(body.get('index_fresh', '-')):>6}")
+    assert server.state.requests == before, "ingestion must not call upstream"
+
+    # Rejected and ignored deliveries
+    assert invoke(lambda_handler, delivery(fixtures[0], secret="wrong"))[0] == 401
+    unsupported = delivery(fixtures[2])
+    unsupported["headers"]["X-Event-Key"] = "repo:fork"
+    assert invoke(lambda_handler, unsupported) == (200, {"ingested": False, "event": "repo:fork", "reason": "Unsupported event"})
+    lambda_handler.WEBHOOK_SECRET = None
+    assert invoke(lambda_handler, delivery(fixtures[0]))[0] == 403, "unsigned HTTP deliveries must be refused"
+    lambda_handler.WEBHOOK_SECRET = SECRET
+
+    # Read tools answer from what the webhooks delivered
+    references, indexed, indexed_ms = lookup(lambda_handler, server, "PROJ-900", "index")
+    assert references["summary"] == "Rotate webhook secrets daily", references
+    assert [(pr["repo"], pr["id"]) for pr in references["pull_requests"]] == [("repo-0", 501)], references
+    assert [commit["message"] for commit in references["commits"]] == ["PROJ-900: schedule secret rotation"], references
+    assert not references.get("branches"), "deleted branch is still indexed"
+    only, index_only, index_only_ms = lookup(lambda_handler, server, "PROJ-900", "index_only")
+    assert only == references
+    assert [pr["id"] for pr in lookup(lambda_handler, server, "PROJ-901", "index_only")[0]["pull_requests"]] == [501]
+    assert index.get_issue("PROJ-902") is None, "deleted issue is still stored"
+    # index mode still lists repositories to check their freshness; index_only calls nothing
+    assert indexed <= 1 and index_only == 0, (indexed, index_only)
+
+    # A repository that delivered webhooks is skipped by the next refresh; the others are polled
+    expire_sync_state()
+    invoke(lambda_handler, delivery(fixtures[3]))
+    # A pull request event says nothing about commits or branches, so only PRs count as fresh
+    fresh = [kind for kind in xref_index.KINDS if index.get_sync_state("repo-0", kind)[1]]
+    assert fresh == [xref_index.PULL_REQUEST], fresh
+    _, partial, _ = lookup(lambda_handler, server, "PROJ-900", "index")
+    assert 0 < partial < polled, (partial, polled)
+
+    print(f"\n{'lookup':<44} {'upstream':>9} {'ms':>8}")
+    print(f"{'index, poll interval elapsed':<44} {polled:9d} {polled_ms:8.1f}")
+    print(f"{'index, after webhooks':<44} {indexed:9d} {indexed_ms:8.1f}")
+    print(f"{'index_only, after webhooks':<44} {index_only:9d} {index_only_ms:8.1f}")
+    print(f"{'index, interval elapsed, 1 repo via webhook':<44} {partial:9d}")
+    print(f"\n✅ {len(fixtures)} replayed deliveries applied without upstream calls; lookups answered from the index")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: q_mcp_wrapper invocation backends (cli / boto3 / local)
+The remote backends talk to a local stand-in for the Lambda Invoke API that
+runs lambda_handler in process, so only the invocation overhead is measured
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from atlassian_stub import start_stub, configure_environment
+from handler_harness import prepare
+
+class LambdaInvokeHandler(BaseHTTPRequestHandler):
+    """POST /2015-03-31/functions/{name}/invocations -> lambda_handler(payload)"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        import lambda_handler
+
+        # Measure the invocation path: no EMF line on stdout, no rate limiter
+        prepare(lambda_handler)
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        body = json.dumps(lambda_handler.lambda_handler(payload, None)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("X-Amz-Executed-Version", "$LATEST")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    stub, stub_url = start_stub(repos=5)
+    configure_environment(stub_url, os.environ)
+
+    invoke_server = ThreadingHTTPServer(("127.0.0.1", 0), LambdaInvokeHandler)
+    invoke_server.daemon_threads = True
+    threading.Thread(target=invoke_server.serve_forever, daemon=True).start()
+
+    os.environ.update({
+        "ATLASSIAN_MCP_ENDPOINT_URL": f"http://127.0.0.1:{invoke_server.server_address[1]}",
+        "AWS_ACCESS_KEY_ID": "bench",
+        "AWS_SECRET_ACCESS_KEY": "bench",
+    })
+    os.environ.pop("AWS_PROFILE", None)
+    import q_mcp_wrapper
+
+    # Use the dummy key pair above instead of a named profile
+    q_mcp_wrapper.PROFILE = ""
+
+    payload = {"action": "call_tool", "tool_name": "list_branches", "arguments": {"repo_name": "repo-0"}}
+    print(f"{args.iterations} x call_tool(list_branches) per backend\n")
+
+    for name, backend_class in q_mcp_wrapper.BACKENDS.items():
+        try:
+            started = time.perf_counter()
+            backend = backend_class()
+            setup_ms = (time.perf_counter() - started) * 1000
+            backend.invoke(payload)
+        except (ImportError, FileNotFoundError) as e:
+            print(f"{name:<6} skipped ({e})")
+            continue
+
+        iterations = max(1, args.iterations // 10) if name == "cli" else args.iterations
+        samples = []
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            response = backend.invoke(payload)
+            samples.append((time.perf_counter() - t0) * 1000)
+        assert response["statusCode"] == 200, response
+        print(f"{name:<6} setup {setup_ms:8.1f} ms   p50 {statistics.median(samples):8.2f} ms   "
+              f"p99 {percentile(samples, 99):8.2f} ms   ({iterations} calls)")
+
+    invoke_server.shutdown()
+    stub.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+Shared setup for benchmarks that drive lambda_handler in process
+Quiets the per-invocation metrics line, lifts the rate limiters, and wraps
+tool calls so the stub's timings measure the code rather than the limiter
+"""
+
+import contextlib
+import io
+import json
+
+def prepare(lambda_handler, metrics_log=False):
+    """Configure an imported lambda_handler for benchmarking and return it"""
+    lambda_handler.METRICS_LOG_ENABLED = metrics_log
+    for bucket in lambda_handler.rate_limiters.values():
+        bucket.rate = bucket.capacity = 1e6
+    return lambda_handler
+
+def invoke(lambda_handler, event, context=None):
+    """(statusCode, decoded body) of one lambda_handler invocation, stdout discarded"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = lambda_handler.lambda_handler(event, context)
+    return response["statusCode"], json.loads(response["body"])
+
+def call(lambda_handler, tool_name, arguments, context=None):
+    """Result text of one call_tool invocation"""
+    _, body = invoke(lambda_handler, {"action": "call_tool", "tool_name": tool_name, "arguments": arguments}, context)
+    return body["result"]
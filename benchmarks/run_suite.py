@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: scripted lambda_handler workloads against the Atlassian stub
+Each workload runs in a fresh worker process (cold import, empty caches, its own
+peak RSS) and reports throughput, latency percentiles, upstream requests and
+peak memory. Results are written as JSON tagged with the git commit so runs can
+be compared across commits with --compare
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from atlassian_stub import start_stub, configure_environment
+
+def tool(name, arguments):
+    return {"action": "call_tool", "tool_name": name, "arguments": arguments}
+
+# Workload name -> event for the i-th invocation (scale holds the stub's --repos / --issues)
+WORKLOADS = {
+    "search_jira_issues": lambda i, scale: tool("search_jira_issues", {"jql": f"project = PROJ AND id > {i}", "max_results": 50}),
+    "list_bitbucket_repositories": lambda i, scale: tool("list_bitbucket_repositories", {"limit": 50}),
+    "list_pull_requests": lambda i, scale: tool("list_pull_requests", {"repo_name": f"repo-{i % scale['repos']}", "limit": 50}),
+    "list_branches": lambda i, scale: tool("list_branches", {"repo_name": f"repo-{i % scale['repos']}", "limit": 25}),
+    "get_commits": lambda i, scale: tool("get_commits", {"repo_name": f"repo-{i % scale['repos']}", "limit": 50}),
+    "search_cross_references": lambda i, scale: tool("search_cross_references", {"jira_issue_key": f"PROJ-{i % 50 + 1}"}),
+    "search_cross_references_index": lambda i, scale: tool("search_cross_references", {"jira_issue_key": f"PROJ-{i % 50 + 1}", "index_mode": "index"}),
+    "call_tools": lambda i, scale: {"action": "call_tools", "calls": [
+        {"tool_name": name, "arguments": {"repo_name": f"repo-{i % scale['repos']}", "limit": 25}}
+        for name in ("list_pull_requests", "list_branches", "get_commits")
+    ]},
+}
+
+# Client-side pacing would otherwise dominate every workload; export these to measure production pacing
+CLIENT_LIMITS = {"JIRA_RATE_LIMIT": "1000", "JIRA_RATE_BURST": "1000", "BITBUCKET_RATE_LIMIT": "1000", "BITBUCKET_RATE_BURST": "1000"}
+
+class LambdaContext:
+    """Just enough of the Lambda context object for Deadline.from_context"""
+
+    def __init__(self, timeout):
+        self.expires_at = time.monotonic() + timeout
+
+    def get_remaining_time_in_millis(self):
+        return int(max(0.0, self.expires_at - time.monotonic()) * 1000)
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def peak_rss_kib():
+    """High-water RSS of this process; VmHWM where available, because ru_maxrss
+    carries the parent's (stub server's) peak across fork + exec on Linux"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty", "--abbrev=12"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def worker(args):
+    """Run one workload in this (fresh) process and print its measurements as JSON"""
+    scale = {"repos": args.repos}
+    build = WORKLOADS[args.worker]
+
+    started = time.perf_counter()
+    import lambda_handler
+    import_ms = (time.perf_counter() - started) * 1000
+    import_rss = peak_rss_kib()
+
+    latencies = []
+    errors = 0
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):  # EMF log lines
+        started = time.perf_counter()
+        for i in range(args.iterations):
+            event = build(i, scale)
+            invoked = time.perf_counter()
+            response = lambda_handler.lambda_handler(event, LambdaContext(args.timeout))
+            latencies.append((time.perf_counter() - invoked) * 1000)
+            body = json.loads(response["body"])
+            results = [body.get("result")] if "result" in body else [item.get("result") for item in body.get("results", [])]
+            errors += response["statusCode"] != 200 or any(result is None or result.startswith("❌") for result in results)
+        elapsed = time.perf_counter() - started
+
+    warm = latencies[1:] or latencies
+    print(json.dumps({
+        "invocations": args.iterations,
+        "errors": errors,
+        "throughput_per_s": round(args.iterations / elapsed, 2),
+        "import_ms": round(import_ms, 2),
+        "first_ms": round(latencies[0], 2),
+        "p50_ms": round(percentile(warm, 0.50), 3),
+        "p90_ms": round(percentile(warm, 0.90), 3),
+        "p99_ms": round(percentile(warm, 0.99), 3),
+        "max_ms": round(max(warm), 3),
+        "import_rss_kib": import_rss,
+        "peak_rss_kib": peak_rss_kib(),
+        "cache_hits": lambda_handler.response_cache.stats()["hits"]
+    }))
+
+def run_workload(name, args, server, base_url):
+    """Start a worker process for one workload and add the stub's view of its traffic"""
+    env = dict(os.environ)
+    configure_environment(base_url, env)
+    for key, value in CLIENT_LIMITS.items():
+        env.setdefault(key, value)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_DIR, env.get("PYTHONPATH")]))
+
+    state = server.state
+    before = (state.requests, state.bytes_sent, state.throttled)
+    with tempfile.TemporaryDirectory() as scratch:
+        env["XREF_INDEX_PATH"] = os.path.join(scratch, "xref_index.sqlite3")
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", name, "--iterations", str(args.iterations),
+             "--repos", str(args.repos), "--timeout", str(args.timeout)],
+            env=env, capture_output=True, text=True
+        )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{name} worker failed:\n{completed.stderr}")
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    requests, sent, throttled = (now - then for now, then in zip((state.requests, state.bytes_sent, state.throttled), before))
+    result.update({
+        "upstream_requests": requests,
+        "upstream_per_invocation": round(requests / args.iterations, 2),
+        "upstream_kib": round(sent / 1024, 1),
+        "throttled": throttled
+    })
+    return result
+
+def print_table(report, baseline=None):
+    columns = [("throughput_per_s", "inv/s", True), ("p50_ms", "p50 ms", False), ("p90_ms", "p90 ms", False),
+               ("p99_ms", "p99 ms", False), ("upstream_per_invocation", "up/inv", False), ("peak_rss_kib", "peak KiB", False)]
+    print(f"{'workload':<30} {'first ms':>9} " + " ".join(f"{label:>10}" for _, label, _ in columns))
+    for name, result in report["workloads"].items():
+        cells = []
+        for key, _, higher_is_better in columns:
+            value = result[key]
+            cell = f"{value:10d}" if isinstance(value, int) else f"{value:10.2f}"
+            old = (baseline or {}).get("workloads", {}).get(name, {}).get(key)
+            if old:
+                change = (value - old) / old
+                verdict = "" if abs(change) < 0.05 else " ✓" if (change > 0) == higher_is_better else " ✗"
+                cell += f" ({change:+.0%}{verdict})"
+            cells.append(cell)
+        print(f"{name:<30} {result['first_ms']:9.1f} " + " ".join(cells))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help="Comma-separated subset of: " + ", ".join(WORKLOADS))
+    parser.add_argument("--iterations", type=int, default=50, help="Invocations per workload")
+    parser.add_argument("--repos", type=int, default=20)
+    parser.add_argument("--prs", type=int, default=50, help="Pull requests per repository")
+    parser.add_argument("--commits", type=int, default=50, help="Commits per repository")
+    parser.add_argument("--issues", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="Milliseconds added to every stub response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra milliseconds per response")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Stub requests per second before answering 429")
+    parser.add_argument("--fixtures", action="store_true", help="Serve recorded-shape objects (benchmarks/fixtures)")
+    parser.add_argument("--timeout", type=float, default=60, help="Simulated Lambda timeout per invocation (seconds)")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return worker(args)
+
+    names = [name.strip() for name in args.workloads.split(",") if name.strip()]
+    unknown = [name for name in names if name not in WORKLOADS]
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(unknown)}")
+
+    config = {key: getattr(args, key) for key in ("iterations", "repos", "prs", "commits", "issues", "latency", "jitter", "rate_limit", "fixtures", "timeout")}
+    server, base_url = start_stub(repos=args.repos, prs_per_repo=args.prs, commits_per_repo=args.commits, issues=args.issues,
+                                  latency=args.latency / 1000, jitter=args.jitter / 1000, rate_limit=args.rate_limit,
+                                  fixtures=args.fixtures)
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "client_limits": {key: os.environ.get(key, value) for key, value in CLIENT_LIMITS.items()},
+        "workloads": {}
+    }
+    print(f"revision {report['revision']}: {args.repos} repos x {args.prs} PRs, {args.iterations} invocations per workload\n")
+    for name in names:
+        report["workloads"][name] = run_workload(name, args, server, base_url)
+    server.shutdown()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"compared with {baseline.get('revision')} (change vs. baseline; ✓ better, ✗ worse by 5% or more)\n")
+        if baseline.get("config") != config:
+            print(f"⚠️ Baseline was run with a different configuration: {baseline.get('config')}\n")
+    print_table(report, baseline)
+
+    failures = {name: result["errors"] for name, result in report["workloads"].items() if result["errors"]}
+    if failures:
+        print(f"\n⚠️ Invocations that returned errors: {failures}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ set -e
 FUNCTION_NAME="atlassian-mcp-server"
 REGION="us-west-2"
 PROFILE="AdministratorAccess-542754948868"
+# HTTP_CLIENT=pooled ./deploy.sh ... ships without requests (stdlib http_client.py) for faster cold starts
+HTTP_CLIENT="${HTTP_CLIENT:-requests}"
 
 echo "🚀 Deploying Atlassian Suite MCP Server (Jira + Bitbucket)..."
 
@@ -33,8 +35,14 @@ fi
 # Create deployment package
 rm -rf package
 mkdir package
-cp lambda_handler.py package/
-pip install -r requirements.txt -t package/
+cp lambda_handler.py xref_index.py http_client.py package/
+# Optional pre-built cross-reference index (python3 xref_index.py build-snapshot xref_index.snapshot.sqlite3)
+if [ -f xref_index.snapshot.sqlite3 ]; then
+    cp xref_index.snapshot.sqlite3 package/
+fi
+if [ "$HTTP_CLIENT" != "pooled" ]; then
+    pip install -r requirements.txt -t package/
+fi
 cd package && zip -r ../function.zip . && cd ..
 
 # Deploy function
@@ -91,6 +99,10 @@ fi
 mkdir -p ~/.config/q
 cp q-mcp-config.json ~/.config/q/mcp-servers.json
 
+# Seed the wrapper's tool-schema cache so sessions start without a Lambda round-trip
+PYTHONPATH=package ATLASSIAN_MCP_FUNCTION=$FUNCTION_NAME AWS_REGION=$REGION AWS_PROFILE=$PROFILE \
+    python3 q_mcp_wrapper.py --seed-tools-cache || echo "⚠️  Tool schema cache not seeded (fetched on first use)"
+
 # Clean up
 rm -rf package function.zip
 
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Lightweight pooled HTTP client built on http.client (HTTP_CLIENT=pooled)
+Implements the slice of requests.Session that lambda_handler uses, so the
+function can be deployed without the requests / urllib3 dependency tree
+"""
+
+import base64
+import http.client
+import socket
+import threading
+import zlib
+from json import dumps, loads
+from urllib.parse import urlsplit
+
+class RequestException(Exception):
+    """Base class mirroring requests.RequestException"""
+
+    def __init__(self, *args, response=None):
+        super().__init__(*args)
+        self.response = response
+
+class HTTPError(RequestException):
+    pass
+
+class ConnectionError(RequestException):
+    pass
+
+class Timeout(RequestException):
+    pass
+
+class ConnectTimeout(ConnectionError, Timeout):
+    pass
+
+class ReadTimeout(Timeout):
+    pass
+
+# A kept-alive connection the server already closed fails like this before any response arrives
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+# Safe to send again after a kept-alive connection dropped without a response
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+def decompressor(headers):
+    """zlib decompressor for the response's Content-Encoding, or None when it is not compressed"""
+    encoding = (headers.get("Content-Encoding") or "").lower()
+    if encoding in ("gzip", "deflate"):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS if encoding == "gzip" else zlib.MAX_WBITS)
+    return None
+
+class Response:
+    """Status, headers and body of one HTTP exchange.
+
+    Streamed responses (stream=True) leave the body on the connection until
+    iter_content() or content reads it; the connection goes back to the pool
+    once the body is fully read, and is closed if the reader stops early.
+    """
+
+    def __init__(self, url, status_code, reason, headers, content, body=None, release=None):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers  # http.client.HTTPMessage: case-insensitive get()
+        self._content = content
+        self._body = body
+        self._release = release
+
+    @property
+    def content(self):
+        if self._content is None:
+            self._content = b"".join(self.iter_content(65536))
+        return self._content
+
+    def iter_content(self, chunk_size=1):
+        """Yield the decompressed body in pieces of up to chunk_size bytes read from the socket"""
+        if self._content is not None:
+            for start in range(0, len(self._content), chunk_size):
+                yield self._content[start:start + chunk_size]
+            return
+        if self._body is None:
+            raise RuntimeError("The content for this response was already consumed")
+        decoder = decompressor(self.headers)
+        try:
+            while True:
+                try:
+                    chunk = self._body.read(chunk_size)
+                except socket.timeout as e:
+                    raise ReadTimeout(f"Read timed out. ({e})") from e
+                except (OSError, http.client.HTTPException) as e:
+                    raise ConnectionError(f"Connection broken: {e!r}") from e
+                if not chunk:
+                    break
+                if decoder is not None:
+                    chunk = decoder.decompress(chunk)
+                if chunk:
+                    yield chunk
+            if decoder is not None:
+                tail = decoder.flush()
+                if tail:
+                    yield tail
+        finally:
+            self.close()
+
+    def close(self):
+        if self._body is not None:
+            body, self._body = self._body, None
+            self._release(body.isclosed())
+
+    def json(self):
+        return loads(self.content)
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise HTTPError(f"{self.status_code} {kind} Error: {self.reason} for url: {self.url}", response=self)
+
+class PooledSession:
+    """Keep-alive connection pool per host with Basic auth and default headers.
+
+    Connections are borrowed for one request and returned afterwards, so up to
+    pool_size requests run concurrently per host without reconnecting.
+    """
+
+    def __init__(self, auth=None, headers=None, pool_size=16):
+        self.auth = auth
+        self.headers = dict(headers or {})
+        self.headers.setdefault("Accept-Encoding", "gzip, deflate")
+        self.pool_size = pool_size
+        self.idle = {}
+        self.lock = threading.Lock()
+        self.ssl_context = None
+
+    def request(self, method, url, json=None, headers=None, timeout=None, stream=False):
+        parts = urlsplit(url)
+        origin = (parts.scheme, parts.hostname, parts.port)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+
+        request_headers = dict(self.headers)
+        if self.auth:
+            token = base64.b64encode(f"{self.auth[0]}:{self.auth[1]}".encode()).decode()
+            request_headers["Authorization"] = f"Basic {token}"
+        request_headers.update(headers or {})
+        body = None
+        if json is not None:
+            body = dumps(json).encode()
+            request_headers["Content-Type"] = "application/json"
+
+        conn, reused = self.borrow(origin, connect_timeout)
+        while True:
+            sent = False
+            try:
+                conn.sock.settimeout(read_timeout)
+                conn.request(method, target, body=body, headers=request_headers)
+                sent = True
+                response = conn.getresponse()
+                content = None if stream else response.read()
+                break
+            except STALE_CONNECTION_ERRORS as e:
+                conn.close()
+                # A POST the server may have received is not resent; one that never went out is
+                if not reused or (sent and method.upper() not in IDEMPOTENT_METHODS):
+                    raise ConnectionError(f"Connection aborted: {e!r}") from e
+                conn, reused = self.connect(origin, connect_timeout), False
+            except socket.timeout as e:
+                conn.close()
+                raise ReadTimeout(f"Read timed out. (read timeout={read_timeout})") from e
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise ConnectionError(f"Connection aborted: {e!r}") from e
+
+        def release(complete):
+            # A body left partly unread would corrupt the next exchange on this connection
+            if response.will_close or not complete:
+                conn.close()
+            else:
+                self.release(origin, conn)
+
+        if stream:
+            return Response(url, response.status, response.reason, response.headers, None, response, release)
+        release(True)
+
+        decoder = decompressor(response.headers)
+        if decoder is not None and content:
+            content = decoder.decompress(content) + decoder.flush()
+        return Response(url, response.status, response.reason, response.headers, content)
+
+    def borrow(self, origin, connect_timeout):
+        """An idle kept-alive connection to origin, or a new one; returns (connection, reused)"""
+        with self.lock:
+            idle = self.idle.get(origin)
+            if idle:
+                return idle.pop(), True
+        return self.connect(origin, connect_timeout), False
+
+    def connect(self, origin, connect_timeout):
+        scheme, host, port = origin
+        try:
+            if scheme == "https":
+                if self.ssl_context is None:
+                    import ssl  # Deferred: loading OpenSSL is a noticeable share of cold start
+                    self.ssl_context = ssl.create_default_context()
+                conn = http.client.HTTPSConnection(host, port, timeout=connect_timeout, context=self.ssl_context)
+            else:
+                conn = http.client.HTTPConnection(host, port, timeout=connect_timeout)
+            conn.connect()
+        except socket.timeout as e:
+            raise ConnectTimeout(f"Connection to {host} timed out. (connect timeout={connect_timeout})") from e
+        except OSError as e:
+            raise ConnectionError(f"Failed to establish a new connection to {host}: {e}") from e
+        conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn
+
+    def release(self, origin, conn):
+        with self.lock:
+            idle = self.idle.setdefault(origin, [])
+            if len(idle) < self.pool_size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self.lock:
+            connections = [conn for idle in self.idle.values() for conn in idle]
+            self.idle.clear()
+        for conn in connections:
+            conn.close()
@@ -4,12 +4,21 @@ Comprehensive Atlassian Suite MCP Server for AWS Lambda
 Integrates Jira and Bitbucket with cross-referencing capabilities
 """
 
+import base64
+import contextvars
 import json
 import os
-import requests
-from requests.auth import HTTPBasicAuth
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
 import re
-from urllib.parse import quote
+from urllib.parse import quote, parse_qsl, urlencode
+
+# Heavier modules (requests / http_client, concurrent.futures, hmac, email.utils,
+# xref_index) are imported where first needed to keep cold starts short; see
+# benchmarks/bench_coldstart.py
 
 # Atlassian configuration from environment variables
 JIRA_URL = os.environ.get("JIRA_URL")
@@ -19,493 +28,3420 @@ JIRA_API_TOKEN = os.environ.get("JIRA_API_TOKEN")
 BITBUCKET_WORKSPACE = os.environ.get("BITBUCKET_WORKSPACE")
 BITBUCKET_USERNAME = os.environ.get("BITBUCKET_USERNAME")
 BITBUCKET_APP_PASSWORD = os.environ.get("BITBUCKET_APP_PASSWORD")
+BITBUCKET_API_URL = os.environ.get("BITBUCKET_API_URL", "https://api.bitbucket.org/2.0")
 
-def make_request(service, method, endpoint, data=None):
-    """Make authenticated API request to Jira or Bitbucket"""
+# Optional comma-separated Jira project keys; when set, other KEY-123 tokens are ignored
+JIRA_PROJECT_KEYS = {key.strip() for key in os.environ.get("JIRA_PROJECT_KEYS", "").split(",") if key.strip()}
+
+# HTTP connection settings (sessions are reused across warm invocations)
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "16"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "25"))
+# "requests", "pooled" (stdlib client in http_client.py, no third-party dependencies),
+# or "auto": requests when it is installed, pooled otherwise
+HTTP_CLIENT = os.environ.get("HTTP_CLIENT", "auto")
+
+# Request scheduling: per-service token buckets (requests/second, burst) and retries
+JIRA_RATE_LIMIT = float(os.environ.get("JIRA_RATE_LIMIT", "10"))
+JIRA_RATE_BURST = int(os.environ.get("JIRA_RATE_BURST", "30"))
+BITBUCKET_RATE_LIMIT = float(os.environ.get("BITBUCKET_RATE_LIMIT", "5"))
+BITBUCKET_RATE_BURST = int(os.environ.get("BITBUCKET_RATE_BURST", "50"))
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "4"))
+HTTP_BACKOFF_BASE = float(os.environ.get("HTTP_BACKOFF_BASE", "0.5"))
+HTTP_BACKOFF_MAX = float(os.environ.get("HTTP_BACKOFF_MAX", "8"))
+
+# Response cache for read-only GET traffic (byte budget sized well inside a 256 MB function)
+CACHE_ENABLED = os.environ.get("CACHE_ENABLED", "true").lower() == "true"
+CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+CACHE_DEFAULT_TTL = int(os.environ.get("CACHE_DEFAULT_TTL", "30"))
+# Expired entries kept only for conditional revalidation, at most
+CACHE_MAX_STALE_ENTRIES = int(os.environ.get("CACHE_MAX_STALE_ENTRIES", "256"))
+# Parsed JSON takes about 2.3-3.6x its wire size in CPython; entries are charged this multiple
+CACHE_DECODED_SIZE_FACTOR = 3
+SINGLE_FLIGHT_ENABLED = os.environ.get("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+# List tools parse pages of STREAM_MIN_BYTES or more item by item instead of decoding them
+# whole; long descriptions / messages in those items are clipped to STREAM_TEXT_MAX_CHARS
+STREAM_RESPONSES = os.environ.get("STREAM_RESPONSES", "true").lower() == "true"
+STREAM_MIN_BYTES = int(os.environ.get("STREAM_MIN_BYTES", str(256 * 1024)))
+STREAM_TEXT_MAX_CHARS = int(os.environ.get("STREAM_TEXT_MAX_CHARS", "2000"))
+
+# Ask Jira / Bitbucket for only the fields each tool reads (see TOOL_FIELDS)
+FIELD_PROJECTION_ENABLED = os.environ.get("FIELD_PROJECTION_ENABLED", "true").lower() == "true"
+
+# Push PR search predicates (issue key, updated since) into Bitbucket's q= filter
+PR_QUERY_PUSHDOWN = os.environ.get("PR_QUERY_PUSHDOWN", "true").lower() == "true"
+
+# HMAC key for continuation cursors (defaults to one derived from the API credentials)
+CURSOR_SECRET = os.environ.get("CURSOR_SECRET")
+
+# Approximate token budget for output_format="summary"
+SUMMARY_TOKEN_BUDGET = int(os.environ.get("SUMMARY_TOKEN_BUDGET", "400"))
+
+# Per-invocation metrics log line in CloudWatch embedded metric format (EMF)
+METRICS_LOG_ENABLED = os.environ.get("METRICS_LOG_ENABLED", "true").lower() == "true"
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "AtlassianMCP")
+
+# Concurrency settings for tools that iterate over repositories
+FANOUT_MAX_WORKERS = int(os.environ.get("FANOUT_MAX_WORKERS", "8"))
+BATCH_MAX_WORKERS = int(os.environ.get("BATCH_MAX_WORKERS", "8"))
+BULK_MAX_WORKERS = int(os.environ.get("BULK_MAX_WORKERS", "4"))
+DEADLINE_SAFETY_MARGIN_MS = int(os.environ.get("DEADLINE_SAFETY_MARGIN_MS", "3000"))
+# Requests are not started with less than this many seconds left before the deadline
+MIN_REQUEST_BUDGET = float(os.environ.get("MIN_REQUEST_BUDGET", "0.25"))
+
+# How long a warm container remembers bulk items by idempotency key (seconds)
+IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL", "86400"))
+
+# Cross-reference index settings (see xref_index.py)
+XREF_INDEX_MAX_AGE = int(os.environ.get("XREF_INDEX_MAX_AGE", "300"))
+XREF_INDEX_COMMIT_LIMIT = int(os.environ.get("XREF_INDEX_COMMIT_LIMIT", "500"))
+
+# Shared secret for webhook signatures (X-Hub-Signature); required for deliveries over HTTP
+WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET")
+
+# API page size ceilings (Bitbucket caps pull request pages lower than other lists)
+BITBUCKET_MAX_PAGELEN = 100
+BITBUCKET_PR_MAX_PAGELEN = 50
+JIRA_MAX_RESULTS = 100
+JIRA_BULK_MAX = 50  # issueUpdates per issue/bulk request
+STREAM_CHUNK_BYTES = 64 * 1024  # socket read size for streamed responses
+
+# ============================================================================
+# HTTP CONNECTION LAYER
+# ============================================================================
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_http_library = None
+
+def get_service_config(service):
+    """Return (base_url, auth) for a service, validating its configuration"""
     if service == "jira":
         if not all([JIRA_URL, JIRA_EMAIL, JIRA_API_TOKEN]):
             raise ValueError("Missing Jira configuration")
-        url = f"{JIRA_URL}/rest/api/2/{endpoint}"
-        auth = HTTPBasicAuth(JIRA_EMAIL, JIRA_API_TOKEN)
+        return f"{JIRA_URL}/rest/api/2", (JIRA_EMAIL, JIRA_API_TOKEN)
     
     elif service == "bitbucket":
         if not all([BITBUCKET_WORKSPACE, BITBUCKET_USERNAME, BITBUCKET_APP_PASSWORD]):
             raise ValueError("Missing Bitbucket configuration")
-        url = f"https://api.bitbucket.org/2.0/{endpoint}"
-        auth = HTTPBasicAuth(BITBUCKET_USERNAME, BITBUCKET_APP_PASSWORD)
+        return BITBUCKET_API_URL, (BITBUCKET_USERNAME, BITBUCKET_APP_PASSWORD)
     
+    raise ValueError(f"Unknown service: {service}")
+
+def http_library():
+    """The HTTP_CLIENT module: requests or http_client, which share exception names.
+    
+    Imported on first use, so invocations that never call Jira or Bitbucket
+    (list_tools, get_metrics) do not load it during a cold start.
+    """
+    global _http_library
+    if _http_library is None:
+        library = None
+        if HTTP_CLIENT != "pooled":
+            try:
+                import requests as library
+            except ImportError:
+                if HTTP_CLIENT == "requests":
+                    raise
+        if library is None:
+            import http_client as library
+        _http_library = library
+    return _http_library
+
+def get_session(service):
+    """Return the pooled keep-alive session for a service, creating it on first use"""
+    session = _sessions.get(service)
+    if session is not None:
+        return session
+    
+    with _sessions_lock:
+        session = _sessions.get(service)
+        if session is None:
+            _, auth = get_service_config(service)
+            headers = {"Accept": "application/json", "Connection": "keep-alive"}
+            library = http_library()
+            if library.__name__ == "http_client":
+                session = library.PooledSession(auth, headers, HTTP_POOL_SIZE)
+            else:
+                from requests.adapters import HTTPAdapter
+                session = library.Session()
+                session.auth = auth
+                session.headers.update(headers)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+            _sessions[service] = session
+    return session
+
+def reset_sessions():
+    """Close and drop all pooled sessions (e.g. after credentials change)"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+# ============================================================================
+# INSTRUMENTATION
+# ============================================================================
+
+def milliseconds(seconds):
+    return round(seconds * 1000, 2)
+
+class UpstreamCall:
+    """Timings and outcome of one make_request call"""
+    
+    __slots__ = ("service", "method", "path", "span", "status", "bytes", "cache",
+                 "retries", "throttled", "wire", "decode", "elapsed")
+    
+    def __init__(self, service, method, path, span):
+        self.service = service
+        self.method = method
+        self.path = path
+        self.span = span
+        self.status = None
+        self.bytes = 0
+        self.cache = "bypass"  # hit, miss, revalidated, coalesced, or bypass for writes / cache disabled
+        self.retries = 0
+        self.throttled = 0.0
+        self.wire = 0.0
+        self.decode = 0.0
+        self.elapsed = 0.0
+    
+    def to_dict(self):
+        return {
+            "service": self.service,
+            "method": self.method,
+            "path": self.path,
+            "tool": self.span.name if self.span else None,
+            "status": self.status,
+            "cache": self.cache,
+            "bytes": self.bytes,
+            "retries": self.retries,
+            "ms": milliseconds(self.elapsed),
+            "wire_ms": milliseconds(self.wire),
+            "throttled_ms": milliseconds(self.throttled),
+            "decode_ms": milliseconds(self.decode)
+        }
+
+class ToolSpan:
+    """Wall time of one tool call, the part of it spent rendering, and whether it failed"""
+    
+    __slots__ = ("name", "elapsed", "render", "chars", "error")
+    
+    def __init__(self, name):
+        self.name = name
+        self.elapsed = 0.0
+        self.render = 0.0
+        self.chars = 0
+        self.error = False
+
+class InvocationTrace:
+    """Tool spans and upstream calls recorded during one Lambda invocation.
+    
+    Shared by every thread the invocation fans out to (the trace travels in a
+    context variable), so appends take the lock.
+    """
+    
+    def __init__(self, action):
+        self.action = action
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.tools = []
+        self.calls = []
+    
+    def record(self, entry):
+        with self.lock:
+            (self.calls if isinstance(entry, UpstreamCall) else self.tools).append(entry)
+    
+    def upstream_totals(self, calls):
+        """Aggregate counters over a list of UpstreamCall records"""
+        totals = {"calls": 0, "cache_hits": 0, "coalesced": 0, "errors": 0, "retries": 0, "bytes": 0,
+                  "ms": 0.0, "wire_ms": 0.0, "throttled_ms": 0.0, "decode_ms": 0.0}
+        for call in calls:
+            totals["calls"] += 1
+            totals["cache_hits"] += call.cache == "hit"
+            totals["coalesced"] += call.cache == "coalesced"
+            # No status means the request raised (cache hits and coalesced calls never send one)
+            totals["errors"] += call.status >= 400 if call.status is not None else call.cache not in ("hit", "coalesced")
+            totals["retries"] += call.retries
+            totals["bytes"] += call.bytes
+            totals["ms"] += call.elapsed
+            totals["wire_ms"] += call.wire
+            totals["throttled_ms"] += call.throttled
+            totals["decode_ms"] += call.decode
+        for name in ("ms", "wire_ms", "throttled_ms", "decode_ms"):
+            totals[name] = milliseconds(totals[name])
+        return totals
+    
+    def timings(self, detail=False):
+        """Per-tool and per-service breakdown; detail adds every upstream call.
+        
+        Upstream times are summed over calls, so they exceed wall time when a
+        tool fans out concurrently.
+        """
+        with self.lock:
+            tools, calls = list(self.tools), list(self.calls)
+        
+        by_span = {}
+        for call in calls:
+            by_span.setdefault(id(call.span), []).append(call)
+        by_service = {}
+        for call in calls:
+            by_service.setdefault(call.service, []).append(call)
+        
+        timings = {
+            "total_ms": milliseconds(time.perf_counter() - self.started),
+            "tools": [
+                {
+                    "tool": span.name,
+                    "ms": milliseconds(span.elapsed),
+                    "render_ms": milliseconds(span.render),
+                    "chars": span.chars,
+                    "error": span.error,
+                    "upstream": self.upstream_totals(by_span.get(id(span), []))
+                }
+                for span in tools
+            ],
+            "upstream": {service: self.upstream_totals(service_calls) for service, service_calls in by_service.items()}
+        }
+        if detail:
+            timings["calls"] = [call.to_dict() for call in calls]
+        return timings
+    
+    def emf(self, tool=None):
+        """One CloudWatch embedded-metric-format record for the invocation"""
+        timings = self.timings()
+        with self.lock:
+            tools, calls = list(self.tools), list(self.calls)
+        upstream = self.upstream_totals(calls)
+        metrics = {
+            "Duration": (timings["total_ms"], "Milliseconds"),
+            "UpstreamCalls": (upstream["calls"], "Count"),
+            "UpstreamBytes": (upstream["bytes"], "Bytes"),
+            "UpstreamTime": (upstream["ms"], "Milliseconds"),
+            "DecodeTime": (upstream["decode_ms"], "Milliseconds"),
+            "RenderTime": (milliseconds(sum(span.render for span in tools)), "Milliseconds"),
+            "CacheHits": (upstream["cache_hits"], "Count"),
+            "CoalescedCalls": (upstream["coalesced"], "Count"),
+            "Retries": (upstream["retries"], "Count"),
+            "ToolErrors": (sum(span.error for span in tools), "Count")
+        }
+        record = {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": METRICS_NAMESPACE,
+                    "Dimensions": [["Action"], ["Action", "Tool"]] if tool else [["Action"]],
+                    "Metrics": [{"Name": name, "Unit": unit} for name, (_, unit) in metrics.items()]
+                }]
+            },
+            "Action": self.action
+        }
+        if tool:
+            record["Tool"] = tool
+        record.update({name: value for name, (value, _) in metrics.items()})
+        record["tools"] = timings["tools"]
+        record["upstream"] = timings["upstream"]
+        return record
+
+_current_trace = contextvars.ContextVar("trace", default=None)
+_current_span = contextvars.ContextVar("span", default=None)
+
+# ============================================================================
+# REQUEST SCHEDULER
+# ============================================================================
+
+# Transient statuses worth retrying for idempotent GETs (429 is retried for every method)
+RETRYABLE_STATUSES = (429, 502, 503, 504)
+
+class DeadlineExceeded(Exception):
+    """Raised when waiting for a rate limit or retry would overrun the invocation deadline"""
+
+class TokenBucket:
+    """Token bucket pacing requests to one service; can be paused until a reset time"""
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+    
+    def acquire(self, deadline):
+        """Take one token, sleeping as needed; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.paused_until > now:
+                    delay = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                else:
+                    delay = (1 - self.tokens) / self.rate
+            
+            remaining = deadline.remaining()
+            if remaining is not None and delay > remaining:
+                raise DeadlineExceeded(f"Rate limit wait of {delay:.1f}s exceeds the invocation deadline")
+            time.sleep(delay)
+            waited += delay
+    
+    def pause_until(self, resume_at):
+        """Hold all requests until resume_at (monotonic seconds), e.g. after a 429"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, resume_at)
+            self.tokens = 0.0
+
+class SchedulerStats:
+    """Per-service counters for time spent throttled vs. on the wire"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.throttled_seconds = 0.0
+        self.wire_seconds = 0.0
+    
+    def record(self, **deltas):
+        with self.lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+    
+    def snapshot(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+                "wire_seconds": round(self.wire_seconds, 3)
+            }
+
+rate_limiters = {
+    "jira": TokenBucket(JIRA_RATE_LIMIT, JIRA_RATE_BURST),
+    "bitbucket": TokenBucket(BITBUCKET_RATE_LIMIT, BITBUCKET_RATE_BURST),
+}
+scheduler_stats = {service: SchedulerStats() for service in rate_limiters}
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def parse_rate_limit_reset(value):
+    """Seconds until an X-RateLimit-Reset time (epoch seconds or ISO 8601 timestamp)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value) - time.time())
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (datetime.fromisoformat(value.replace("Z", "+00:00")) - datetime.now(timezone.utc)).total_seconds())
+    except ValueError:
+        return None
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+def send_request(service, method, url, data=None, headers=None, call=None, stream=False):
+    """Send one request through the service's token bucket, retrying throttled or failed calls.
+    
+    429 responses honor Retry-After / X-RateLimit-Reset and pause the whole
+    service; 5xx responses and connection errors are retried with jittered
+    backoff for GETs only. Each attempt's timeouts are capped by the time left
+    before the invocation deadline; any wait, or timeout, that would overrun it
+    raises DeadlineExceeded instead. Waits, retries and wire time are also
+    added to call (an UpstreamCall) when given. With stream=True the body is
+    left unread on the returned response (wire time then covers the headers).
+    """
+    session = get_session(service)
+    http = http_library()
+    bucket = rate_limiters[service]
+    stats = scheduler_stats[service]
+    deadline = current_deadline()
+    
+    attempt = 0
+    while True:
+        waited = bucket.acquire(deadline)
+        stats.record(throttled_seconds=waited)
+        timeout = deadline.request_timeout()
+        started = time.monotonic()
+        if call is not None:
+            call.throttled += waited
+        try:
+            response = session.request(
+                method,
+                url,
+                json=data,
+                headers=headers,
+                timeout=timeout,
+                stream=stream
+            )
+        except (http.ConnectionError, http.Timeout) as e:
+            wire = time.monotonic() - started
+            stats.record(requests=1, wire_seconds=wire)
+            if call is not None:
+                call.wire += wire
+            if isinstance(e, http.Timeout) and timeout[1] < HTTP_READ_TIMEOUT and deadline.remaining() < MIN_REQUEST_BUDGET:
+                # Cut short by the invocation budget rather than a slow server
+                raise DeadlineExceeded(f"{service} request timed out at the invocation deadline") from e
+            if method != "GET" or attempt >= HTTP_MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+        else:
+            wire = time.monotonic() - started
+            stats.record(requests=1, wire_seconds=wire)
+            if call is not None:
+                call.wire += wire
+            
+            # Pause the service ahead of a 429 when the quota is exhausted
+            if response.headers.get("X-RateLimit-Remaining") == "0":
+                reset_in = parse_rate_limit_reset(response.headers.get("X-RateLimit-Reset"))
+                if reset_in:
+                    bucket.pause_until(time.monotonic() + reset_in)
+            
+            status = response.status_code
+            if status not in RETRYABLE_STATUSES or (status != 429 and method != "GET") or attempt >= HTTP_MAX_RETRIES:
+                return response
+            
+            response.close()
+            delay = backoff_delay(attempt)
+            if status == 429:
+                stats.record(rate_limited=1)
+                delay = parse_retry_after(response.headers.get("Retry-After")) or \
+                    parse_rate_limit_reset(response.headers.get("X-RateLimit-Reset")) or delay
+                bucket.pause_until(time.monotonic() + delay)
+        
+        remaining = deadline.remaining()
+        if remaining is not None and delay >= remaining:
+            raise DeadlineExceeded(f"{service} retry after {delay:.1f}s would exceed the invocation deadline")
+        time.sleep(delay)
+        stats.record(retries=1, throttled_seconds=delay)
+        if call is not None:
+            call.retries += 1
+            call.throttled += delay
+        attempt += 1
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+# Per-endpoint TTLs in seconds: (service, path pattern, ttl), first match wins
+CACHE_TTLS = [
+    ("bitbucket", re.compile(r"^repositories/[^/]+$"), 300),
+    ("bitbucket", re.compile(r"^repositories/[^/]+/[^/]+/refs/branches$"), 60),
+    ("bitbucket", re.compile(r"^repositories/[^/]+/[^/]+/commits(/.*)?$"), 60),
+    ("bitbucket", re.compile(r"^repositories/[^/]+/[^/]+/pullrequests$"), 30),
+    ("jira", re.compile(r"^search$"), 30),
+    ("jira", re.compile(r"^issue/[^/]+$"), 60),
+]
+
+_MISS = object()
+
+class ResponseCache:
+    """Thread-safe TTL + LRU cache of parsed GET responses bounded by a byte budget.
+    
+    Entries are charged CACHE_DECODED_SIZE_FACTOR times their response size,
+    an estimate of the parsed object's memory. Expired entries that carry
+    validators (ETag / Last-Modified) are kept, up to max_stale of them, so
+    make_request can revalidate them with a conditional GET and reuse the
+    parsed object on 304. Cached objects are shared between callers and must
+    be treated as read-only.
+    """
+    
+    def __init__(self, max_bytes, max_stale=CACHE_MAX_STALE_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_stale = max_stale
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.conditional_requests = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+    
+    def get(self, key):
+        """Return (value, validators) for key.
+        
+        value is _MISS when the entry is absent or expired; validators is the
+        (etag, last_modified) pair of an expired entry that can be revalidated.
+        Misses are counted by miss(), once per request actually sent.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return _MISS, None
+            value, expires_at, size, etag, last_modified, _ = entry
+            if expires_at <= time.monotonic():
+                if not (etag or last_modified):
+                    self._remove(key)
+                    return _MISS, None
+                return _MISS, (etag, last_modified)
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value, None
+    
+    def miss(self, validators):
+        """Count a miss going upstream (a conditional request when validators are given)"""
+        with self.lock:
+            self.misses += 1
+            if validators:
+                self.conditional_requests += 1
+    
+    def put(self, key, value, ttl, size, etag=None, last_modified=None):
+        """Store value for ttl seconds, evicting least recently used entries over budget.
+        
+        size is the response size in bytes; the budget is charged the decoded estimate.
+        """
+        charge = size * CACHE_DECODED_SIZE_FACTOR
+        if charge > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (value, time.monotonic() + ttl, size, etag, last_modified, charge)
+            self.bytes += charge
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self.entries))
+                self._remove(oldest)
+                self.evictions += 1
+            if len(self.entries) > self.max_stale:
+                self._trim_stale()
+    
+    def revalidated(self, key, ttl):
+        """Renew an entry after a 304 Not Modified; returns its value or _MISS if evicted meanwhile"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return _MISS
+            value, _, size, etag, last_modified, charge = entry
+            self.entries[key] = (value, time.monotonic() + ttl, size, etag, last_modified, charge)
+            self.entries.move_to_end(key)
+            self.not_modified += 1
+            self.bytes_saved += size
+            return value
+    
+    def invalidate(self, service, path_prefix):
+        """Drop every entry for service whose path starts with path_prefix; returns how many"""
+        with self.lock:
+            stale = [key for key in self.entries if key[0] == service and key[1].startswith(path_prefix)]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+            return len(stale)
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+    
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "conditional_requests": self.conditional_requests,
+                "not_modified": self.not_modified,
+                "not_modified_rate": round(self.not_modified / self.conditional_requests, 3) if self.conditional_requests else 0.0,
+                "bytes_saved": self.bytes_saved
+            }
+    
+    def _trim_stale(self):
+        # Least recently used expired entries beyond max_stale are evicted
+        now = time.monotonic()
+        stale = [key for key, entry in self.entries.items() if entry[1] <= now]
+        for key in stale[:max(0, len(stale) - self.max_stale)]:
+            self._remove(key)
+            self.evictions += 1
+    
+    def _remove(self, key):
+        charge = self.entries.pop(key)[5]
+        self.bytes -= charge
+
+response_cache = ResponseCache(CACHE_MAX_BYTES)
+
+class Flight:
+    """One in-flight upstream GET that identical concurrent requests wait on"""
+    
+    __slots__ = ("done", "result", "error", "waiters")
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """Coalesces identical concurrent GETs into one upstream request.
+    
+    The first caller for a key (the leader) sends the request; callers that
+    arrive while it is in flight wait for it and share its parsed result or
+    its exception. Only concurrent calls are merged: once the leader finishes,
+    the next caller starts a new request (or hits the response cache). Shared
+    results must be treated as read-only, like cached ones.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flights = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.peak_waiters = 0
+    
+    def run(self, key, fn):
+        """Return (result, shared): fn()'s result, or an in-flight leader's for the same key"""
+        while True:
+            with self.lock:
+                flight = self.flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self.flights[key] = Flight()
+                    self.leaders += 1
+                else:
+                    flight.waiters += 1
+                    self.coalesced += 1
+                    self.peak_waiters = max(self.peak_waiters, flight.waiters)
+            
+            if leader:
+                try:
+                    flight.result = fn()
+                    return flight.result, False
+                except BaseException as e:
+                    flight.error = e
+                    raise
+                finally:
+                    with self.lock:
+                        del self.flights[key]
+                    flight.done.set()
+            
+            if not flight.done.wait(current_deadline().remaining()):
+                raise DeadlineExceeded("Invocation deadline reached waiting for an identical in-flight request")
+            if flight.error is None:
+                return flight.result, True
+            if not isinstance(flight.error, DeadlineExceeded):
+                raise flight.error
+            # The leader ran out of its own time budget; this caller may still have some, so try again
+    
+    def stats(self):
+        with self.lock:
+            return {
+                "in_flight": len(self.flights),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "coalesced_rate": round(self.coalesced / (self.leaders + self.coalesced), 3) if self.leaders else 0.0,
+                "peak_waiters": self.peak_waiters
+            }
+
+single_flight = SingleFlight()
+
+# Set while reading state that must be current (idempotency markers): GETs skip the cache and single flight
+_uncached_reads = contextvars.ContextVar("uncached_reads", default=False)
+
+def cache_key_for(service, path, query):
+    """Normalize a request into (service, path, sorted query) and look up its TTL"""
+    key = (service, path, tuple(sorted(parse_qsl(query, keep_blank_values=True))))
+    for rule_service, pattern, ttl in CACHE_TTLS:
+        if rule_service == service and pattern.match(path):
+            return key, ttl
+    return key, CACHE_DEFAULT_TTL
+
+def resolve_endpoint(service, endpoint):
+    """Return (url, path, query) of an endpoint relative to the service's API root"""
+    base_url, _ = get_service_config(service)
+    if endpoint.startswith(base_url + "/"):
+        url = endpoint  # Absolute `next` link returned by a previous page
+        endpoint = endpoint[len(base_url) + 1:]
     else:
-        raise ValueError(f"Unknown service: {service}")
-    
-    if method == "GET":
-        response = requests.get(url, auth=auth)
-    elif method == "POST":
-        response = requests.post(url, auth=auth, json=data)
-    elif method == "PUT":
-        response = requests.put(url, auth=auth, json=data)
-    else:
+        url = f"{base_url}/{endpoint}"
+    path, _, query = endpoint.partition("?")
+    return url, path, query
+
+def make_request(service, method, endpoint, data=None):
+    """Make authenticated API request to Jira or Bitbucket"""
+    url, path, query = resolve_endpoint(service, endpoint)
+    
+    if method not in ("GET", "POST", "PUT"):
         raise ValueError(f"Unsupported HTTP method: {method}")
     
+    call = UpstreamCall(service, method, path, _current_span.get())
+    started = time.perf_counter()
+    try:
+        return fetch(service, method, url, path, query, data, call)
+    finally:
+        call.elapsed = time.perf_counter() - started
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.record(call)
+
+def request_items(service, endpoint, items_key):
+    """GET a list endpoint; returns (page, items) where items yields page[items_key] one at a time.
+    
+    Cached pages and bodies under STREAM_MIN_BYTES are decoded whole and cached
+    and coalesced as make_request would. Larger bodies are parsed from the
+    socket as items are consumed and never cached, so memory holds about one
+    item however long the page is; page then receives the other top-level
+    members (next, total) as they are read and is complete once items is
+    exhausted. Close items when stopping early.
+    """
+    url, path, query = resolve_endpoint(service, endpoint)
+    call = UpstreamCall(service, "GET", path, _current_span.get())
+    started = time.perf_counter()
+    try:
+        cache_key, ttl, validators = None, 0, None
+        uncached = _uncached_reads.get()
+        if CACHE_ENABLED and not uncached:
+            cache_key, ttl = cache_key_for(service, path, query)
+            cached, validators = response_cache.get(cache_key)
+            if cached is not _MISS:
+                call.cache = "hit"
+                return cached, (item for item in cached.get(items_key, []))
+            call.cache = "miss"
+        
+        def download_page():
+            return stream_download(service, url, call, items_key, cache_key, ttl, validators)
+        
+        if SINGLE_FLIGHT_ENABLED and not uncached:
+            (page, items), shared = single_flight.run(cache_key or cache_key_for(service, path, query)[0], download_page)
+            if shared and items is None:
+                call.cache = "coalesced"
+            elif shared:
+                # The leader's streamed body can only be read once; fetch our own
+                page, items = download_page()
+        else:
+            page, items = download_page()
+        return page, items if items is not None else (item for item in page.get(items_key, []))
+    finally:
+        call.elapsed = time.perf_counter() - started
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.record(call)
+
+def fetch(service, method, url, path, query, data, call):
+    """Serve a request from the response cache or send it, recording the outcome on call"""
+    cache_key, ttl, validators = None, 0, None
+    uncached = _uncached_reads.get()
+    if method == "GET" and CACHE_ENABLED and not uncached:
+        cache_key, ttl = cache_key_for(service, path, query)
+        cached, validators = response_cache.get(cache_key)
+        if cached is not _MISS:
+            call.cache = "hit"
+            return cached
+        call.cache = "miss"
+    
+    if method == "GET" and SINGLE_FLIGHT_ENABLED and not uncached:
+        key = cache_key or cache_key_for(service, path, query)[0]
+        result, shared = single_flight.run(key, lambda: download(service, method, url, data, call, cache_key, ttl, validators))
+        if shared:
+            call.cache = "coalesced"
+        return result
+    return download(service, method, url, data, call, cache_key, ttl, validators)
+
+def download(service, method, url, data, call, cache_key=None, ttl=0, validators=None):
+    """Send a request (conditional when validators are given), decode it and cache GET results"""
+    # Counted here rather than at lookup so callers coalesced onto this request are not
+    if cache_key is not None:
+        response_cache.miss(validators)
+    headers = conditional_headers(validators)
+    response = send_request(service, method, url, data if method != "GET" else None, headers, call)
+    call.status = response.status_code
+    
+    if response.status_code == 304 and cache_key is not None:
+        # Body unchanged: reuse the stored parsed object, no download or JSON decode
+        cached = response_cache.revalidated(cache_key, ttl)
+        if cached is not _MISS:
+            call.cache = "revalidated"
+            return cached
+        response = send_request(service, method, url, call=call)
+        call.status = response.status_code
+    
+    call.bytes = len(response.content)
     response.raise_for_status()
-    return response.json() if response.content else {}
+    started = time.perf_counter()
+    result = response.json() if response.content else {}
+    call.decode = time.perf_counter() - started
+    if cache_key is not None and ttl > 0:
+        response_cache.put(
+            cache_key, result, ttl, len(response.content),
+            response.headers.get("ETag"), response.headers.get("Last-Modified")
+        )
+    return result
+
+def conditional_headers(validators):
+    """If-None-Match / If-Modified-Since headers for a cached entry's (etag, last_modified)"""
+    headers = {}
+    if validators:
+        etag, last_modified = validators
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    return headers
+
+def stream_download(service, url, call, items_key, cache_key=None, ttl=0, validators=None):
+    """download() for request_items: (page, None) for a decoded page, or (page, items) reading a body of STREAM_MIN_BYTES or more"""
+    if cache_key is not None:
+        response_cache.miss(validators)
+    response = send_request(service, "GET", url, headers=conditional_headers(validators), call=call, stream=True)
+    call.status = response.status_code
+    
+    if response.status_code == 304 and cache_key is not None:
+        response.close()
+        cached = response_cache.revalidated(cache_key, ttl)
+        if cached is not _MISS:
+            call.cache = "revalidated"
+            return cached, None
+        response = send_request(service, "GET", url, call=call, stream=True)
+        call.status = response.status_code
+    
+    try:
+        response.raise_for_status()
+    except Exception:
+        response.close()
+        raise
+    
+    # A body that ends within STREAM_MIN_BYTES is decoded and cached as usual
+    chunks = response.iter_content(STREAM_CHUNK_BYTES)
+    head, size = [], 0
+    for chunk in chunks:
+        head.append(chunk)
+        size += len(chunk)
+        if size >= STREAM_MIN_BYTES:
+            break
+    else:
+        content = b"".join(head)
+        call.bytes = len(content)
+        started = time.perf_counter()
+        page = json.loads(content) if content else {}
+        call.decode = time.perf_counter() - started
+        if cache_key is not None and ttl > 0:
+            response_cache.put(
+                cache_key, page, ttl, len(content),
+                response.headers.get("ETag"), response.headers.get("Last-Modified")
+            )
+        return page, None
+    
+    call.bytes = size
+    page = {}
+    
+    def body():
+        while head:
+            yield head.pop(0)
+        while True:
+            started = time.perf_counter()
+            chunk = next(chunks, None)
+            # Reading the socket is wire time, not decode time
+            read = time.perf_counter() - started
+            call.wire += read
+            call.decode -= read
+            if chunk is None:
+                return
+            call.bytes += len(chunk)
+            yield chunk
+    
+    def items():
+        # Parsing happens as items are consumed, after request_items has recorded the call
+        parser = stream_items(body(), items_key, page)
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    item = next(parser)
+                except StopIteration:
+                    return
+                finally:
+                    spent = time.perf_counter() - started
+                    call.decode += spent
+                    call.elapsed += spent
+                yield item
+        finally:
+            parser.close()
+            response.close()
+    
+    return page, items()
+
+def get_metrics():
+    """Counters exposed through the get_metrics action"""
+    return {
+        "cache": response_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "scheduler": {service: stats.snapshot() for service, stats in scheduler_stats.items()},
+        "planner": planner_stats.snapshot()
+    }
+
+# ============================================================================
+# PAGINATION
+# ============================================================================
+
+def bitbucket_pagelen(limit, maximum=BITBUCKET_MAX_PAGELEN):
+    """Page size to request for a listing of `limit` items"""
+    return max(1, min(limit, maximum)) if limit else maximum
+
+class PagePosition:
+    """Where a paginated listing stopped: the page endpoint to fetch next and an offset into it.
+    
+    For Bitbucket the offset counts items of that page already returned; for Jira
+    it is the startAt value. endpoint is None once the listing is exhausted.
+    """
+    
+    __slots__ = ("endpoint", "offset")
+    
+    def __init__(self, endpoint=None, offset=0):
+        self.endpoint = endpoint
+        self.offset = offset
+
+def stream_items(chunks, items_key, page):
+    """Yield the elements of the top-level items_key array of a JSON object read from byte chunks.
+    
+    The object's other members are stored in page as they are read. Each value
+    is decoded with json's raw_decode once the text holding it has arrived, and
+    consumed text is dropped, so memory holds the unread remainder of a chunk
+    and one element rather than the whole document.
+    """
+    import codecs
+    
+    chunks = iter(chunks)
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer, pos, eof = "", 0, False
+    
+    def read_more():
+        nonlocal buffer, pos, eof
+        chunk = next(chunks, None)
+        eof = chunk is None
+        buffer = buffer[pos:] + text_decoder.decode(chunk or b"", final=eof)
+        pos = 0
+    
+    def next_char():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if eof:
+                raise ValueError("Unexpected end of JSON response")
+            read_more()
+    
+    def next_value():
+        nonlocal pos
+        next_char()
+        while True:
+            try:
+                value, end = JSON_DECODER.raw_decode(buffer, pos)
+            except ValueError:
+                if eof:
+                    raise
+                end = None
+            # A number may continue in the next chunk ("12" then ".5"), so a value
+            # counts only once the delimiter after it has arrived
+            if end is not None and (eof or (end < len(buffer) and buffer[end] in VALUE_DELIMITERS)):
+                pos = end
+                return value
+            # Read until the pending text doubles, so a long value is re-scanned only a few times
+            wanted = 2 * (len(buffer) - pos)
+            read_more()
+            while not eof and len(buffer) < wanted:
+                read_more()
+    
+    def expect(char):
+        nonlocal pos
+        if next_char() != char:
+            raise ValueError(f"Expected {char!r} at {buffer[pos:pos + 20]!r}")
+        pos += 1
+    
+    expect("{")
+    while next_char() != "}":
+        key = next_value()
+        expect(":")
+        if key == items_key and next_char() == "[":
+            pos += 1
+            while next_char() != "]":
+                yield next_value()
+                if next_char() == ",":
+                    pos += 1
+            pos += 1
+        else:
+            page[key] = next_value()
+        if next_char() == ",":
+            pos += 1
+
+JSON_DECODER = json.JSONDecoder()
+# Characters that can follow a complete JSON value
+VALUE_DELIMITERS = frozenset(" \t\r\n,]}:")
+
+def clip_free_text(text, limit):
+    """Cut text to about limit characters at a word break; references in the cut part are kept after the ellipsis"""
+    if not isinstance(text, str) or len(text) <= limit:
+        return text
+    cut = max(text.rfind(" ", 0, limit), text.rfind("\n", 0, limit))
+    cut = cut if cut > 0 else limit
+    tail = scan_references(text[cut:])
+    return " ".join([text[:cut] + " …", *tail.jira_keys, *tail.repos, *tail.branches, *tail.pr_urls])
+
+def clip_streamed_item(item):
+    """Copy of a listed item with long descriptions / commit messages clipped to STREAM_TEXT_MAX_CHARS"""
+    for holder in ("fields", None):
+        target = item.get(holder) if holder else item
+        if not isinstance(target, dict):
+            continue
+        clipped = {
+            name: clip_free_text(target[name], STREAM_TEXT_MAX_CHARS)
+            for name in ("description", "message")
+            if isinstance(target.get(name), str) and len(target[name]) > STREAM_TEXT_MAX_CHARS
+        }
+        if clipped:
+            # Never modify the item in place: it may belong to a cached page
+            target = dict(target, **clipped)
+            item = dict(item, **{holder: target}) if holder else target
+    return item
+
+def list_page(service, endpoint, items_key, stream=False):
+    """(page, items generator) of one list page, streamed through request_items when enabled"""
+    if stream and STREAM_RESPONSES:
+        page, items = request_items(service, endpoint, items_key)
+        
+        def clipped():
+            try:
+                for item in items:
+                    yield clip_streamed_item(item)
+            finally:
+                items.close()
+        
+        return page, clipped()
+    page = make_request(service, "GET", endpoint)
+    return page, (item for item in page.get(items_key, []))
+
+def paginate_bitbucket(endpoint, limit=None, offset=0, position=None, stream=False):
+    """Yield items from a Bitbucket list endpoint, following `next` links lazily.
+    
+    Only one page is held in memory at a time and no further pages are
+    requested once `limit` items have been consumed. Starts `offset` items into
+    the first page; if given, `position` tracks where the listing stopped.
+    stream=True reads pages through request_items (see list_page).
+    """
+    position = position or PagePosition()
+    count = 0
+    deadline = current_deadline()
+    while endpoint:
+        position.endpoint, position.offset = endpoint, offset
+        if count and deadline.expired():
+            raise DeadlineExceeded("Invocation deadline reached between pages")
+        page, items = list_page("bitbucket", endpoint, "values", stream)
+        try:
+            for index, item in enumerate(items):
+                if index < offset:
+                    continue
+                if limit is not None and count >= limit:
+                    position.offset = index
+                    return
+                yield item
+                count += 1
+        finally:
+            items.close()
+        endpoint, offset = page.get("next"), 0
+        if limit is not None and count >= limit:
+            break
+    position.endpoint, position.offset = endpoint, 0
+
+def paginate_jira(endpoint, items_key="issues", limit=None, offset=0, position=None, stream=False):
+    """Yield items from a Jira list endpoint using startAt / maxResults / total paging"""
+    position = position or PagePosition()
+    separator = "&" if "?" in endpoint else "?"
+    start_at = offset
+    count = 0
+    deadline = current_deadline()
+    while limit is None or count < limit:
+        position.endpoint, position.offset = endpoint, start_at
+        if count and deadline.expired():
+            raise DeadlineExceeded("Invocation deadline reached between pages")
+        page_size = JIRA_MAX_RESULTS if limit is None else min(JIRA_MAX_RESULTS, limit - count)
+        page, items = list_page("jira", f"{endpoint}{separator}startAt={start_at}&maxResults={page_size}", items_key, stream)
+        received = 0
+        try:
+            for item in items:
+                yield item
+                received += 1
+        finally:
+            items.close()
+        count += received
+        start_at += received
+        if not received or start_at >= page.get("total", 0):
+            position.endpoint = None
+            return
+    position.offset = start_at
+
+# ============================================================================
+# CONCURRENCY & DEADLINES
+# ============================================================================
+
+class Deadline:
+    """Point in time by which the current invocation must have produced a result"""
+    
+    def __init__(self, seconds=None):
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+    
+    @classmethod
+    def from_context(cls, context, margin_ms=DEADLINE_SAFETY_MARGIN_MS):
+        """Build a deadline from the Lambda context, keeping a margin to serialize the response"""
+        if context is None or not hasattr(context, "get_remaining_time_in_millis"):
+            return cls()
+        return cls(max(0, context.get_remaining_time_in_millis() - margin_ms) / 1000)
+    
+    def remaining(self):
+        """Seconds left, or None when there is no deadline"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    def expired(self):
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+    
+    def request_timeout(self, connect=None, read=None):
+        """(connect, read) timeouts for one HTTP call, capped by the time left.
+        
+        Raises DeadlineExceeded when too little time remains to start a request.
+        """
+        connect = HTTP_CONNECT_TIMEOUT if connect is None else connect
+        read = HTTP_READ_TIMEOUT if read is None else read
+        remaining = self.remaining()
+        if remaining is None:
+            return connect, read
+        if remaining < MIN_REQUEST_BUDGET:
+            raise DeadlineExceeded("No time left in the invocation deadline for another request")
+        return min(connect, remaining), min(read, remaining)
+
+_current_deadline = contextvars.ContextVar("deadline", default=None)
+
+def current_deadline():
+    """Return the deadline of the running invocation (unbounded outside Lambda)"""
+    return _current_deadline.get() or Deadline()
+
+def worker_context(deadline):
+    """Copy of the caller's context (trace, span) for a worker thread, bound to deadline"""
+    context = contextvars.copy_context()
+    context.run(_current_deadline.set, deadline)
+    return context
+
+def until_deadline(deadline, fn, *args):
+    """Run fn(*args) unless the deadline already passed while it was queued"""
+    if deadline.expired():
+        raise DeadlineExceeded("Invocation deadline reached before the task started")
+    return fn(*args)
+
+class FanOutResult:
+    """Outcome of fan_out: per-item results in input order plus truncation info"""
+    
+    def __init__(self, items):
+        self.items = items
+        self.results = [None] * len(items)
+        self.done = [False] * len(items)
+        self.errors = {}
+        self.completed = 0
+        self.truncated = False
+    
+    @property
+    def pending(self):
+        return len(self.items) - self.completed
+    
+    def unfinished(self):
+        """Items to retry in a later invocation: never finished, or stopped by the deadline"""
+        return [
+            item for index, item in enumerate(self.items)
+            if not self.done[index] or isinstance(self.errors.get(index), DeadlineExceeded)
+        ]
+    
+    def values(self):
+        """Yield (item, result) for items that finished without an error"""
+        for index, item in enumerate(self.items):
+            if self.results[index] is not None:
+                yield item, self.results[index]
+
+def fan_out(fn, items, max_workers=None, deadline=None):
+    """Run fn(item) for every item with bounded concurrency until the deadline.
+    
+    Items still running or queued when the deadline passes are abandoned and the
+    result is marked truncated, so callers can return partial output instead of
+    hitting the Lambda timeout. Exceptions are collected per item. Abandoned
+    workers are not joined, but they run under the same deadline: a request in
+    flight times out with it and any further request raises DeadlineExceeded,
+    so they cannot keep calling upstream into the next invocation.
+    """
+    items = list(items)
+    outcome = FanOutResult(items)
+    if not items:
+        return outcome
+    
+    deadline = deadline or current_deadline()
+    workers = max(1, min(max_workers or FANOUT_MAX_WORKERS, len(items)))
+    from concurrent.futures import ThreadPoolExecutor, wait
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fan-out")
+    
+    futures = {}
+    for index, item in enumerate(items):
+        futures[executor.submit(worker_context(deadline).run, until_deadline, deadline, fn, item)] = index
+    
+    done, not_done = wait(futures, timeout=deadline.remaining())
+    for future in done:
+        index = futures[future]
+        outcome.done[index] = True
+        outcome.completed += 1
+        error = future.exception()
+        if error is not None:
+            outcome.errors[index] = error
+        else:
+            outcome.results[index] = future.result()
+    
+    outcome.truncated = bool(not_done)
+    executor.shutdown(wait=not not_done, cancel_futures=True)
+    return outcome
+
+class FetchPlan:
+    """Named fetch steps, each started as soon as the steps it depends on have finished.
+    
+    A running step may add further steps (e.g. one per repository once the
+    listing is in). Independent steps run concurrently, so the plan takes as
+    long as its slowest dependency chain. A step whose dependency failed fails
+    too; steps not finished at the deadline are abandoned and the plan is
+    marked truncated.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.steps = {}
+        self.results = {}
+        self.errors = {}
+        self.skipped = set()  # Steps not run because a dependency failed
+        self.truncated = False
+    
+    def add(self, name, fn, after=()):
+        """Add step name, called as fn(*results of the after steps)"""
+        with self.lock:
+            self.steps[name] = (fn, tuple(after))
+    
+    def pending(self):
+        """Steps that neither finished nor failed"""
+        return [name for name in self.steps if name not in self.results and name not in self.errors and name not in self.skipped]
+    
+    def run(self, max_workers=None, deadline=None):
+        deadline = deadline or current_deadline()
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+        executor = ThreadPoolExecutor(max_workers=max_workers or FANOUT_MAX_WORKERS, thread_name_prefix="fetch-plan")
+        running = {}
+        started = set()
+        while True:
+            with self.lock:
+                steps = list(self.steps.items())
+            for name, (fn, after) in steps:
+                if name in started:
+                    continue
+                if any(step in self.errors or step in self.skipped for step in after):
+                    started.add(name)
+                    self.skipped.add(name)
+                elif all(step in self.results for step in after):
+                    started.add(name)
+                    running[executor.submit(worker_context(deadline).run, until_deadline, deadline, fn,
+                                            *[self.results[step] for step in after])] = name
+            if not running:
+                break
+            done, _ = wait(running, timeout=deadline.remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                self.truncated = True
+                break
+            for future in done:
+                name = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    self.errors[name] = error
+                else:
+                    self.results[name] = future.result()
+        
+        executor.shutdown(wait=not running, cancel_futures=True)
+        return self
+
+def collect(items, build):
+    """Map items to records until the iterator ends or the deadline cuts it short; returns (records, truncated)"""
+    records = []
+    try:
+        for item in items:
+            records.append(build(item))
+    except DeadlineExceeded:
+        return records, True
+    return records, False
+
+def cursor_signature(payload):
+    """Truncated HMAC-SHA256 of a cursor payload; the key is shared by every container of the function"""
+    import hashlib
+    import hmac
+    secret = CURSOR_SECRET or hashlib.sha256(f"{JIRA_API_TOKEN}:{BITBUCKET_APP_PASSWORD}".encode()).hexdigest()
+    digest = hmac.new(secret.encode(), payload.encode(), hashlib.sha256).digest()[:16]
+    return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+def encode_cursor(tool, state):
+    """Opaque, signed continuation token for resuming a tool call in a later invocation"""
+    payload = json.dumps({"tool": tool, **state}, separators=(",", ":"), sort_keys=True)
+    payload = base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+    return f"{payload}.{cursor_signature(payload)}"
+
+def decode_cursor(tool, cursor):
+    """Return the state stored in a cursor from encode_cursor.
+    
+    Raises ValueError for malformed or tampered cursors and cursors issued by another tool.
+    """
+    import hmac
+    payload, _, signature = cursor.rpartition(".")
+    if not payload or not hmac.compare_digest(signature, cursor_signature(payload)):
+        raise ValueError("Invalid cursor")
+    state = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    if not isinstance(state, dict) or state.pop("tool", None) != tool:
+        raise ValueError(f"Cursor does not belong to {tool}")
+    return state
+
+def listing_cursor(tool, position, **filters):
+    """Cursor for the rest of a paginated listing, or None once it is exhausted.
+    
+    The base URL and the fields= projection are left out to keep cursors short;
+    resume_listing puts them back.
+    """
+    if position.endpoint is None:
+        return None
+    endpoint = position.endpoint
+    for service in ("bitbucket", "jira"):
+        base_url, _ = get_service_config(service)
+        if endpoint.startswith(base_url + "/"):
+            endpoint = endpoint[len(base_url) + 1:]
+    path, _, query = endpoint.partition("?")
+    query = urlencode([(name, value) for name, value in parse_qsl(query, keep_blank_values=True) if name != "fields"])
+    return encode_cursor(tool, {"endpoint": f"{path}?{query}", "offset": position.offset, **filters})
+
+def resume_listing(tool, resource, cursor):
+    """Decode a listing_cursor; returns (state, endpoint, offset)"""
+    state = decode_cursor(tool, cursor)
+    return state, state["endpoint"] + tool_fields(tool, resource), state["offset"]
+
+# ============================================================================
+# RESULT RECORDS & RENDERING
+# ============================================================================
+
+OUTPUT_FORMATS = ("text", "json", "summary")
+# Rough characters-per-token ratio used to keep summaries inside SUMMARY_TOKEN_BUDGET
+CHARS_PER_TOKEN = 4
+MAIN_BRANCHES = ("main", "master", "develop")
+
+def clip(text, width=72):
+    """Shorten text to one line of at most width characters"""
+    text = " ".join((text or "").split())
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+# Shown when a listing stops early because the invocation deadline is near
+DEADLINE_NOTE = "⚠️ Partial results: stopped before the invocation deadline."
+
+def tag_list(icon, values):
+    return f" [{icon} {', '.join(values)}]" if values else ""
+
+class Record:
+    """Typed tool result. Fields are declared in __slots__; TEXT_ONLY fields only frame the text rendering"""
+    
+    __slots__ = ()
+    TEXT_ONLY = ()
+    
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+    
+    def to_dict(self):
+        """Compact form: unset and empty fields are left out"""
+        data = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if name in self.TEXT_ONLY or value is None or value == "" or value == []:
+                continue
+            if isinstance(value, list):
+                value = [item.to_dict() if isinstance(item, Record) else item for item in value]
+            data[name] = value
+        return data
+    
+    def summary_lines(self):
+        return [self.text()]
+
+class IssueRecord(Record):
+    __slots__ = ("key", "summary", "status", "assignee", "repos")
+    
+    def text(self):
+        return f"• {self.key}: {self.summary} [{self.status}] - {self.assignee or 'Unassigned'}{tag_list('🔗', self.repos)}"
+    
+    def brief(self):
+        return f"{self.key} [{self.status}] {clip(self.summary)}"
+
+class RepositoryRecord(Record):
+    __slots__ = ("name", "full_name", "language", "is_private", "jira_keys")
+    
+    def text(self):
+        visibility = "🔒 Private" if self.is_private else "🌐 Public"
+        return f"• {self.name} ({self.language}) - {visibility}{tag_list('🎫', self.jira_keys)}"
+    
+    def brief(self):
+        return self.name
+
+class PullRequestRecord(Record):
+    __slots__ = ("id", "repo", "title", "author", "source_branch", "dest_branch", "jira_keys")
+    
+    def text(self):
+        return (f"• PR #{self.id}: {self.title}\n  {self.source_branch} → {self.dest_branch} "
+                f"by {self.author}{tag_list('🎫', self.jira_keys)}")
+    
+    def brief(self):
+        return f"#{self.id} {clip(self.title)}"
+
+class BranchRecord(Record):
+    __slots__ = ("name", "repo")
+    
+    def text(self):
+        return f"• {'🌟 ' if self.name in MAIN_BRANCHES else ''}{self.name}"
+    
+    def brief(self):
+        return self.name
+
+class CommitRecord(Record):
+    __slots__ = ("hash", "repo", "message", "author", "jira_keys")
+    
+    def text(self):
+        return f"• {self.hash[:8]}: {self.message} - {self.author}{tag_list('🎫', self.jira_keys)}"
+    
+    def brief(self):
+        return f"{self.hash[:8]} {clip(self.message)}"
+
+class Listing(Record):
+    """Records returned by a list tool, with the heading / empty message used for text"""
+    
+    __slots__ = ("kind", "items", "notes", "cursor", "heading", "empty")
+    TEXT_ONLY = ("heading", "empty")
+    
+    def to_dict(self):
+        """Columnar form: one column list plus a row per record; values every row shares are hoisted out"""
+        rows = [item.to_dict() for item in self.items]
+        columns = [name for name in type(self.items[0]).__slots__ if any(name in row for row in rows)] if rows else []
+        shared = {}
+        if len(rows) > 1:
+            shared = {name: rows[0][name] for name in columns if all(name in row and row[name] == rows[0][name] for row in rows)}
+            columns = [name for name in columns if name not in shared]
+        
+        data = {"kind": self.kind, "count": len(rows)}
+        if shared:
+            data["shared"] = shared
+        data["columns"] = columns
+        data["rows"] = [[row.get(name) for name in columns] for row in rows]
+        if self.notes:
+            data["notes"] = self.notes
+        if self.cursor:
+            data["cursor"] = self.cursor
+        return data
+    
+    def text(self):
+        notes = "".join(f"\n\n{note}" for note in self.notes or ())
+        if self.cursor:
+            notes += f"\n\n⏭️ Resume with cursor: {self.cursor}"
+        if not self.items:
+            return self.empty + notes
+        return f"{self.heading}\n\n" + "\n".join(item.text() for item in self.items) + notes
+    
+    def summary_lines(self):
+        extra = list(self.notes or ()) + ([f"cursor: {self.cursor}"] if self.cursor else [])
+        if not self.items:
+            return [self.empty] + extra
+        return [f"{len(self.items)} {self.kind}:"] + extra + [item.brief() for item in self.items]
+
+class CrossReferences(Record):
+    """PRs, branches and commits related to one Jira issue"""
+    
+    __slots__ = ("issue_key", "summary", "pull_requests", "branches", "commits", "notes", "cursor", "empty")
+    TEXT_ONLY = ("empty",)
+    
+    def sections(self):
+        return [
+            ("🔗 Related Pull Requests:", [f"PR #{pr.id} in {pr.repo}: {pr.title}" for pr in self.pull_requests or ()]),
+            ("🌿 Related Branches:", [f"{branch.name} in {branch.repo}" for branch in self.branches or ()]),
+            ("📝 Related Commits:", [f"{commit.hash[:8]} in {commit.repo}: {commit.message}" for commit in self.commits or ()]),
+        ]
+    
+    def text(self):
+        result = f"Cross-references for {self.issue_key}:\n📋 Issue: {self.summary}\n"
+        sections = [(heading, lines) for heading, lines in self.sections() if lines]
+        if not sections:
+            result += f"\n{self.empty}"
+        for heading, lines in sections:
+            result += f"\n{heading}\n" + "\n".join(f"• {line}" for line in lines) + "\n"
+        result = result.rstrip("\n") + "".join(f"\n\n{note}" for note in self.notes or ())
+        if self.cursor:
+            result += f"\n⏭️ Resume with cursor: {self.cursor}"
+        return result
+    
+    def summary_lines(self):
+        lines = [f"{self.issue_key}: {clip(self.summary)}"] + list(self.notes or ())
+        lines += [f"PR {pr.repo}#{pr.id} {clip(pr.title)}" for pr in self.pull_requests or ()]
+        lines += [f"branch {branch.repo}:{branch.name}" for branch in self.branches or ()]
+        lines += [f"commit {commit.repo}@{commit.hash[:8]} {clip(commit.message)}" for commit in self.commits or ()]
+        if self.cursor:
+            lines.insert(1 + len(self.notes or ()), f"cursor: {self.cursor}")
+        return lines if len(lines) > 1 + len(self.notes or ()) else lines + [self.empty]
+
+class IssueDossier(Record):
+    """One Jira issue with the PRs, branches and commits that reference it"""
+    
+    __slots__ = ("issue_key", "summary", "status", "assignee", "pull_requests", "branches", "commits", "error")
+    
+    sections = CrossReferences.sections
+    
+    def text(self):
+        if self.error:
+            return f"❌ {self.issue_key}: {self.error}"
+        status = f" [{self.status}]" if self.status else ""
+        result = f"📋 {self.issue_key}: {self.summary}{status} - {self.assignee or 'Unassigned'}"
+        sections = [(heading, lines) for heading, lines in self.sections() if lines]
+        if not sections:
+            result += "\nNo related pull requests, branches or commits found."
+        for heading, lines in sections:
+            result += f"\n{heading}\n" + "\n".join(f"• {line}" for line in lines)
+        return result
+    
+    def summary_lines(self):
+        if self.error:
+            return [f"{self.issue_key}: ❌ {self.error}"]
+        lines = [f"{self.issue_key} [{self.status or '?'}] {clip(self.summary)}"]
+        lines += [f"PR {pr.repo}#{pr.id} {clip(pr.title)}" for pr in self.pull_requests or ()]
+        lines += [f"branch {branch.repo}:{branch.name}" for branch in self.branches or ()]
+        lines += [f"commit {commit.repo}@{commit.hash[:8]} {clip(commit.message)}" for commit in self.commits or ()]
+        return lines
+
+class Dossier(Record):
+    """Dossiers for the requested issues, in request order"""
+    
+    __slots__ = ("issues", "notes")
+    
+    def text(self):
+        return "\n\n".join(issue.text() for issue in self.issues) + "".join(f"\n\n{note}" for note in self.notes or ())
+    
+    def summary_lines(self):
+        return list(self.notes or ()) + [line for issue in self.issues for line in issue.summary_lines()]
+
+class CreatedIssue(Record):
+    __slots__ = ("key", "summary", "issue_type", "bitbucket_repo")
+    
+    def text(self):
+        result = f"✅ Created issue: {self.key}\nTitle: {self.summary}\nType: {self.issue_type}"
+        if self.bitbucket_repo:
+            result += f"\n🔗 Linked to repository: {self.bitbucket_repo}"
+        return result
+
+class CreatedPullRequest(Record):
+    __slots__ = ("id", "repo", "title", "source_branch", "dest_branch", "jira_issue")
+    
+    def text(self):
+        result = f"✅ Created pull request: #{self.id}\nTitle: {self.title}\n{self.source_branch} → {self.dest_branch}"
+        if self.jira_issue:
+            result += f"\n🎫 Linked to Jira issue: {self.jira_issue}"
+        return result
+
+class BulkItem(Record):
+    """Outcome of one item of a bulk create: created, existing (an earlier attempt made it), failed or pending"""
+    
+    __slots__ = ("index", "status", "key", "id", "repo", "title", "jira_issue", "error")
+    
+    STATUS_ICONS = {"created": "✅", "existing": "♻️", "failed": "❌", "pending": "⏳"}
+    
+    def label(self):
+        if self.key:
+            return self.key
+        if self.id is not None:
+            return f"{self.repo} #{self.id}"
+        return f"{self.repo} item {self.index}" if self.repo else f"item {self.index}"
+    
+    def text(self):
+        line = f"{self.STATUS_ICONS[self.status]} {self.label()}: {self.title}{tag_list('🎫', [self.jira_issue] if self.jira_issue else [])}"
+        return f"{line}\n  {self.error}" if self.error else line
+    
+    def brief(self):
+        return f"{self.status} {self.label()} {clip(self.title or '')}"
+
+class BulkResult(Record):
+    """Per-item outcomes of a bulk create, in input order"""
+    
+    __slots__ = ("kind", "items", "notes")
+    
+    def counts(self):
+        counts = {}
+        for item in self.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return counts
+    
+    def heading(self):
+        counts = ", ".join(f"{count} {status}" for status, count in self.counts().items())
+        return f"Bulk create of {len(self.items)} {self.kind}: {counts}"
+    
+    def to_dict(self):
+        data = super().to_dict()
+        data["counts"] = self.counts()
+        return data
+    
+    def text(self):
+        notes = "".join(f"\n\n{note}" for note in self.notes or ())
+        return f"{self.heading()}\n\n" + "\n".join(item.text() for item in self.items) + notes
+    
+    def summary_lines(self):
+        return [self.heading()] + list(self.notes or ()) + [item.brief() for item in self.items]
+
+class Failure(Record):
+    __slots__ = ("error",)
+    
+    def text(self):
+        return f"❌ {self.error}"
+
+def summarize(result, budget):
+    """One line per record, cut off once the approximate token budget is spent"""
+    lines = result.summary_lines()
+    limit = budget * CHARS_PER_TOKEN
+    kept = []
+    used = 0
+    for index, line in enumerate(lines):
+        if kept and used + len(line) + 1 > limit:
+            kept.append(f"… +{len(lines) - index} more")
+            break
+        kept.append(line)
+        used += len(line) + 1
+    return "\n".join(kept)
+
+def render(result, output_format="text"):
+    """Render a result record as the emoji text, compact JSON or a token-budgeted summary"""
+    started = time.perf_counter()
+    try:
+        if output_format == "json":
+            return json.dumps(result.to_dict(), separators=(",", ":"), ensure_ascii=False)
+        if output_format == "summary":
+            return summarize(result, SUMMARY_TOKEN_BUDGET)
+        if output_format == "text":
+            return result.text()
+        return Failure(error=f"Unknown output_format: {output_format} (expected {', '.join(OUTPUT_FORMATS)})").text()
+    finally:
+        span = _current_span.get()
+        if span is not None:
+            span.render += time.perf_counter() - started
+            # Tools report failures as rendered records rather than exceptions
+            span.error = span.error or isinstance(result, Failure)
+
+# ============================================================================
+# IDEMPOTENCY
+# ============================================================================
+
+# Prefix of the token stored on objects created by the bulk tools (Jira label, PR description line)
+IDEMPOTENCY_MARKER = "mcp-idem-"
+
+def idempotency_tokens(batch_key, items):
+    """Stable token per bulk item, or None for items without a key.
+    
+    An item's own idempotency_key wins; otherwise the batch key is combined
+    with the item's content (and its occurrence, for identical items), so a
+    retried batch maps every item to the same token whatever its position.
+    """
+    import hashlib
+    tokens = []
+    seen = {}
+    for item in items:
+        key = item.get("idempotency_key") if isinstance(item, dict) else None
+        if not key and batch_key:
+            content = json.dumps(item, sort_keys=True)
+            seen[content] = seen.get(content, 0) + 1
+            key = f"{batch_key}\n{content}\n{seen[content]}"
+        tokens.append(IDEMPOTENCY_MARKER + hashlib.sha256(str(key).encode()).hexdigest()[:24] if key else None)
+    return tokens
+
+class IdempotencyStore:
+    """Bulk items created in this container, by idempotency token (TTL + LRU).
+    
+    Answers a retry that lands on the same warm container without an upstream
+    lookup; the token stored on the created object covers retries elsewhere.
+    """
+    
+    def __init__(self, ttl, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, token):
+        """Fields of the item created for token, or None"""
+        with self.lock:
+            entry = self.entries.get(token)
+            if entry is None:
+                return None
+            fields, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self.entries[token]
+                return None
+            return fields
+    
+    def put(self, token, fields):
+        with self.lock:
+            self.entries[token] = (fields, time.monotonic() + self.ttl)
+            self.entries.move_to_end(token)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+idempotency_store = IdempotencyStore(IDEMPOTENCY_TTL)
+
+def remembered_item(index, token):
+    """BulkItem for an item this container already created under token, or None"""
+    fields = idempotency_store.get(token) if token else None
+    return BulkItem(index=index, status="existing", **fields) if fields else None
+
+def created_item(index, token, **fields):
+    """BulkItem for a newly created object, remembered under its token"""
+    if token:
+        idempotency_store.put(token, fields)
+    return BulkItem(index=index, status="created", **fields)
+
+def unfinished_item(index, error, **fields):
+    """BulkItem for work that raised (failed) or was cut off by the deadline.
+    
+    Deadline cut-offs are reported as pending: a request that was already sent
+    may still have gone through, which a retry with the same key sorts out.
+    """
+    if error is not None and not isinstance(error, DeadlineExceeded):
+        return BulkItem(index=index, status="failed", error=str(error), **fields)
+    return BulkItem(index=index, status="pending", error="Not confirmed before the invocation deadline; retry with the same idempotency key", **fields)
 
 # ============================================================================
 # JIRA OPERATIONS
 # ============================================================================
 
-def search_jira_issues(jql, max_results=10):
+def search_jira_issues(jql, max_results=10, cursor=None, output_format="text"):
     """Search Jira issues using JQL"""
     try:
-        response = make_request("jira", "GET", f"search?jql={quote(jql)}&maxResults={max_results}")
-        
-        if not response.get("issues"):
-            return "No issues found matching the query."
-        
-        results = []
-        for issue in response["issues"]:
-            key = issue["key"]
-            summary = issue["fields"]["summary"]
-            status = issue["fields"]["status"]["name"]
-            assignee = issue["fields"].get("assignee")
-            assignee_name = assignee["displayName"] if assignee else "Unassigned"
-            
-            # Look for Bitbucket references in description
-            description = issue["fields"].get("description", "")
-            bitbucket_refs = extract_bitbucket_references(description)
-            bitbucket_info = f" [🔗 {', '.join(bitbucket_refs)}]" if bitbucket_refs else ""
-            
-            results.append(f"• {key}: {summary} [{status}] - {assignee_name}{bitbucket_info}")
+        if cursor:
+            _, endpoint, offset = resume_listing("search_jira_issues", "issues", cursor)
+        else:
+            endpoint, offset = f"search?jql={quote(jql)}{tool_fields('search_jira_issues', 'issues')}", 0
+        
+        # Repo mentions are checked against the workspace listing, fetched only once a description has one
+        listing = {}
         
-        return f"Found {len(results)} issue(s):\n\n" + "\n".join(results)
+        def known(repos):
+            if repos and not listing:
+                try:
+                    listing["repos"] = workspace_repositories()
+                except Exception as e:
+                    listing["error"] = e
+            if not repos or "error" in listing:
+                return repos
+            return [repo for repo in repos if is_known_repo(repo, listing["repos"])]
+        
+        def build(issue):
+            fields = issue["fields"]
+            assignee = fields.get("assignee")
+            return IssueRecord(
+                key=issue["key"],
+                summary=fields["summary"],
+                status=fields["status"]["name"],
+                assignee=assignee["displayName"] if assignee else None,
+                # Look for Bitbucket references in description
+                repos=known(extract_bitbucket_references(fields.get("description", "")))
+            )
+        
+        position = PagePosition()
+        issues, truncated = collect(paginate_jira(endpoint, "issues", max_results, offset, position, stream=True), build)
+        notes = [DEADLINE_NOTE] if truncated else []
+        if "error" in listing:
+            notes.append(f"⚠️ Repository references not checked against the workspace: {listing['error']}")
+        
+        return render(Listing(
+            kind="issues", items=issues, notes=notes,
+            cursor=listing_cursor("search_jira_issues", position),
+            heading=f"Found {len(issues)} issue(s):",
+            empty="No issues found matching the query."
+        ), output_format)
+    
+    except Exception as e:
+        return render(Failure(error=f"Error searching issues: {str(e)}"), output_format)
+
+def jira_issue_fields(project_key, summary, description="", issue_type="Task", bitbucket_repo=None, branch=None):
+    """Fields of a new issue, with Bitbucket references appended to the description"""
+    if bitbucket_repo or branch:
+        bitbucket_section = "\n\n--- Bitbucket References ---\n"
+        if bitbucket_repo:
+            bitbucket_section += f"Repository: {bitbucket_repo}\n"
+        if branch:
+            bitbucket_section += f"Branch: {branch}\n"
+        description += bitbucket_section
+    
+    return {
+        "project": {"key": project_key},
+        "summary": summary,
+        "description": description,
+        "issuetype": {"name": issue_type}
+    }
+
+def create_jira_issue(project_key, summary, description="", issue_type="Task", bitbucket_repo=None, branch=None, output_format="text"):
+    """Create a new Jira issue with optional Bitbucket references"""
+    try:
+        issue_data = {"fields": jira_issue_fields(project_key, summary, description, issue_type, bitbucket_repo, branch)}
+        
+        response = make_request("jira", "POST", "issue", issue_data)
+        
+        # New issues can match any cached JQL search
+        response_cache.invalidate("jira", "search")
+        
+        return render(CreatedIssue(
+            key=response.get("key"), summary=summary, issue_type=issue_type, bitbucket_repo=bitbucket_repo
+        ), output_format)
+    
+    except Exception as e:
+        return render(Failure(error=f"Error creating issue: {str(e)}"), output_format)
+
+def jira_error_text(element_errors):
+    """Flatten a Jira error collection ({errorMessages, errors: {field: message}}) into one line"""
+    messages = list(element_errors.get("errorMessages") or ())
+    messages += [f"{field}: {message}" for field, message in (element_errors.get("errors") or {}).items()]
+    return "; ".join(messages) or "Rejected by Jira"
+
+def find_marked_issues(tokens):
+    """Issues an earlier attempt created, found by their idempotency label; returns {token: issue}"""
+    found = {}
+    wanted = set(tokens)
+    # A cached or shared search could predate that attempt's writes
+    uncached = _uncached_reads.set(True)
+    try:
+        for start in range(0, len(tokens), JIRA_BULK_MAX):
+            labels = ", ".join(f'"{token}"' for token in tokens[start:start + JIRA_BULK_MAX])
+            endpoint = f"search?jql={quote(f'labels in ({labels})')}{tool_fields('create_jira_issues_bulk', 'issues')}"
+            for issue in paginate_jira(endpoint, "issues"):
+                for label in issue["fields"].get("labels") or ():
+                    if label in wanted:
+                        found[label] = issue
+    finally:
+        _uncached_reads.reset(uncached)
+    return found
+
+def submit_issue_chunk(chunk):
+    """POST one issue/bulk request for [(index, token, fields)]; returns a BulkItem per element, in order"""
+    body = {"issueUpdates": [{"fields": fields} for _, _, fields in chunk]}
+    try:
+        response = make_request("jira", "POST", "issue/bulk", body)
+    except http_library().HTTPError as e:
+        # Jira answers 400 when every element failed, with the same per-element error list
+        try:
+            response = e.response.json() if e.response is not None and e.response.status_code == 400 else None
+        except ValueError:
+            response = None
+        if not isinstance(response, dict) or not response.get("errors"):
+            raise
     
-    except Exception as e:
-        return f"❌ Error searching issues: {str(e)}"
+    # issues lists the created elements in order; errors point at the others by position
+    failures = {error.get("failedElementNumber"): jira_error_text(error.get("elementErrors") or {}) for error in response.get("errors") or ()}
+    created = iter(response.get("issues") or ())
+    results = []
+    for position, (index, token, fields) in enumerate(chunk):
+        if position in failures:
+            results.append(BulkItem(index=index, status="failed", title=fields["summary"], error=failures[position]))
+        else:
+            issue = next(created, None) or {}
+            results.append(created_item(index, token, key=issue.get("key"), title=fields["summary"]))
+    return results
 
-def create_jira_issue(project_key, summary, description="", issue_type="Task", bitbucket_repo=None, branch=None):
-    """Create a new Jira issue with optional Bitbucket references"""
+def create_jira_issues_bulk(issues, idempotency_key=None, output_format="text"):
+    """Create many Jira issues through issue/bulk, reporting each one's outcome.
+    
+    Items take the create_jira_issue arguments. With an idempotency key (per
+    item or for the batch) each issue is labelled with its token, and items an
+    earlier attempt already created are reported as existing, not created again.
+    """
     try:
-        # Add Bitbucket references to description if provided
-        if bitbucket_repo or branch:
-            bitbucket_section = "\n\n--- Bitbucket References ---\n"
-            if bitbucket_repo:
-                bitbucket_section += f"Repository: {bitbucket_repo}\n"
-            if branch:
-                bitbucket_section += f"Branch: {branch}\n"
-            description += bitbucket_section
-        
-        issue_data = {
-            "fields": {
-                "project": {"key": project_key},
-                "summary": summary,
-                "description": description,
-                "issuetype": {"name": issue_type}
-            }
-        }
+        if not isinstance(issues, list) or not issues:
+            return render(Failure(error="issues must be a non-empty list of issue objects"), output_format)
         
-        response = make_request("jira", "POST", "issue", issue_data)
-        issue_key = response.get("key")
+        items = [None] * len(issues)
+        pending = []  # (index, token, fields) still to submit
+        for index, (issue, token) in enumerate(zip(issues, idempotency_tokens(idempotency_key, issues))):
+            summary = issue.get("summary") if isinstance(issue, dict) else None
+            if not summary or not issue.get("project_key"):
+                items[index] = BulkItem(index=index, status="failed", title=summary, error="project_key and summary are required")
+                continue
+            items[index] = remembered_item(index, token)
+            if items[index] is None:
+                fields = jira_issue_fields(
+                    issue["project_key"], summary, issue.get("description", ""), issue.get("issue_type", "Task"),
+                    issue.get("bitbucket_repo"), issue.get("branch")
+                )
+                if token:
+                    fields["labels"] = [token]
+                pending.append((index, token, fields))
         
-        result = f"✅ Created issue: {issue_key}\nTitle: {summary}\nType: {issue_type}"
-        if bitbucket_repo:
-            result += f"\n🔗 Linked to repository: {bitbucket_repo}"
+        marked = find_marked_issues([token for _, token, _ in pending if token])
+        for index, token, fields in pending:
+            if token in marked:
+                remembered = {"key": marked[token]["key"], "title": fields["summary"]}
+                idempotency_store.put(token, remembered)
+                items[index] = BulkItem(index=index, status="existing", **remembered)
+        pending = [unit for unit in pending if unit[1] not in marked]
         
-        return result
+        chunks = [pending[start:start + JIRA_BULK_MAX] for start in range(0, len(pending), JIRA_BULK_MAX)]
+        outcome = fan_out(submit_issue_chunk, chunks, max_workers=BULK_MAX_WORKERS)
+        for position, chunk in enumerate(chunks):
+            results = outcome.results[position]
+            for offset, (index, _, fields) in enumerate(chunk):
+                items[index] = results[offset] if results is not None else unfinished_item(index, outcome.errors.get(position), title=fields["summary"])
+        
+        # New issues can match any cached JQL search; a pending or failed chunk may have created some too
+        if chunks:
+            response_cache.invalidate("jira", "search")
+        
+        return render(BulkResult(kind="issues", items=items, notes=[DEADLINE_NOTE] if outcome.truncated else []), output_format)
     
     except Exception as e:
-        return f"❌ Error creating issue: {str(e)}"
+        return render(Failure(error=f"Error creating issues: {str(e)}"), output_format)
 
 # ============================================================================
 # BITBUCKET OPERATIONS
 # ============================================================================
 
-def list_bitbucket_repositories(limit=10):
+def repository_listing():
+    """Workspace repository listing, with one page size and projection for every tool so they share its cache entry and flights"""
+    return f"repositories/{BITBUCKET_WORKSPACE}?pagelen={BITBUCKET_MAX_PAGELEN}{tool_fields('list_bitbucket_repositories', 'repositories')}"
+
+def list_bitbucket_repositories(limit=10, cursor=None, output_format="text"):
     """List Bitbucket repositories in workspace"""
     try:
-        response = make_request("bitbucket", "GET", f"repositories/{BITBUCKET_WORKSPACE}?pagelen={limit}")
-        
-        if not response.get("values"):
-            return "No repositories found in workspace."
+        if cursor:
+            _, endpoint, offset = resume_listing("list_bitbucket_repositories", "repositories", cursor)
+        else:
+            endpoint, offset = repository_listing(), 0
         
-        results = []
-        for repo in response["values"]:
+        def build(repo):
             name = repo["name"]
-            full_name = repo["full_name"]
-            language = repo.get("language", "Unknown")
-            is_private = "🔒 Private" if repo.get("is_private") else "🌐 Public"
-            
-            # Look for Jira references in description
-            description = repo.get("description", "")
-            jira_refs = extract_jira_references(description)
-            jira_info = f" [🎫 {', '.join(jira_refs)}]" if jira_refs else ""
-            
-            results.append(f"• {name} ({language}) - {is_private}{jira_info}")
+            return RepositoryRecord(
+                name=name,
+                full_name=repo["full_name"],
+                language=repo.get("language", "Unknown"),
+                is_private=bool(repo.get("is_private")),
+                # Look for Jira references in description
+                jira_keys=extract_jira_references(repo.get("description", ""))
+            )
         
-        return f"Found {len(results)} repository(ies):\n\n" + "\n".join(results)
+        position = PagePosition()
+        repos, truncated = collect(paginate_bitbucket(endpoint, limit, offset, position, stream=True), build)
+        
+        return render(Listing(
+            kind="repositories", items=repos, notes=[DEADLINE_NOTE] if truncated else [],
+            cursor=listing_cursor("list_bitbucket_repositories", position),
+            heading=f"Found {len(repos)} repository(ies):",
+            empty="No repositories found in workspace."
+        ), output_format)
     
     except Exception as e:
-        return f"❌ Error listing repositories: {str(e)}"
+        return render(Failure(error=f"Error listing repositories: {str(e)}"), output_format)
 
-def list_pull_requests(repo_name, state="OPEN", limit=10):
+def list_pull_requests(repo_name, state="OPEN", limit=10, cursor=None, output_format="text"):
     """List pull requests for a repository"""
     try:
-        response = make_request("bitbucket", "GET", f"repositories/{BITBUCKET_WORKSPACE}/{repo_name}/pullrequests?state={state}&pagelen={limit}")
-        
-        if not response.get("values"):
-            return f"No {state.lower()} pull requests found in {repo_name}."
-        
-        results = []
-        for pr in response["values"]:
-            id_num = pr["id"]
-            title = pr["title"]
-            author = pr["author"]["display_name"]
-            source_branch = pr["source"]["branch"]["name"]
-            dest_branch = pr["destination"]["branch"]["name"]
-            
-            # Look for Jira references in title and description
-            jira_refs = extract_jira_references(f"{title} {pr.get('description', '')}")
-            jira_info = f" [🎫 {', '.join(jira_refs)}]" if jira_refs else ""
-            
-            results.append(f"• PR #{id_num}: {title}\n  {source_branch} → {dest_branch} by {author}{jira_info}")
+        if cursor:
+            resume, endpoint, offset = resume_listing("list_pull_requests", "pullrequests", cursor)
+            repo_name, state = resume["repo"], resume["state"]
+        else:
+            pagelen = bitbucket_pagelen(limit, BITBUCKET_PR_MAX_PAGELEN)
+            fields = tool_fields("list_pull_requests", "pullrequests")
+            endpoint, offset = f"repositories/{BITBUCKET_WORKSPACE}/{repo_name}/pullrequests?state={state}&pagelen={pagelen}{fields}", 0
+        
+        def build(pr):
+            return PullRequestRecord(
+                id=pr["id"],
+                repo=repo_name,
+                title=pr["title"],
+                author=pr["author"]["display_name"],
+                source_branch=pr["source"]["branch"]["name"],
+                dest_branch=pr["destination"]["branch"]["name"],
+                # Look for Jira references in title and description
+                jira_keys=extract_jira_references(f"{pr['title']} {pr.get('description', '')}")
+            )
+        
+        position = PagePosition()
+        prs, truncated = collect(paginate_bitbucket(endpoint, limit, offset, position, stream=True), build)
         
-        return f"Found {len(results)} {state.lower()} pull request(s) in {repo_name}:\n\n" + "\n".join(results)
+        return render(Listing(
+            kind="pull_requests", items=prs, notes=[DEADLINE_NOTE] if truncated else [],
+            cursor=listing_cursor("list_pull_requests", position, repo=repo_name, state=state),
+            heading=f"Found {len(prs)} {state.lower()} pull request(s) in {repo_name}:",
+            empty=f"No {state.lower()} pull requests found in {repo_name}."
+        ), output_format)
     
     except Exception as e:
-        return f"❌ Error listing pull requests: {str(e)}"
+        return render(Failure(error=f"Error listing pull requests: {str(e)}"), output_format)
 
-def create_pull_request(repo_name, title, source_branch, dest_branch="main", description="", jira_issue=None):
+def pull_request_payload(title, source_branch, dest_branch="main", description="", jira_issue=None):
+    """Body of a new pull request, with the Jira reference appended to the description"""
+    if jira_issue:
+        description += f"\n\nResolves: {jira_issue}"
+    
+    return {
+        "title": title,
+        "description": description,
+        "source": {"branch": {"name": source_branch}},
+        "destination": {"branch": {"name": dest_branch}}
+    }
+
+def create_pull_request(repo_name, title, source_branch, dest_branch="main", description="", jira_issue=None, output_format="text"):
     """Create a new pull request with optional Jira issue reference"""
     try:
-        # Add Jira reference to description if provided
-        if jira_issue:
-            description += f"\n\nResolves: {jira_issue}"
-        
-        pr_data = {
-            "title": title,
-            "description": description,
-            "source": {"branch": {"name": source_branch}},
-            "destination": {"branch": {"name": dest_branch}}
-        }
+        pr_data = pull_request_payload(title, source_branch, dest_branch, description, jira_issue)
         
         response = make_request("bitbucket", "POST", f"repositories/{BITBUCKET_WORKSPACE}/{repo_name}/pullrequests", pr_data)
-        pr_id = response.get("id")
         
-        result = f"✅ Created pull request: #{pr_id}\nTitle: {title}\n{source_branch} → {dest_branch}"
-        if jira_issue:
-            result += f"\n🎫 Linked to Jira issue: {jira_issue}"
+        # The repository's cached PR listings are now stale
+        response_cache.invalidate("bitbucket", f"repositories/{BITBUCKET_WORKSPACE}/{repo_name}/pullrequests")
         
-        return result
+        return render(CreatedPullRequest(
+            id=response.get("id"), repo=repo_name, title=title,
+            source_branch=source_branch, dest_branch=dest_branch, jira_issue=jira_issue
+        ), output_format)
     
     except Exception as e:
-        return f"❌ Error creating pull request: {str(e)}"
+        return render(Failure(error=f"Error creating pull request: {str(e)}"), output_format)
 
-def list_branches(repo_name, limit=10):
-    """List branches in a repository"""
+# Tokens per q= lookup, keeping the query string well under URL length limits
+MARKER_LOOKUP_BATCH = 20
+
+def find_marked_pull_requests(repo_name, tokens):
+    """PRs an earlier attempt created in repo_name, found by the token in their description; returns {token: pr}"""
+    endpoint = (f"repositories/{BITBUCKET_WORKSPACE}/{repo_name}/pullrequests?pagelen={BITBUCKET_PR_MAX_PAGELEN}"
+                f"{tool_fields('create_pull_requests_bulk', 'pullrequests')}" + "".join(f"&state={state}" for state in PR_STATES))
+    found = {}
+    # A cached or shared listing could predate that attempt's writes
+    uncached = _uncached_reads.set(True)
+    try:
+        for start in range(0, len(tokens), MARKER_LOOKUP_BATCH):
+            batch = tokens[start:start + MARKER_LOOKUP_BATCH]
+            q = " OR ".join(f'description ~ "{token}"' for token in batch)
+            try:
+                prs = list(paginate_bitbucket(f"{endpoint}&q={quote(q)}"))
+            except http_library().HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status == 404:
+                    return found  # No such repository, so nothing to find; creating it reports the 404
+                if status != 400:
+                    raise
+                prs = list(paginate_bitbucket(endpoint))  # q= rejected: scan every PR instead
+            for pr in prs:
+                description = pr.get("description") or ""
+                for token in batch:
+                    if token in description:
+                        found[token] = pr
+    finally:
+        _uncached_reads.reset(uncached)
+    return found
+
+def submit_pull_request(unit):
+    """POST one pull request for (index, token, repo_name, payload, jira_issue); returns its BulkItem"""
+    index, token, repo_name, payload, jira_issue = unit
+    response = make_request("bitbucket", "POST", f"repositories/{BITBUCKET_WORKSPACE}/{repo_name}/pullrequests", payload)
+    return created_item(index, token, id=response.get("id"), repo=repo_name, title=payload["title"], jira_issue=jira_issue)
+
+def create_pull_requests_bulk(pull_requests, idempotency_key=None, output_format="text"):
+    """Create many pull requests, across repositories, with bounded concurrency.
+    
+    Items take the create_pull_request arguments. With an idempotency key (per
+    item or for the batch) each description carries an Idempotency-Key line,
+    and items an earlier attempt already created are reported as existing.
+    """
     try:
-        response = make_request("bitbucket", "GET", f"repositories/{BITBUCKET_WORKSPACE}/{repo_name}/refs/branches?pagelen={limit}")
+        if not isinstance(pull_requests, list) or not pull_requests:
+            return render(Failure(error="pull_requests must be a non-empty list of pull request objects"), output_format)
+        
+        items = [None] * len(pull_requests)
+        pending = []  # (index, token, repo_name, payload, jira_issue) still to submit
+        for index, (pr, token) in enumerate(zip(pull_requests, idempotency_tokens(idempotency_key, pull_requests))):
+            pr = pr if isinstance(pr, dict) else {}
+            if not (pr.get("repo_name") and pr.get("title") and pr.get("source_branch")):
+                items[index] = BulkItem(index=index, status="failed", repo=pr.get("repo_name"), title=pr.get("title"),
+                                        error="repo_name, title and source_branch are required")
+                continue
+            items[index] = remembered_item(index, token)
+            if items[index] is None:
+                payload = pull_request_payload(
+                    pr["title"], pr["source_branch"], pr.get("dest_branch", "main"), pr.get("description", ""), pr.get("jira_issue")
+                )
+                if token:
+                    payload["description"] += f"\n\nIdempotency-Key: {token}"
+                pending.append((index, token, pr["repo_name"], payload, pr.get("jira_issue")))
+        
+        # Look for earlier attempts once per repository, for all of its tokens
+        tokens_by_repo = {}
+        for _, token, repo_name, _, _ in pending:
+            if token:
+                tokens_by_repo.setdefault(repo_name, []).append(token)
+        lookups = fan_out(lambda repo_name: find_marked_pull_requests(repo_name, tokens_by_repo[repo_name]),
+                          tokens_by_repo, max_workers=BULK_MAX_WORKERS)
+        marked = {}
+        unchecked = {}
+        for position, repo_name in enumerate(lookups.items):
+            if lookups.results[position] is not None:
+                marked.update(lookups.results[position])
+            else:
+                unchecked[repo_name] = lookups.errors.get(position)
+        
+        submit = []
+        for unit in pending:
+            index, token, repo_name, payload, jira_issue = unit
+            fields = {"repo": repo_name, "title": payload["title"], "jira_issue": jira_issue}
+            if token in marked:
+                fields["id"] = marked[token].get("id")
+                idempotency_store.put(token, fields)
+                items[index] = BulkItem(index=index, status="existing", **fields)
+            elif token and repo_name in unchecked:
+                # Creating without knowing whether an earlier attempt succeeded could duplicate it
+                error = unchecked[repo_name]
+                if error is not None and not isinstance(error, DeadlineExceeded):
+                    error = RuntimeError(f"Could not check for an earlier submission: {error}")
+                items[index] = unfinished_item(index, error, **fields)
+            else:
+                submit.append(unit)
+        
+        outcome = fan_out(submit_pull_request, submit, max_workers=BULK_MAX_WORKERS)
+        for position, (index, _, repo_name, payload, jira_issue) in enumerate(submit):
+            items[index] = outcome.results[position] or unfinished_item(
+                index, outcome.errors.get(position), repo=repo_name, title=payload["title"], jira_issue=jira_issue
+            )
         
-        if not response.get("values"):
-            return f"No branches found in {repo_name}."
+        # The cached PR listings of every repository posted to are now stale, whatever the outcome
+        for repo_name in {repo_name for _, _, repo_name, _, _ in submit}:
+            response_cache.invalidate("bitbucket", f"repositories/{BITBUCKET_WORKSPACE}/{repo_name}/pullrequests")
+        
+        truncated = lookups.truncated or outcome.truncated
+        return render(BulkResult(kind="pull requests", items=items, notes=[DEADLINE_NOTE] if truncated else []), output_format)
+    
+    except Exception as e:
+        return render(Failure(error=f"Error creating pull requests: {str(e)}"), output_format)
+
+def list_branches(repo_name, limit=10, cursor=None, output_format="text"):
+    """List branches in a repository"""
+    try:
+        if cursor:
+            resume, endpoint, offset = resume_listing("list_branches", "branches", cursor)
+            repo_name = resume["repo"]
+        else:
+            endpoint, offset = f"repositories/{BITBUCKET_WORKSPACE}/{repo_name}/refs/branches?pagelen={bitbucket_pagelen(limit)}{tool_fields('list_branches', 'branches')}", 0
         
-        results = []
-        for branch in response["values"]:
-            name = branch["name"]
-            # Check if it's the main branch
-            is_main = "🌟 " if name in ["main", "master", "develop"] else ""
-            results.append(f"• {is_main}{name}")
+        position = PagePosition()
+        branches, truncated = collect(
+            paginate_bitbucket(endpoint, limit, offset, position, stream=True),
+            lambda branch: BranchRecord(name=branch["name"], repo=repo_name)
+        )
         
-        return f"Found {len(results)} branch(es) in {repo_name}:\n\n" + "\n".join(results)
+        return render(Listing(
+            kind="branches", items=branches, notes=[DEADLINE_NOTE] if truncated else [],
+            cursor=listing_cursor("list_branches", position, repo=repo_name),
+            heading=f"Found {len(branches)} branch(es) in {repo_name}:",
+            empty=f"No branches found in {repo_name}."
+        ), output_format)
     
     except Exception as e:
-        return f"❌ Error listing branches: {str(e)}"
+        return render(Failure(error=f"Error listing branches: {str(e)}"), output_format)
 
-def get_commits(repo_name, branch="main", limit=10):
+def get_commits(repo_name, branch="main", limit=10, cursor=None, output_format="text"):
     """Get recent commits from a branch"""
     try:
-        response = make_request("bitbucket", "GET", f"repositories/{BITBUCKET_WORKSPACE}/{repo_name}/commits/{branch}?pagelen={limit}")
+        if cursor:
+            resume, endpoint, offset = resume_listing("get_commits", "commits", cursor)
+            repo_name, branch = resume["repo"], resume["branch"]
+        else:
+            endpoint, offset = f"repositories/{BITBUCKET_WORKSPACE}/{repo_name}/commits/{branch}?pagelen={bitbucket_pagelen(limit)}{tool_fields('get_commits', 'commits')}", 0
         
-        if not response.get("values"):
-            return f"No commits found in {repo_name}/{branch}."
+        def build(commit):
+            return CommitRecord(
+                hash=commit["hash"],
+                repo=repo_name,
+                message=commit["message"].split('\n')[0],  # First line only
+                author=commit["author"]["user"]["display_name"] if commit.get("author", {}).get("user") else "Unknown",
+                # Look for Jira references in commit message
+                jira_keys=extract_jira_references(commit["message"])
+            )
         
-        results = []
-        for commit in response["values"]:
-            hash_short = commit["hash"][:8]
-            message = commit["message"].split('\n')[0]  # First line only
-            author = commit["author"]["user"]["display_name"] if commit["author"].get("user") else "Unknown"
-            
-            # Look for Jira references in commit message
-            jira_refs = extract_jira_references(commit["message"])
-            jira_info = f" [🎫 {', '.join(jira_refs)}]" if jira_refs else ""
-            
-            results.append(f"• {hash_short}: {message} - {author}{jira_info}")
+        position = PagePosition()
+        commits, truncated = collect(paginate_bitbucket(endpoint, limit, offset, position, stream=True), build)
         
-        return f"Recent commits in {repo_name}/{branch}:\n\n" + "\n".join(results)
+        return render(Listing(
+            kind="commits", items=commits, notes=[DEADLINE_NOTE] if truncated else [],
+            cursor=listing_cursor("get_commits", position, repo=repo_name, branch=branch),
+            heading=f"Recent commits in {repo_name}/{branch}:",
+            empty=f"No commits found in {repo_name}/{branch}."
+        ), output_format)
     
     except Exception as e:
-        return f"❌ Error getting commits: {str(e)}"
+        return render(Failure(error=f"Error getting commits: {str(e)}"), output_format)
 
 # ============================================================================
 # CROSS-REFERENCE UTILITIES
 # ============================================================================
 
+# One precompiled alternation scanned once per text, anchored at word starts. PR URLs
+# and branch names are matched whole; Jira keys inside branch names are pulled out after.
+REFERENCE_PATTERN = re.compile(r"""
+    \b(?:
+        ([A-Z]{2,10}-\d+)\b                                             # Jira issue key
+      | (https?://bitbucket\.org/[\w.-]+/[\w.-]+/pull-requests/\d+)     # pull request URL
+      | ((?:feature|bugfix|hotfix|release|fix)/[\w./-]*[\w-])           # branch name
+      | (\w+(?:[-/]\w+)+(?:\.git)?)\b                                  # workspace/repo or hyphenated slug
+    )
+""", re.VERBOSE)
+JIRA_KEY_PATTERN = re.compile(r'\b[A-Z]{2,10}-\d+\b')
+
+def workspace_repositories():
+    """Lower-cased names and slugs of the workspace repositories, from the (cached) repository listing"""
+    known_repos = set()
+    for repo in paginate_bitbucket(repository_listing()):
+        known_repos.add(repo["name"].lower())
+        known_repos.add((repo.get("slug") or repo["name"]).lower())
+    return frozenset(known_repos)
+
+def is_known_repo(repo, known_repos):
+    """Whether a workspace/repo or repo mention names one of known_repos"""
+    slug = repo.lower()
+    if "/" in slug:
+        slug = slug.rsplit("/", 1)[1]
+    return slug in known_repos or (slug.endswith(".git") and slug[:-4] in known_repos)
+
+class References:
+    """Cross-references found in one piece of text, each de-duplicated in order of appearance"""
+    
+    __slots__ = ("jira_keys", "repos", "branches", "pr_urls")
+    
+    def __init__(self, jira_keys=(), repos=(), branches=(), pr_urls=()):
+        self.jira_keys = list(jira_keys)
+        self.repos = list(repos)
+        self.branches = list(branches)
+        self.pr_urls = list(pr_urls)
+
+def scan_references(text, known_repos=None):
+    """Extract Jira keys, repository slugs, branch names and PR URLs in a single pass.
+    
+    Repo mentions are kept only if they name one of known_repos (lower-cased
+    names / slugs, see workspace_repositories); with None every slug is kept.
+    """
+    if not text:
+        return References()
+    
+    jira_keys = {}
+    repos = {}
+    branches = {}
+    pr_urls = {}
+    for key, pr_url, branch, repo in REFERENCE_PATTERN.findall(text):
+        if key:
+            jira_keys[key] = None
+        elif repo:
+            # Keys joined to other words (user/ABC-9, refs/heads/PROJ-1, pre-PROJ-7) match here whole
+            for key in JIRA_KEY_PATTERN.findall(repo):
+                jira_keys[key] = None
+            if known_repos is None or is_known_repo(repo, known_repos):
+                repos[repo] = None
+        elif branch:
+            branches[branch] = None
+            for key in JIRA_KEY_PATTERN.findall(branch):
+                jira_keys[key] = None
+        else:
+            pr_urls[pr_url] = None
+    
+    if JIRA_PROJECT_KEYS:
+        jira_keys = [key for key in jira_keys if key.split("-", 1)[0] in JIRA_PROJECT_KEYS]
+    
+    return References(jira_keys, repos, branches, pr_urls)
+
 def extract_jira_references(text):
     """Extract Jira issue keys from text"""
-    if not text:
-        return []
-    # Match patterns like PROJ-123, ABC-456, etc.
-    pattern = r'\b[A-Z]{2,10}-\d+\b'
-    return list(set(re.findall(pattern, text)))
+    return scan_references(text).jira_keys
 
-def extract_bitbucket_references(text):
+def extract_bitbucket_references(text, known_repos=None):
     """Extract Bitbucket repository references from text"""
-    if not text:
-        return []
-    # Match patterns like repo-name, workspace/repo-name
-    pattern = r'\b(?:[\w-]+/)?[\w-]+(?:\.git)?\b'
-    matches = re.findall(pattern, text)
-    # Filter to likely repository names (contains hyphens or slashes)
-    return [m for m in matches if '-' in m or '/' in m]
-
-def search_cross_references(jira_issue_key):
-    """Find Bitbucket references for a Jira issue"""
+    return scan_references(text, known_repos).repos
+
+# Every PR state, so merged and declined PRs are indexed too
+PR_STATES = ("OPEN", "MERGED", "DECLINED", "SUPERSEDED")
+
+# PR fields searched for an issue key; Bitbucket's `~` is a case-insensitive substring match
+PR_KEY_FIELDS = ("title", "description", "source.branch.name")
+TIMESTAMP_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}(?:T\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:\d{2})?)?')
+
+def parse_timestamp(value):
+    """Parse a Bitbucket / ISO 8601 timestamp or bare date into an aware datetime"""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+class PullRequestQuery:
+    """A PR search planned as Bitbucket-side filters (state= / q=) plus a client-side residual.
+    
+    strategy is "server" when every predicate is pushed down, "scan" when none
+    can be and "hybrid" in between. Pushed-down key matches are still re-checked
+    exactly, since `~` would also match PROJ-12 for PROJ-1.
+    """
+    
+    __slots__ = ("issue_key", "states", "updated_since", "q", "strategy", "key_pattern", "since")
+    
+    def __init__(self, issue_key=None, states=(), updated_since=None, pushdown=None):
+        if pushdown is None:
+            pushdown = PR_QUERY_PUSHDOWN
+        if updated_since and not TIMESTAMP_PATTERN.fullmatch(updated_since):
+            raise ValueError(f"updated_since must be an ISO 8601 date or timestamp, got {updated_since!r}")
+        
+        self.issue_key = issue_key
+        self.states = tuple(states)
+        self.updated_since = updated_since
+        self.key_pattern = re.compile(rf"\b{re.escape(issue_key)}\b") if issue_key else None
+        self.since = parse_timestamp(updated_since) if updated_since else None
+        
+        predicates = []
+        residual = 0
+        if updated_since:
+            if pushdown:
+                predicates.append(f"updated_on > {updated_since}")
+            else:
+                residual += 1
+        if issue_key:
+            # Only well-formed keys are safe to embed in a quoted q= string
+            if pushdown and JIRA_KEY_PATTERN.fullmatch(issue_key):
+                predicates.append("(" + " OR ".join(f'{field} ~ "{issue_key}"' for field in PR_KEY_FIELDS) + ")")
+            else:
+                residual += 1
+        
+        self.q = " AND ".join(predicates) or None
+        if not residual:
+            self.strategy = "server"
+        elif predicates or self.states:
+            self.strategy = "hybrid"
+        else:
+            self.strategy = "scan"
+    
+    def without_pushdown(self):
+        """The same search evaluated client-side (used when Bitbucket rejects q=)"""
+        return PullRequestQuery(self.issue_key, self.states, self.updated_since, pushdown=False)
+    
+    def params(self):
+        """Query-string suffix carrying the pushed-down predicates"""
+        params = "".join(f"&state={state}" for state in self.states)
+        if self.q:
+            params += "&q=" + quote(self.q)
+        return params
+    
+    def matches(self, pr):
+        """Residual check applied to every PR Bitbucket returns"""
+        if self.since and parse_timestamp(pr.get("updated_on") or "1970-01-01") <= self.since:
+            return False
+        if self.key_pattern:
+            source_branch = ((pr.get("source") or {}).get("branch") or {}).get("name", "")
+            return bool(self.key_pattern.search(f"{pr.get('title', '')} {pr.get('description') or ''} {source_branch}"))
+        return True
+    
+    def describe(self):
+        pushed = [f"state={'|'.join(self.states)}"] if self.states else []
+        if self.q:
+            pushed.append(f"q={self.q}")
+        return f"{self.strategy} ({', '.join(pushed) or 'no server-side filter'})"
+
+class PlannerStats:
+    """Per-strategy counters: searches run and PRs fetched vs. kept by the residual check"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.strategies = {}
+    
+    def record(self, strategy, **deltas):
+        with self.lock:
+            counters = self.strategies.setdefault(strategy, {"searches": 0, "prs_fetched": 0, "prs_matched": 0, "fallbacks": 0})
+            for name, delta in deltas.items():
+                counters[name] += delta
+    
+    def snapshot(self):
+        with self.lock:
+            return {strategy: dict(counters) for strategy, counters in self.strategies.items()}
+
+planner_stats = PlannerStats()
+
+def search_pull_requests(repo_name, query, fields=""):
+    """Run a planned PR search in one repository; returns (matching PRs, query actually used).
+    
+    If Bitbucket rejects the q= filter the search is re-run as a client-side scan.
+    """
+    endpoint = f"repositories/{BITBUCKET_WORKSPACE}/{repo_name}/pullrequests?pagelen={BITBUCKET_PR_MAX_PAGELEN}{fields}"
+    try:
+        fetched = list(paginate_bitbucket(endpoint + query.params()))
+    except http_library().HTTPError as e:
+        if not query.q or e.response is None or e.response.status_code != 400:
+            raise
+        planner_stats.record(query.strategy, fallbacks=1)
+        query = query.without_pushdown()
+        fetched = list(paginate_bitbucket(endpoint + query.params()))
+    
+    matched = [pr for pr in fetched if query.matches(pr)]
+    planner_stats.record(query.strategy, searches=1, prs_fetched=len(fetched), prs_matched=len(matched))
+    return matched, query
+
+def sync_repo_refs(index, repo_name, kinds=None):
+    """Pull PRs, commits and branches (or only the given kinds) changed since the repo's last sync watermarks into the index"""
+    import xref_index
+    
+    base = f"repositories/{BITBUCKET_WORKSPACE}/{repo_name}"
+    kinds = xref_index.KINDS if kinds is None else kinds
+    if xref_index.PULL_REQUEST in kinds:
+        sync_pull_requests(index, repo_name, base)
+    if xref_index.COMMIT in kinds:
+        sync_commits(index, repo_name, base)
+    if xref_index.BRANCH in kinds:
+        sync_branches(index, repo_name, base)
+
+def sync_pull_requests(index, repo_name, base):
+    """Pull requests: only pages updated after the watermark, newest first"""
+    import xref_index
+    
+    watermark, _ = index.get_sync_state(repo_name, xref_index.PULL_REQUEST)
+    query = PullRequestQuery(states=PR_STATES, updated_since=watermark, pushdown=True)
+    fields = tool_fields("search_cross_references", "pullrequests")
+    newest = watermark or ""
+    fetched = 0
+    for pr in paginate_bitbucket(f"{base}/pullrequests?sort=-updated_on&pagelen={BITBUCKET_PR_MAX_PAGELEN}{fields}{query.params()}"):
+        fetched += 1
+        source_branch = pr.get("source", {}).get("branch", {}).get("name", "")
+        keys = extract_jira_references(f"{pr['title']} {pr.get('description') or ''} {source_branch}")
+        index.replace_refs(xref_index.PULL_REQUEST, repo_name, pr["id"], keys, pr["title"], pr.get("updated_on"))
+        newest = max(newest, pr.get("updated_on") or "")
+    planner_stats.record(query.strategy, searches=1, prs_fetched=fetched, prs_matched=fetched)
+    index.set_sync_state(repo_name, xref_index.PULL_REQUEST, newest or None)
+
+def sync_commits(index, repo_name, base):
+    """Commits are immutable: walk newest first until the last hash we saw"""
+    import xref_index
+    
+    watermark, _ = index.get_sync_state(repo_name, xref_index.COMMIT)
+    newest = None
+    for count, commit in enumerate(paginate_bitbucket(f"{base}/commits?pagelen={BITBUCKET_MAX_PAGELEN}{tool_fields('search_cross_references', 'commits')}")):
+        if commit["hash"] == watermark or count >= XREF_INDEX_COMMIT_LIMIT:
+            break
+        newest = newest or commit["hash"]
+        keys = extract_jira_references(commit["message"])
+        if keys:
+            first_line = commit["message"].split('\n')[0]
+            index.replace_refs(xref_index.COMMIT, repo_name, commit["hash"], keys, first_line, commit.get("date"))
+    index.set_sync_state(repo_name, xref_index.COMMIT, newest or watermark)
+
+def sync_branches(index, repo_name, base):
+    """Branches: most recently updated first, stop at the previous sync point"""
+    import xref_index
+    
+    watermark, _ = index.get_sync_state(repo_name, xref_index.BRANCH)
+    newest = watermark or ""
+    for branch in paginate_bitbucket(f"{base}/refs/branches?pagelen={BITBUCKET_MAX_PAGELEN}&sort=-target.date{tool_fields('search_cross_references', 'branches')}"):
+        date = (branch.get("target") or {}).get("date") or ""
+        if watermark and date and date <= watermark:
+            break
+        newest = max(newest, date)
+        keys = extract_jira_references(branch["name"])
+        if keys:
+            index.replace_refs(xref_index.BRANCH, repo_name, branch["name"], keys, branch["name"], date or None)
+    index.set_sync_state(repo_name, xref_index.BRANCH, newest or None)
+
+def refresh_xref_index(index, repo_names=None, max_age=XREF_INDEX_MAX_AGE):
+    """Incrementally sync the kinds of index data older than max_age seconds, per repository"""
+    import xref_index
+    
+    if repo_names is None:
+        repo_names = [repo["name"] for repo in paginate_bitbucket(repository_listing())]
+    
+    # Webhooks keep kinds fresh separately (a PR event says nothing about new commits)
+    cutoff = time.time() - max_age
+    stale = []
+    for name in repo_names:
+        kinds = tuple(kind for kind in xref_index.KINDS if (index.get_sync_state(name, kind)[1] or 0) <= cutoff)
+        if kinds:
+            stale.append((name, kinds))
+    return fan_out(lambda task: sync_repo_refs(index, *task), stale)
+
+def indexed_references(jira_issue_key, issue_summary, rows):
+    """Build a CrossReferences record from index rows, grouped by PRs, branches and commits"""
+    import xref_index
+    
+    pull_requests, branches, commits = [], [], []
+    for kind, repo, ref_id, title, _ in rows:
+        if kind == xref_index.PULL_REQUEST:
+            pull_requests.append(PullRequestRecord(id=int(ref_id) if ref_id.isdigit() else ref_id, repo=repo, title=title))
+        elif kind == xref_index.BRANCH:
+            branches.append(BranchRecord(name=ref_id, repo=repo))
+        elif kind == xref_index.COMMIT:
+            commits.append(CommitRecord(hash=ref_id, repo=repo, message=title))
+    
+    return CrossReferences(
+        issue_key=jira_issue_key, summary=issue_summary,
+        pull_requests=pull_requests, branches=branches, commits=commits, notes=[],
+        empty="No related pull requests, branches or commits found."
+    )
+
+def issue_details(jira_issue_key):
+    """Summary of a Jira issue, as search_cross_references reports it"""
+    jira_response = make_request("jira", "GET", f"issue/{jira_issue_key}{tool_fields('search_cross_references', 'issue', '?')}")
+    return jira_response["fields"]["summary"]
+
+def search_cross_references(jira_issue_key, index_mode="live", state=None, updated_since=None, cursor=None, output_format="text"):
+    """Find Bitbucket references for a Jira issue.
+    
+    In live mode, repositories not searched before the deadline are returned as a
+    cursor; passing it back searches only those repositories.
+    """
     try:
-        # Get Jira issue details
-        jira_response = make_request("jira", "GET", f"issue/{jira_issue_key}")
-        issue_summary = jira_response["fields"]["summary"]
-        issue_description = jira_response["fields"].get("description", "")
+        resume = None
+        if cursor:
+            resume = decode_cursor("search_cross_references", cursor)
+            jira_issue_key, state, updated_since = resume["key"], resume.get("state"), resume.get("updated_since")
+            index_mode = "live"
         
-        # Search for pull requests mentioning this issue
-        repos_response = make_request("bitbucket", "GET", f"repositories/{BITBUCKET_WORKSPACE}?pagelen=50")
+        if index_mode not in ("live", "index", "index_only"):
+            return render(Failure(error=f"Unknown index_mode: {index_mode} (expected live, index or index_only)"), output_format)
         
-        related_prs = []
-        for repo in repos_response.get("values", []):
-            repo_name = repo["name"]
-            try:
-                prs_response = make_request("bitbucket", "GET", f"repositories/{BITBUCKET_WORKSPACE}/{repo_name}/pullrequests?pagelen=50")
-                for pr in prs_response.get("values", []):
-                    pr_text = f"{pr['title']} {pr.get('description', '')}"
-                    if jira_issue_key in pr_text:
-                        related_prs.append(f"PR #{pr['id']} in {repo_name}: {pr['title']}")
-            except:
-                continue  # Skip repos we can't access
-        
-        result = f"Cross-references for {jira_issue_key}:\n"
-        result += f"📋 Issue: {issue_summary}\n\n"
-        
-        if related_prs:
-            result += "🔗 Related Pull Requests:\n"
-            result += "\n".join(f"• {pr}" for pr in related_prs)
+        # Without a state Bitbucket returns open PRs only
+        states = PR_STATES if state == "ALL" else (state,) if state else ()
+        query = PullRequestQuery(jira_issue_key, states, updated_since)
+        
+        if index_mode != "live":
+            import xref_index
+            
+            index = xref_index.get_index(BITBUCKET_WORKSPACE)
+            # Issues kept current by Jira webhooks need no upstream call
+            stored = index.get_issue(jira_issue_key)
+            issue_summary = stored[0] if stored else issue_details(jira_issue_key)
+            notes = []
+            if index_mode == "index":
+                # Freshness check: incremental sync of repos older than XREF_INDEX_MAX_AGE
+                outcome = refresh_xref_index(index)
+                if outcome.truncated:
+                    notes.append(f"⚠️ Index refresh truncated: {outcome.pending} repositories not synced before the deadline.")
+            references = indexed_references(jira_issue_key, issue_summary, index.lookup(jira_issue_key))
+            references.notes = notes
+            return render(references, output_format)
+        
+        issue_summary = issue_details(jira_issue_key)
+        
+        # Search for pull requests mentioning this issue
+        if resume:
+            repos = resume["repos"]
         else:
-            result += "No related pull requests found."
+            repos = [repo["name"] for repo in paginate_bitbucket(repository_listing())]
         
-        return result
+        fields = tool_fields("search_cross_references", "pullrequests")
+        
+        def find_repo_prs(repo_name):
+            prs, used = search_pull_requests(repo_name, query, fields)
+            return [PullRequestRecord(id=pr["id"], repo=repo_name, title=pr["title"]) for pr in prs], used
+        
+        # Repos we can't access end up in outcome.errors and are skipped
+        outcome = fan_out(find_repo_prs, repos)
+        related_prs = [pr for _, (matches, _) in outcome.values() for pr in matches]
+        plans = sorted({used.describe() for _, (_, used) in outcome.values()})
+        
+        notes = []
+        if plans:
+            notes.append(f"🔎 Query plan: {'; '.join(plans)}")
+        unfinished = outcome.unfinished()
+        next_cursor = None
+        if unfinished:
+            notes.append(f"⚠️ Truncated: {len(unfinished)} of {len(repos)} repositories not searched before the deadline.")
+            next_cursor = encode_cursor("search_cross_references", {
+                "key": jira_issue_key, "state": state, "updated_since": updated_since, "repos": unfinished
+            })
+        
+        return render(CrossReferences(
+            issue_key=jira_issue_key, summary=issue_summary,
+            pull_requests=related_prs, branches=[], commits=[], notes=notes, cursor=next_cursor,
+            empty="No related pull requests found."
+        ), output_format)
+    
+    except Exception as e:
+        return render(Failure(error=f"Error finding cross-references: {str(e)}"), output_format)
+
+# Commits scanned per repository by get_issue_dossier unless commit_limit is given
+DOSSIER_COMMIT_LIMIT = 100
+DOSSIER_MAX_KEYS = 10
+
+def get_issue_dossier(jira_issue_keys, state="ALL", commit_limit=DOSSIER_COMMIT_LIMIT, output_format="text"):
+    """Issue details plus referencing PRs, key-named branches and mentioning commits, for one or more keys.
+    
+    Everything is fetched in one FetchPlan: the issues and the repository
+    listing first, then per repository its branches and recent commits (shared
+    by all keys) and, once an issue is known to exist, a PR search for it.
+    """
+    try:
+        keys = [jira_issue_keys] if isinstance(jira_issue_keys, str) else list(jira_issue_keys or ())
+        keys = list(dict.fromkeys(key.strip().upper() for key in keys if isinstance(key, str) and key.strip()))
+        invalid = [key for key in keys if not JIRA_KEY_PATTERN.fullmatch(key)]
+        if not keys or invalid:
+            return render(Failure(error=f"Expected Jira issue keys like PROJ-123, got {invalid or jira_issue_keys!r}"), output_format)
+        if len(keys) > DOSSIER_MAX_KEYS:
+            return render(Failure(error=f"At most {DOSSIER_MAX_KEYS} issue keys per dossier, got {len(keys)}"), output_format)
+        commit_limit = max(1, int(commit_limit))
+        
+        # Without a state Bitbucket returns open PRs only
+        states = PR_STATES if state == "ALL" else (state,) if state else ()
+        queries = {key: PullRequestQuery(key, states) for key in keys}
+        patterns = {key: query.key_pattern for key, query in queries.items()}
+        base = f"repositories/{BITBUCKET_WORKSPACE}"
+        pr_fields = tool_fields("get_issue_dossier", "pullrequests")
+        plan = FetchPlan()
+        
+        def fetch_issue(key):
+            return make_request("jira", "GET", f"issue/{key}{tool_fields('get_issue_dossier', 'issue', '?')}")
+        
+        def plan_repositories():
+            repos = [repo["name"] for repo in paginate_bitbucket(repository_listing())]
+            for repo in repos:
+                plan.add(("branches", repo), lambda repo=repo: [
+                    branch["name"] for branch in paginate_bitbucket(f"{base}/{repo}/refs/branches?pagelen={BITBUCKET_MAX_PAGELEN}{tool_fields('get_issue_dossier', 'branches')}")
+                ])
+                plan.add(("commits", repo), lambda repo=repo: list(paginate_bitbucket(
+                    f"{base}/{repo}/commits?pagelen={bitbucket_pagelen(commit_limit)}{tool_fields('get_issue_dossier', 'commits')}", commit_limit
+                )))
+                for key in keys:
+                    plan.add(("pullrequests", repo, key), lambda issue, repo=repo, key=key: search_pull_requests(repo, queries[key], pr_fields)[0],
+                             after=[("issue", key)])
+            return repos
+        
+        for key in keys:
+            plan.add(("issue", key), lambda key=key: fetch_issue(key))
+        plan.add("repositories", plan_repositories)
+        plan.run()
+        
+        if "repositories" in plan.errors:
+            raise plan.errors["repositories"]
+        repos = plan.results.get("repositories", [])
+        
+        dossiers = []
+        for key in keys:
+            if ("issue", key) not in plan.results:
+                error = plan.errors.get(("issue", key))
+                dossiers.append(IssueDossier(issue_key=key, error=str(error) if error else "Issue not fetched before the invocation deadline"))
+                continue
+            fields = plan.results[("issue", key)]["fields"]
+            pattern = patterns[key]
+            pull_requests, branches, commits = [], [], []
+            for repo in repos:
+                for pr in plan.results.get(("pullrequests", repo, key), ()):
+                    pull_requests.append(PullRequestRecord(id=pr["id"], repo=repo, title=pr["title"]))
+                for name in plan.results.get(("branches", repo), ()):
+                    if pattern.search(name):
+                        branches.append(BranchRecord(name=name, repo=repo))
+                for commit in plan.results.get(("commits", repo), ()):
+                    if pattern.search(commit["message"]):
+                        commits.append(CommitRecord(hash=commit["hash"], repo=repo, message=commit["message"].split("\n")[0]))
+            dossiers.append(IssueDossier(
+                issue_key=key, summary=fields["summary"], status=(fields.get("status") or {}).get("name"),
+                assignee=(fields.get("assignee") or {}).get("displayName"),
+                pull_requests=pull_requests, branches=branches, commits=commits
+            ))
+        
+        notes = []
+        failed = {name[1] for name in plan.errors if name[0] != "issue"}
+        if failed:
+            notes.append(f"⚠️ {len(failed)} of {len(repos)} repositories could not be searched: {', '.join(sorted(failed))}")
+        if plan.truncated:
+            notes.append(DEADLINE_NOTE)
+        
+        return render(Dossier(issues=dossiers, notes=notes), output_format)
     
     except Exception as e:
-        return f"❌ Error finding cross-references: {str(e)}"
+        return render(Failure(error=f"Error building issue dossier: {str(e)}"), output_format)
+
+# ============================================================================
+# WEBHOOK INGESTION
+# ============================================================================
+
+class WebhookError(Exception):
+    """A webhook delivery that is rejected with an HTTP status"""
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def webhook_delivery(event):
+    """Return (event key, payload) of an ingest_webhook event.
+    
+    Accepts a direct invocation ({"payload": ..., "event_key": ...}) or an HTTP
+    event from a function URL / API Gateway ({"headers": ..., "body": ...}).
+    Bitbucket names the event in X-Event-Key, Jira in the payload's webhookEvent.
+    Raises WebhookError for unsigned, tampered or malformed deliveries.
+    """
+    headers = {name.lower(): value for name, value in (event.get("headers") or {}).items()}
+    body = event.get("payload", event.get("body"))
+    if isinstance(body, str) and event.get("isBase64Encoded"):
+        body = base64.b64decode(body).decode()
+    
+    if WEBHOOK_SECRET:
+        import hashlib
+        import hmac
+        if not isinstance(body, str):
+            raise WebhookError(401, "Signed webhooks must pass the raw body as a string")
+        expected = "sha256=" + hmac.new(WEBHOOK_SECRET.encode(), body.encode(), hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(headers.get("x-hub-signature", ""), expected):
+            raise WebhookError(401, "Invalid webhook signature")
+    elif "requestContext" in event:
+        # Anyone can reach a public URL; don't let unsigned deliveries write to the index
+        raise WebhookError(403, "Set WEBHOOK_SECRET to accept webhooks over HTTP")
+    
+    if isinstance(body, str):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            raise WebhookError(400, "Webhook body is not valid JSON")
+    if not isinstance(body, dict):
+        raise WebhookError(400, "Webhook payload must be a JSON object")
+    
+    return event.get("event_key") or headers.get("x-event-key") or body.get("webhookEvent"), body
+
+def webhook_repository(payload):
+    """Repository name of a Bitbucket payload, or None when it belongs to another workspace"""
+    repository = payload["repository"]
+    workspace, _, _ = (repository.get("full_name") or "").partition("/")
+    if workspace and workspace != BITBUCKET_WORKSPACE:
+        return None
+    return repository["name"]
+
+def mark_webhook_fresh(index, repo_name, kinds):
+    """Treat kinds of a synced repo as fresh again, since the webhook carried their latest changes"""
+    return index.touch_sync_state(repo_name, kinds) > 0
+
+def ingest_pull_request(index, event_key, payload):
+    """pullrequest:* (created, updated, fulfilled, rejected, ...): re-index the PR's issue keys"""
+    import xref_index
+    
+    repo_name = webhook_repository(payload)
+    if repo_name is None:
+        return {"ingested": False, "reason": "Repository outside the configured workspace"}
+    
+    pr = payload["pullrequest"]
+    source_branch = ((pr.get("source") or {}).get("branch") or {}).get("name", "")
+    keys = extract_jira_references(f"{pr['title']} {pr.get('description') or ''} {source_branch}")
+    index.replace_refs(xref_index.PULL_REQUEST, repo_name, pr["id"], keys, pr["title"], pr.get("updated_on"))
+    
+    return {
+        "repo": repo_name,
+        "issue_keys": keys,
+        "upserted": 1,
+        "removed": 0,
+        "invalidated": response_cache.invalidate("bitbucket", f"repositories/{BITBUCKET_WORKSPACE}/{repo_name}/pullrequests"),
+        "index_fresh": mark_webhook_fresh(index, repo_name, (xref_index.PULL_REQUEST,))
+    }
+
+def ingest_push(index, event_key, payload):
+    """repo:push: index pushed commits and new branches, drop deleted branches"""
+    import xref_index
+    
+    repo_name = webhook_repository(payload)
+    if repo_name is None:
+        return {"ingested": False, "reason": "Repository outside the configured workspace"}
+    
+    keys, upserted, removed, truncated = set(), 0, 0, False
+    for change in payload["push"].get("changes") or ():
+        new, old = change.get("new"), change.get("old")
+        if old and old.get("type") == "branch" and (change.get("closed") or not new):
+            index.remove_ref(xref_index.BRANCH, repo_name, old["name"])
+            removed += 1
+        if new and new.get("type") == "branch":
+            branch_keys = extract_jira_references(new["name"])
+            if branch_keys:
+                index.replace_refs(xref_index.BRANCH, repo_name, new["name"], branch_keys, new["name"], (new.get("target") or {}).get("date"))
+                keys.update(branch_keys)
+                upserted += 1
+        for commit in change.get("commits") or ():
+            commit_keys = extract_jira_references(commit.get("message", ""))
+            if commit_keys:
+                first_line = commit["message"].split('\n')[0]
+                index.replace_refs(xref_index.COMMIT, repo_name, commit["hash"], commit_keys, first_line, commit.get("date"))
+                keys.update(commit_keys)
+                upserted += 1
+        # Bitbucket lists at most a few commits per change; the next sync picks up the rest
+        truncated = truncated or bool(change.get("truncated"))
+    
+    base = f"repositories/{BITBUCKET_WORKSPACE}/{repo_name}"
+    return {
+        "repo": repo_name,
+        "issue_keys": sorted(keys),
+        "upserted": upserted,
+        "removed": removed,
+        "invalidated": response_cache.invalidate("bitbucket", f"{base}/commits") + response_cache.invalidate("bitbucket", f"{base}/refs/branches"),
+        "index_fresh": not truncated and mark_webhook_fresh(index, repo_name, (xref_index.COMMIT, xref_index.BRANCH))
+    }
+
+def ingest_jira_issue(index, event_key, payload):
+    """jira:issue_created / updated / deleted: store the issue summary, drop cached reads of it"""
+    issue = payload["issue"]
+    key = issue["key"]
+    if not extract_jira_references(key):
+        return {"ingested": False, "reason": "Project not in JIRA_PROJECT_KEYS"}
+    
+    fields = issue.get("fields") or {}
+    if event_key == "jira:issue_deleted":
+        index.remove_issue(key)
+    else:
+        index.upsert_issue(key, fields.get("summary"), (fields.get("status") or {}).get("name"), fields.get("updated"))
+    
+    # Any cached search may include the issue; exact issue/{key} paths are dropped too
+    return {
+        "issue_keys": [key],
+        "upserted": 0 if event_key == "jira:issue_deleted" else 1,
+        "removed": 1 if event_key == "jira:issue_deleted" else 0,
+        "invalidated": response_cache.invalidate("jira", f"issue/{key}") + response_cache.invalidate("jira", "search")
+    }
+
+# Event key prefix -> ingestion function, first match wins
+WEBHOOK_HANDLERS = (
+    ("pullrequest:", ingest_pull_request),
+    ("repo:push", ingest_push),
+    ("jira:issue_", ingest_jira_issue),
+)
+
+def ingest_webhook(event):
+    """Apply one Bitbucket or Jira webhook delivery to the cross-reference index and response cache.
+    
+    Returns (status code, response body). Events we don't index are acknowledged
+    with 200 so the sender doesn't keep redelivering them.
+    """
+    try:
+        event_key, payload = webhook_delivery(event)
+    except WebhookError as e:
+        return e.status, {"error": str(e)}
+    
+    ingest = next((fn for prefix, fn in WEBHOOK_HANDLERS if (event_key or "").startswith(prefix)), None)
+    if ingest is None:
+        return 200, {"ingested": False, "event": event_key, "reason": "Unsupported event"}
+    
+    import xref_index
+    
+    try:
+        outcome = ingest(xref_index.get_index(BITBUCKET_WORKSPACE), event_key, payload)
+    except (KeyError, TypeError, AttributeError) as e:
+        return 400, {"error": f"Malformed {event_key} payload: missing or invalid {e}"}
+    return 200, {"ingested": True, "event": event_key, **outcome}
 
 # ============================================================================
 # LAMBDA HANDLER
 # ============================================================================
 
-def get_available_tools():
-    """Return list of available MCP tools"""
-    return [
-        # Jira Tools
-        {
-            "name": "search_jira_issues",
-            "description": "Search Jira issues using JQL with Bitbucket cross-references",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "jql": {"type": "string", "description": "JQL query"},
-                    "max_results": {"type": "integer", "default": 10}
-                },
-                "required": ["jql"]
-            }
-        },
-        {
-            "name": "create_jira_issue",
-            "description": "Create a new Jira issue with optional Bitbucket references",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "project_key": {"type": "string", "description": "Jira project key"},
-                    "summary": {"type": "string", "description": "Issue title"},
-                    "description": {"type": "string", "default": ""},
-                    "issue_type": {"type": "string", "default": "Task"},
-                    "bitbucket_repo": {"type": "string", "description": "Related Bitbucket repository"},
-                    "branch": {"type": "string", "description": "Related branch name"}
-                },
-                "required": ["project_key", "summary"]
-            }
-        },
-        
-        # Bitbucket Tools
-        {
-            "name": "list_bitbucket_repositories",
-            "description": "List Bitbucket repositories with Jira cross-references",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "limit": {"type": "integer", "default": 10}
-                }
-            }
-        },
-        {
-            "name": "list_pull_requests",
-            "description": "List pull requests for a repository with Jira cross-references",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "repo_name": {"type": "string", "description": "Repository name"},
-                    "state": {"type": "string", "default": "OPEN", "description": "PR state (OPEN, MERGED, DECLINED)"},
-                    "limit": {"type": "integer", "default": 10}
-                },
-                "required": ["repo_name"]
-            }
-        },
-        {
-            "name": "create_pull_request",
-            "description": "Create a new pull request with optional Jira issue reference",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "repo_name": {"type": "string", "description": "Repository name"},
-                    "title": {"type": "string", "description": "Pull request title"},
-                    "source_branch": {"type": "string", "description": "Source branch name"},
-                    "dest_branch": {"type": "string", "default": "main", "description": "Destination branch"},
-                    "description": {"type": "string", "default": ""},
-                    "jira_issue": {"type": "string", "description": "Related Jira issue key (e.g., PROJ-123)"}
-                },
-                "required": ["repo_name", "title", "source_branch"]
-            }
-        },
-        {
-            "name": "list_branches",
-            "description": "List branches in a repository",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "repo_name": {"type": "string", "description": "Repository name"},
-                    "limit": {"type": "integer", "default": 10}
-                },
-                "required": ["repo_name"]
-            }
-        },
-        {
-            "name": "get_commits",
-            "description": "Get recent commits from a branch with Jira cross-references",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "repo_name": {"type": "string", "description": "Repository name"},
-                    "branch": {"type": "string", "default": "main", "description": "Branch name"},
-                    "limit": {"type": "integer", "default": 10}
+# Response fields each tool reads, keyed by tool then upstream resource. Jira values
+# are `fields=` lists (key / id always come back); Bitbucket values are partial-response
+# paths and must keep `next` so pagination still works. Add a field here before reading it.
+# The workspace repository listing is shared by several tools (repository_listing), so
+# they all request the union of the fields any of them reads.
+REPOSITORY_LISTING_FIELDS = "next,values.name,values.slug,values.full_name,values.language,values.is_private,values.description"
+
+TOOL_FIELDS = {
+    "search_jira_issues": {
+        "issues": "summary,status,assignee,description",
+        "repositories": REPOSITORY_LISTING_FIELDS,
+    },
+    "create_jira_issues_bulk": {
+        "issues": "labels",
+    },
+    "list_bitbucket_repositories": {
+        "repositories": REPOSITORY_LISTING_FIELDS,
+    },
+    "list_pull_requests": {
+        "pullrequests": "next,values.id,values.title,values.description,values.author.display_name,"
+                        "values.source.branch.name,values.destination.branch.name",
+    },
+    "create_pull_requests_bulk": {
+        "pullrequests": "next,values.id,values.description",
+    },
+    "list_branches": {
+        "branches": "next,values.name",
+    },
+    "get_commits": {
+        "commits": "next,values.hash,values.message,values.author.raw,values.author.user.display_name",
+    },
+    "get_issue_dossier": {
+        "issue": "summary,status,assignee",
+        "repositories": REPOSITORY_LISTING_FIELDS,
+        "pullrequests": "next,values.id,values.title,values.description,values.source.branch.name,values.updated_on",
+        "commits": "next,values.hash,values.message,values.date",
+        "branches": "next,values.name",
+    },
+    "search_cross_references": {
+        "issue": "summary",
+        "repositories": REPOSITORY_LISTING_FIELDS,
+        "pullrequests": "next,values.id,values.title,values.description,values.source.branch.name,values.updated_on",
+        "commits": "next,values.hash,values.message,values.date",
+        "branches": "next,values.name,values.target.date",
+    },
+}
+
+def tool_fields(tool, resource, separator="&"):
+    """Query-string suffix limiting a response to TOOL_FIELDS[tool][resource]"""
+    if not FIELD_PROJECTION_ENABLED:
+        return ""
+    return f"{separator}fields={quote(TOOL_FIELDS[tool][resource], safe=',.')}"
+
+# Shared by every tool's inputSchema
+OUTPUT_FORMAT_SCHEMA = {
+    "type": "string",
+    "default": "text",
+    "description": "text (readable), json (compact records with IDs) or summary (token-budgeted one-liners)"
+}
+
+CURSOR_SCHEMA = {
+    "type": "string",
+    "description": "Continue a previous listing from its returned cursor (limit sets the size of the next chunk)"
+}
+
+IDEMPOTENCY_KEY_SCHEMA = {
+    "type": "string",
+    "description": "Retrying with the same key reports the item as existing instead of creating it again"
+}
+
+BATCH_IDEMPOTENCY_KEY_SCHEMA = {
+    "type": "string",
+    "description": "Key for the whole batch; each item's key is derived from it and the item's content"
+}
+
+# MCP tool schemas: built once at import and served as-is by list_tools
+AVAILABLE_TOOLS = [
+    # Jira Tools
+    {
+        "name": "search_jira_issues",
+        "description": "Search Jira issues using JQL with Bitbucket cross-references",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "jql": {"type": "string", "description": "JQL query"},
+                "max_results": {"type": "integer", "default": 10},
+                "cursor": CURSOR_SCHEMA,
+                "output_format": OUTPUT_FORMAT_SCHEMA
+            },
+            "required": ["jql"]
+        }
+    },
+    {
+        "name": "create_jira_issue",
+        "description": "Create a new Jira issue with optional Bitbucket references",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "project_key": {"type": "string", "description": "Jira project key"},
+                "summary": {"type": "string", "description": "Issue title"},
+                "description": {"type": "string", "default": ""},
+                "issue_type": {"type": "string", "default": "Task"},
+                "bitbucket_repo": {"type": "string", "description": "Related Bitbucket repository"},
+                "branch": {"type": "string", "description": "Related branch name"},
+                "output_format": OUTPUT_FORMAT_SCHEMA
+            },
+            "required": ["project_key", "summary"]
+        }
+    },
+    {
+        "name": "create_jira_issues_bulk",
+        "description": "Create many Jira issues in one call (issue/bulk), with per-item results and optional idempotency keys",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "issues": {
+                    "type": "array",
+                    "description": "Issues to create; each takes the create_jira_issue arguments",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "project_key": {"type": "string"},
+                            "summary": {"type": "string"},
+                            "description": {"type": "string", "default": ""},
+                            "issue_type": {"type": "string", "default": "Task"},
+                            "bitbucket_repo": {"type": "string"},
+                            "branch": {"type": "string"},
+                            "idempotency_key": IDEMPOTENCY_KEY_SCHEMA
+                        },
+                        "required": ["project_key", "summary"]
+                    }
                 },
-                "required": ["repo_name"]
+                "idempotency_key": BATCH_IDEMPOTENCY_KEY_SCHEMA,
+                "output_format": OUTPUT_FORMAT_SCHEMA
+            },
+            "required": ["issues"]
+        }
+    },
+    
+    # Bitbucket Tools
+    {
+        "name": "list_bitbucket_repositories",
+        "description": "List Bitbucket repositories with Jira cross-references",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "limit": {"type": "integer", "default": 10},
+                "cursor": CURSOR_SCHEMA,
+                "output_format": OUTPUT_FORMAT_SCHEMA
             }
-        },
-        
-        # Cross-Reference Tools
-        {
-            "name": "search_cross_references",
-            "description": "Find Bitbucket references for a Jira issue",
-            "inputSchema": {
-                "type": "object",
-                "properties": {
-                    "jira_issue_key": {"type": "string", "description": "Jira issue key (e.g., PROJ-123)"}
+        }
+    },
+    {
+        "name": "list_pull_requests",
+        "description": "List pull requests for a repository with Jira cross-references",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "repo_name": {"type": "string", "description": "Repository name"},
+                "state": {"type": "string", "default": "OPEN", "description": "PR state (OPEN, MERGED, DECLINED)"},
+                "limit": {"type": "integer", "default": 10},
+                "cursor": CURSOR_SCHEMA,
+                "output_format": OUTPUT_FORMAT_SCHEMA
+            },
+            "required": ["repo_name"]
+        }
+    },
+    {
+        "name": "create_pull_request",
+        "description": "Create a new pull request with optional Jira issue reference",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "repo_name": {"type": "string", "description": "Repository name"},
+                "title": {"type": "string", "description": "Pull request title"},
+                "source_branch": {"type": "string", "description": "Source branch name"},
+                "dest_branch": {"type": "string", "default": "main", "description": "Destination branch"},
+                "description": {"type": "string", "default": ""},
+                "jira_issue": {"type": "string", "description": "Related Jira issue key (e.g., PROJ-123)"},
+                "output_format": OUTPUT_FORMAT_SCHEMA
+            },
+            "required": ["repo_name", "title", "source_branch"]
+        }
+    },
+    {
+        "name": "create_pull_requests_bulk",
+        "description": "Create many pull requests across repositories in one call, with per-item results and optional idempotency keys",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "pull_requests": {
+                    "type": "array",
+                    "description": "Pull requests to create; each takes the create_pull_request arguments",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "repo_name": {"type": "string"},
+                            "title": {"type": "string"},
+                            "source_branch": {"type": "string"},
+                            "dest_branch": {"type": "string", "default": "main"},
+                            "description": {"type": "string", "default": ""},
+                            "jira_issue": {"type": "string"},
+                            "idempotency_key": IDEMPOTENCY_KEY_SCHEMA
+                        },
+                        "required": ["repo_name", "title", "source_branch"]
+                    }
                 },
-                "required": ["jira_issue_key"]
-            }
+                "idempotency_key": BATCH_IDEMPOTENCY_KEY_SCHEMA,
+                "output_format": OUTPUT_FORMAT_SCHEMA
+            },
+            "required": ["pull_requests"]
+        }
+    },
+    {
+        "name": "list_branches",
+        "description": "List branches in a repository",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "repo_name": {"type": "string", "description": "Repository name"},
+                "limit": {"type": "integer", "default": 10},
+                "cursor": CURSOR_SCHEMA,
+                "output_format": OUTPUT_FORMAT_SCHEMA
+            },
+            "required": ["repo_name"]
+        }
+    },
+    {
+        "name": "get_commits",
+        "description": "Get recent commits from a branch with Jira cross-references",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "repo_name": {"type": "string", "description": "Repository name"},
+                "branch": {"type": "string", "default": "main", "description": "Branch name"},
+                "limit": {"type": "integer", "default": 10},
+                "cursor": CURSOR_SCHEMA,
+                "output_format": OUTPUT_FORMAT_SCHEMA
+            },
+            "required": ["repo_name"]
+        }
+    },
+    
+    # Cross-Reference Tools
+    {
+        "name": "search_cross_references",
+        "description": "Find Bitbucket references for a Jira issue",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "jira_issue_key": {"type": "string", "description": "Jira issue key (e.g., PROJ-123)"},
+                "index_mode": {"type": "string", "default": "live", "description": "live (search PRs), index (refresh cross-reference index, then look up) or index_only (look up without refreshing)"},
+                "state": {"type": "string", "description": "live mode: PR state (OPEN, MERGED, DECLINED, SUPERSEDED or ALL; default OPEN)"},
+                "updated_since": {"type": "string", "description": "live mode: only PRs updated after this ISO 8601 date or timestamp"},
+                "cursor": {"type": "string", "description": "Resume a search cut short by the deadline (from a previous result)"},
+                "output_format": OUTPUT_FORMAT_SCHEMA
+            },
+            "required": ["jira_issue_key"]
+        }
+    },
+    {
+        "name": "get_issue_dossier",
+        "description": "Everything about one or more Jira issues in one call: details, referencing PRs, branches named after the key and commits mentioning it",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "jira_issue_keys": {"type": "array", "items": {"type": "string"}, "description": "Jira issue keys (e.g., [\"PROJ-123\"]), at most 10"},
+                "state": {"type": "string", "default": "ALL", "description": "PR state (OPEN, MERGED, DECLINED, SUPERSEDED or ALL)"},
+                "commit_limit": {"type": "integer", "default": DOSSIER_COMMIT_LIMIT, "description": "Recent commits scanned per repository"},
+                "output_format": OUTPUT_FORMAT_SCHEMA
+            },
+            "required": ["jira_issue_keys"]
         }
-    ]
+    }
+]
 
-def lambda_handler(event, context):
-    """AWS Lambda handler for Atlassian Suite MCP requests"""
+def get_available_tools():
+    """Return list of available MCP tools"""
+    return AVAILABLE_TOOLS
+
+# Tool dispatch table: tool name -> function taking the MCP arguments dict
+TOOL_HANDLERS = {
+    # Jira Tools
+    "search_jira_issues": lambda args: search_jira_issues(
+        args.get("jql"),
+        args.get("max_results", 10),
+        args.get("cursor"),
+        args.get("output_format", "text")
+    ),
+    "create_jira_issue": lambda args: create_jira_issue(
+        args.get("project_key"),
+        args.get("summary"),
+        args.get("description", ""),
+        args.get("issue_type", "Task"),
+        args.get("bitbucket_repo"),
+        args.get("branch"),
+        args.get("output_format", "text")
+    ),
+    "create_jira_issues_bulk": lambda args: create_jira_issues_bulk(
+        args.get("issues"),
+        args.get("idempotency_key"),
+        args.get("output_format", "text")
+    ),
     
+    # Bitbucket Tools
+    "list_bitbucket_repositories": lambda args: list_bitbucket_repositories(args.get("limit", 10), args.get("cursor"), args.get("output_format", "text")),
+    "list_pull_requests": lambda args: list_pull_requests(
+        args.get("repo_name"),
+        args.get("state", "OPEN"),
+        args.get("limit", 10),
+        args.get("cursor"),
+        args.get("output_format", "text")
+    ),
+    "create_pull_request": lambda args: create_pull_request(
+        args.get("repo_name"),
+        args.get("title"),
+        args.get("source_branch"),
+        args.get("dest_branch", "main"),
+        args.get("description", ""),
+        args.get("jira_issue"),
+        args.get("output_format", "text")
+    ),
+    "create_pull_requests_bulk": lambda args: create_pull_requests_bulk(
+        args.get("pull_requests"),
+        args.get("idempotency_key"),
+        args.get("output_format", "text")
+    ),
+    "list_branches": lambda args: list_branches(
+        args.get("repo_name"),
+        args.get("limit", 10),
+        args.get("cursor"),
+        args.get("output_format", "text")
+    ),
+    "get_commits": lambda args: get_commits(
+        args.get("repo_name"),
+        args.get("branch", "main"),
+        args.get("limit", 10),
+        args.get("cursor"),
+        args.get("output_format", "text")
+    ),
+    
+    # Cross-Reference Tools
+    "search_cross_references": lambda args: search_cross_references(
+        args.get("jira_issue_key"),
+        args.get("index_mode", "live"),
+        args.get("state"),
+        args.get("updated_since"),
+        args.get("cursor"),
+        args.get("output_format", "text")
+    ),
+    "get_issue_dossier": lambda args: get_issue_dossier(
+        args.get("jira_issue_keys"),
+        args.get("state", "ALL"),
+        args.get("commit_limit", DOSSIER_COMMIT_LIMIT),
+        args.get("output_format", "text")
+    ),
+}
+
+def run_tool(tool_name, args):
+    """Call one tool handler, recording its span on the invocation trace"""
+    span = ToolSpan(tool_name)
+    token = _current_span.set(span)
+    started = time.perf_counter()
     try:
-        action = event.get("action")
+        result = TOOL_HANDLERS[tool_name](args)
+        span.chars = len(result)
+        return result
+    except Exception:
+        span.error = True
+        raise
+    finally:
+        span.elapsed = time.perf_counter() - started
+        _current_span.reset(token)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.record(span)
+
+# Tools that create data are never deduplicated within a batch
+WRITE_TOOLS = {"create_jira_issue", "create_pull_request", "create_jira_issues_bulk", "create_pull_requests_bulk"}
+
+def call_tools(calls):
+    """Run a batch of {tool_name, arguments} calls concurrently within one invocation.
+    
+    Identical read-only calls run once and share their result; the shared HTTP
+    pool, cache and rate limiters dedupe overlapping upstream requests. Returns
+    per-item {"result": ...} or {"error": ...} in input order, plus whether the
+    deadline cut the batch short.
+    """
+    tasks = []
+    task_by_key = {}
+    slots = []
+    for call in calls:
+        if not isinstance(call, dict):
+            slots.append({"error": f"Expected {{tool_name, arguments}}, got {type(call).__name__}"})
+            continue
+        tool_name = call.get("tool_name")
+        args = call.get("arguments") or {}
+        if not isinstance(tool_name, str) or tool_name not in TOOL_HANDLERS:
+            slots.append({"error": f"Unknown tool: {tool_name}"})
+            continue
+        if not isinstance(args, dict):
+            slots.append({"error": f"arguments must be an object, got {type(args).__name__}"})
+            continue
         
-        if action == "list_tools":
-            return {
-                "statusCode": 200,
-                "body": json.dumps({"tools": get_available_tools()})
-            }
+        key = None if tool_name in WRITE_TOOLS else json.dumps([tool_name, args], sort_keys=True)
+        if key is None or key not in task_by_key:
+            task_by_key[key] = len(tasks)
+            tasks.append((tool_name, args))
+        slots.append(task_by_key[key])
+    
+    outcome = fan_out(lambda task: run_tool(*task), tasks, max_workers=BATCH_MAX_WORKERS)
+    
+    results = []
+    for slot in slots:
+        if isinstance(slot, dict):
+            results.append(slot)
+        elif slot in outcome.errors:
+            results.append({"error": str(outcome.errors[slot])})
+        elif outcome.results[slot] is None:
+            results.append({"error": "Not completed before the invocation deadline"})
+        else:
+            results.append({"result": outcome.results[slot]})
+    return results, outcome.truncated
+
+def event_action(event):
+    """The action an event asks for; HTTP events (function URL, API Gateway) are webhook deliveries"""
+    if "action" not in event and "requestContext" in event:
+        return "ingest_webhook"
+    return event.get("action")
+
+def handle_action(event):
+    """Dispatch one MCP request event; returns (status code, response body)"""
+    action = event_action(event)
+    
+    if action == "list_tools":
+        return 200, {"tools": get_available_tools()}
+    
+    elif action == "get_metrics":
+        return 200, {"metrics": get_metrics()}
+    
+    elif action == "call_tool":
+        tool_name = event.get("tool_name")
+        args = event.get("arguments", {})
         
-        elif action == "call_tool":
-            tool_name = event.get("tool_name")
-            args = event.get("arguments", {})
-            
-            # Jira Tools
-            if tool_name == "search_jira_issues":
-                result = search_jira_issues(args.get("jql"), args.get("max_results", 10))
-            
-            elif tool_name == "create_jira_issue":
-                result = create_jira_issue(
-                    args.get("project_key"),
-                    args.get("summary"),
-                    args.get("description", ""),
-                    args.get("issue_type", "Task"),
-                    args.get("bitbucket_repo"),
-                    args.get("branch")
-                )
-            
-            # Bitbucket Tools
-            elif tool_name == "list_bitbucket_repositories":
-                result = list_bitbucket_repositories(args.get("limit", 10))
-            
-            elif tool_name == "list_pull_requests":
-                result = list_pull_requests(
-                    args.get("repo_name"),
-                    args.get("state", "OPEN"),
-                    args.get("limit", 10)
-                )
-            
-            elif tool_name == "create_pull_request":
-                result = create_pull_request(
-                    args.get("repo_name"),
-                    args.get("title"),
-                    args.get("source_branch"),
-                    args.get("dest_branch", "main"),
-                    args.get("description", ""),
-                    args.get("jira_issue")
-                )
-            
-            elif tool_name == "list_branches":
-                result = list_branches(args.get("repo_name"), args.get("limit", 10))
-            
-            elif tool_name == "get_commits":
-                result = get_commits(
-                    args.get("repo_name"),
-                    args.get("branch", "main"),
-                    args.get("limit", 10)
-                )
-            
-            # Cross-Reference Tools
-            elif tool_name == "search_cross_references":
-                result = search_cross_references(args.get("jira_issue_key"))
-            
-            else:
-                return {
-                    "statusCode": 400,
-                    "body": json.dumps({"error": f"Unknown tool: {tool_name}"})
-                }
-            
-            return {
-                "statusCode": 200,
-                "body": json.dumps({"result": result})
-            }
+        if tool_name not in TOOL_HANDLERS:
+            return 400, {"error": f"Unknown tool: {tool_name}"}
         
-        else:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": f"Unknown action: {action}"})
-            }
+        return 200, {"result": run_tool(tool_name, args)}
+    
+    elif action == "call_tools":
+        calls = event.get("calls")
+        if not isinstance(calls, list):
+            return 400, {"error": "call_tools requires a list of {tool_name, arguments} in 'calls'"}
+        
+        results, truncated = call_tools(calls)
+        return 200, {"results": results, "truncated": truncated}
+    
+    elif action == "ingest_webhook":
+        return ingest_webhook(event)
+    
+    else:
+        return 400, {"error": f"Unknown action: {action}"}
+
+def lambda_handler(event, context):
+    """AWS Lambda handler for Atlassian Suite MCP requests.
     
+    Each invocation is traced: one EMF metrics line is printed to the function's
+    log, and "debug": true in the event adds a _timings breakdown to the body.
+    """
+    action = event_action(event)
+    debug = bool(event.get("debug"))
+    trace = InvocationTrace(action) if METRICS_LOG_ENABLED or debug else None
+    
+    deadline_token = _current_deadline.set(Deadline.from_context(context))
+    trace_token = _current_trace.set(trace)
+    try:
+        status, body = handle_action(event)
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "body": json.dumps({"error": str(e)})
-        }
+        status, body = 500, {"error": str(e)}
+    finally:
+        _current_trace.reset(trace_token)
+        _current_deadline.reset(deadline_token)
+    
+    if trace is not None:
+        if debug:
+            body["_timings"] = trace.timings(detail=True)
+        if METRICS_LOG_ENABLED:
+            # Only known tool names become a metric dimension
+            tool = event.get("tool_name") if action == "call_tool" and event.get("tool_name") in TOOL_HANDLERS else None
+            print(json.dumps(trace.emf(tool), separators=(",", ":"), default=str))
+    
+    return {
+        "statusCode": status,
+        "body": json.dumps(body)
+    }
 
 # AWS Lambda entry point
 if __name__ == "__main__":
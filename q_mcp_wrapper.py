@@ -1,42 +1,219 @@
 #!/usr/bin/env python3
 """Minimal Q CLI MCP Wrapper for AWS Lambda"""
 
+import asyncio
+import hashlib
 import json
 import sys
 import subprocess
 import tempfile
+import threading
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-def invoke_lambda(payload):
-    """Invoke AWS Lambda function"""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        json.dump(payload, f)
-        payload_file = f.name
+# Invocation settings (override via the "env" block in q-mcp-config.json)
+FUNCTION_NAME = os.environ.get("ATLASSIAN_MCP_FUNCTION", "atlassian-mcp-server")
+REGION = os.environ.get("AWS_REGION", "us-west-2")
+PROFILE = os.environ.get("AWS_PROFILE", "AdministratorAccess-542754948868")
+# boto3 (persistent in-process client), cli (aws CLI per call) or local (import lambda_handler)
+BACKEND = os.environ.get("ATLASSIAN_MCP_BACKEND", "boto3")
+# Optional custom Lambda endpoint, e.g. a local stand-in for benchmarks
+ENDPOINT_URL = os.environ.get("ATLASSIAN_MCP_ENDPOINT_URL")
+# Max requests dispatched to Lambda at once; further requests queue (and can be cancelled)
+MAX_CONCURRENCY = int(os.environ.get("ATLASSIAN_MCP_MAX_CONCURRENCY", "8"))
+# Persisted tools/list result, revalidated when the deployed code changes
+TOOLS_CACHE_FILE = os.environ.get(
+    "ATLASSIAN_MCP_TOOLS_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "atlassian-mcp", f"tools-{FUNCTION_NAME}.json")
+)
+# Tools that create something (lambda_handler.WRITE_TOOLS); invocations calling them are never retried
+WRITE_TOOLS = {"create_jira_issue", "create_pull_request", "create_jira_issues_bulk", "create_pull_requests_bulk"}
+
+def retry_safe(payload):
+    """Whether an invocation can be sent twice: a retried write tool would create its items again"""
+    if payload.get("action") == "call_tool":
+        return payload.get("tool_name") not in WRITE_TOOLS
+    if payload.get("action") == "call_tools":
+        return not any(isinstance(call, dict) and call.get("tool_name") in WRITE_TOOLS for call in payload.get("calls") or ())
+    return True
+
+class Boto3Backend:
+    """Long-lived boto3 Lambda client: payloads stay in memory, connections are reused"""
     
-    response_file = tempfile.mktemp(suffix='.json')
+    def __init__(self):
+        import boto3
+        from botocore.config import Config
+        
+        session = boto3.Session(profile_name=PROFILE or None, region_name=REGION)
+        config = Config(tcp_keepalive=True, max_pool_connections=16, read_timeout=900, retries={"mode": "standard"})
+        self.client = session.client("lambda", endpoint_url=ENDPOINT_URL, config=config)
+        # A write that timed out or lost its response may still have run; send those once
+        self.write_client = session.client(
+            "lambda",
+            endpoint_url=ENDPOINT_URL,
+            config=config.merge(Config(retries={"mode": "standard", "total_max_attempts": 1}))
+        )
     
-    cmd = [
-        "aws", "lambda", "invoke",
-        "--function-name", "atlassian-mcp-server",
-        "--region", "us-west-2",
-        "--profile", "AdministratorAccess-542754948868",
-        "--cli-binary-format", "raw-in-base64-out",
-        "--payload", f"file://{payload_file}",
-        response_file
-    ]
+    def function_version(self):
+        """CodeSha256 of the deployed function (control-plane call, no invocation)"""
+        return self.client.get_function_configuration(FunctionName=FUNCTION_NAME)["CodeSha256"]
     
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    def invoke(self, payload):
+        client = self.client if retry_safe(payload) else self.write_client
+        response = client.invoke(FunctionName=FUNCTION_NAME, Payload=json.dumps(payload).encode())
+        body = response["Payload"].read()
+        if response.get("FunctionError"):
+            return {"statusCode": 500, "body": json.dumps({"error": body.decode()})}
+        return json.loads(body)
+
+class CliBackend:
+    """Spawns the aws CLI per request (fallback when boto3 is not installed)"""
     
-    if result.returncode != 0:
-        return {"statusCode": 500, "body": json.dumps({"error": result.stderr})}
+    def base_command(self, operation):
+        cmd = ["aws", "lambda", operation, "--function-name", FUNCTION_NAME, "--region", REGION]
+        if PROFILE:
+            cmd += ["--profile", PROFILE]
+        if ENDPOINT_URL:
+            cmd += ["--endpoint-url", ENDPOINT_URL]
+        return cmd
     
-    with open(response_file, 'r') as f:
-        response = json.load(f)
+    def function_version(self):
+        cmd = self.base_command("get-function-configuration") + ["--query", "CodeSha256", "--output", "text"]
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        return result.stdout.strip()
     
-    os.unlink(payload_file)
-    os.unlink(response_file)
+    def invoke(self, payload):
+        fd, response_file = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        
+        cmd = self.base_command("invoke") + [
+            "--cli-binary-format", "raw-in-base64-out",
+            "--payload", json.dumps(payload),
+            response_file
+        ]
+        
+        # The CLI retries failed calls too; writes are sent once
+        env = None if retry_safe(payload) else dict(os.environ, AWS_MAX_ATTEMPTS="1")
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+            if result.returncode != 0:
+                return {"statusCode": 500, "body": json.dumps({"error": result.stderr})}
+            with open(response_file, 'r') as f:
+                return json.load(f)
+        finally:
+            os.unlink(response_file)
+
+class LocalBackend:
+    """Calls lambda_handler in process (development and testing)"""
+    
+    def __init__(self):
+        import lambda_handler
+        # stdout carries JSON-RPC here, so the per-invocation EMF log line must stay off it
+        lambda_handler.METRICS_LOG_ENABLED = False
+        self.module = lambda_handler
+    
+    def function_version(self):
+        with open(self.module.__file__, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    
+    def invoke(self, payload):
+        return self.module.lambda_handler(payload, None)
+
+BACKENDS = {"boto3": Boto3Backend, "cli": CliBackend, "local": LocalBackend}
+
+_backend = None
+
+def get_backend():
+    """Create the configured invocation backend once per wrapper process"""
+    global _backend
+    if _backend is None:
+        if BACKEND not in BACKENDS:
+            raise ValueError(f"Unknown ATLASSIAN_MCP_BACKEND: {BACKEND} (expected {', '.join(BACKENDS)})")
+        try:
+            _backend = BACKENDS[BACKEND]()
+        except ImportError:
+            # boto3 missing: keep working through the aws CLI
+            print("boto3 not installed, falling back to the aws CLI backend", file=sys.stderr)
+            _backend = CliBackend()
+    return _backend
+
+def invoke_lambda(payload):
+    """Invoke AWS Lambda function"""
+    return get_backend().invoke(payload)
+
+def schema_hash(tools):
+    return hashlib.sha256(json.dumps(tools, sort_keys=True).encode()).hexdigest()
+
+def load_tools_cache():
+    """Read the persisted tool schema, ignoring missing or corrupted files"""
+    try:
+        with open(TOOLS_CACHE_FILE, "r") as f:
+            entry = json.load(f)
+        if entry.get("hash") == schema_hash(entry["tools"]):
+            return entry
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+def save_tools_cache(entry):
+    os.makedirs(os.path.dirname(TOOLS_CACHE_FILE), exist_ok=True)
+    temp_file = f"{TOOLS_CACHE_FILE}.{os.getpid()}.tmp"
+    with open(temp_file, "w") as f:
+        json.dump(entry, f)
+    os.replace(temp_file, TOOLS_CACHE_FILE)
+
+def refresh_tools_cache(cached=None, tools=None):
+    """Fetch the tool schema unless the cached copy matches the deployed function version"""
+    try:
+        version = get_backend().function_version()
+    except Exception as e:
+        # e.g. a role allowed to invoke the function but not to read its configuration
+        print(f"Could not read the function version, fetching the tool schema: {e}", file=sys.stderr)
+        version = None
+    if cached and version is not None and cached.get("function_version") == version:
+        return cached
+    
+    if tools is None:
+        response = invoke_lambda({"action": "list_tools"})
+        if response.get("statusCode") != 200:
+            raise RuntimeError(json.loads(response.get("body", "{}")).get("error", "list_tools failed"))
+        tools = json.loads(response.get("body", "{}")).get("tools", [])
     
-    return response
+    entry = {"function_version": version, "hash": schema_hash(tools), "tools": tools}
+    save_tools_cache(entry)
+    return entry
+
+_tools_cache = None
+_tools_lock = threading.Lock()
+
+def revalidate_tools_cache(cached):
+    """Background check against the deployed version; updates memory and disk if it changed"""
+    global _tools_cache
+    try:
+        entry = refresh_tools_cache(cached)
+        with _tools_lock:
+            _tools_cache = entry
+    except Exception as e:
+        print(f"Tool schema revalidation failed: {e}", file=sys.stderr)
+
+def get_tools():
+    """Tool schema for tools/list: served from the persisted cache without a Lambda round-trip"""
+    global _tools_cache
+    with _tools_lock:
+        if _tools_cache is None:
+            cached = load_tools_cache()
+            if cached:
+                _tools_cache = cached
+                threading.Thread(target=revalidate_tools_cache, args=(cached,), daemon=True).start()
+            else:
+                _tools_cache = refresh_tools_cache()
+        return _tools_cache["tools"]
+
+def valid_tool_call(request):
+    """Whether a tools/call request has an object params with a string name and object arguments"""
+    params = request.get("params")
+    return (isinstance(params, dict) and isinstance(params.get("name"), str)
+            and isinstance(params.get("arguments", {}), dict))
 
 def handle_request(request):
     """Handle MCP request"""
@@ -56,12 +233,11 @@ def handle_request(request):
         }
     
     elif method == "tools/list":
-        response = invoke_lambda({"action": "list_tools"})
-        if response.get("statusCode") == 200:
-            body = json.loads(response.get("body", "{}"))
-            return {"jsonrpc": "2.0", "id": request_id, "result": {"tools": body.get("tools", [])}}
+        return {"jsonrpc": "2.0", "id": request_id, "result": {"tools": get_tools()}}
     
     elif method == "tools/call":
+        if not valid_tool_call(request):
+            return error_response(request_id, -32602, "Invalid params: expected {name, arguments}")
         payload = {
             "action": "call_tool",
             "tool_name": params.get("name"),
@@ -82,13 +258,132 @@ def handle_request(request):
         "error": {"code": -32601, "message": f"Method not found: {method}"}
     }
 
+def handle_batch(requests):
+    """Handle a JSON-RPC batch, sending all tools/call entries in one call_tools invocation"""
+    # Malformed tools/call entries are answered on their own by handle_request
+    tool_calls = [r for r in requests if isinstance(r, dict) and r.get("method") == "tools/call" and valid_tool_call(r)]
+    tool_responses = {}
+    
+    if tool_calls:
+        payload = {
+            "action": "call_tools",
+            "calls": [
+                {
+                    "tool_name": r["params"]["name"],
+                    "arguments": r["params"].get("arguments", {})
+                }
+                for r in tool_calls
+            ]
+        }
+        response = invoke_lambda(payload)
+        body = json.loads(response.get("body", "{}"))
+        results = body.get("results") or [{"error": body.get("error", "Batch invocation failed")}] * len(tool_calls)
+        
+        for request, item in zip(tool_calls, results):
+            if "error" in item:
+                result = {"content": [{"type": "text", "text": f"❌ {item['error']}"}], "isError": True}
+            else:
+                result = {"content": [{"type": "text", "text": item.get("result", "")}]}
+            tool_responses[id(request)] = {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+    
+    responses = []
+    for request in requests:
+        if id(request) in tool_responses:
+            response = tool_responses[id(request)]
+        elif isinstance(request, dict):
+            response = handle_request(request)
+        else:
+            response = {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}}
+        # Notifications (no id) get no response
+        if not isinstance(request, dict) or "id" in request:
+            responses.append(response)
+    return responses
+
+def error_response(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+def handle_message(message):
+    """Handle one decoded JSON-RPC message (single request or batch)"""
+    if isinstance(message, list):
+        if not message:
+            return error_response(None, -32600, "Invalid Request: empty batch")
+        return handle_batch(message) or None
+    if not isinstance(message, dict):
+        return error_response(None, -32600, "Invalid Request")
+    response = handle_request(message)
+    # Notifications (no id) get no response
+    return response if "id" in message else None
+
+def write_message(message):
+    sys.stdout.write(json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+async def serve():
+    """Read JSON-RPC lines from stdin and answer them concurrently, in completion order.
+    
+    Up to MAX_CONCURRENCY requests run at once; responses carry the request id
+    so clients can correlate them. notifications/cancelled drops a queued
+    request before it reaches Lambda, or discards the response of one already
+    running (an in-flight Lambda invocation cannot be aborted).
+    """
+    loop = asyncio.get_running_loop()
+    reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stdin")
+    workers = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="invoke")
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    in_flight = {}
+    
+    async def dispatch(message):
+        request_id = message.get("id") if isinstance(message, dict) else None
+        try:
+            async with semaphore:
+                response = await loop.run_in_executor(workers, handle_message, message)
+        except asyncio.CancelledError:
+            return  # Cancelled requests are not answered
+        except Exception as e:
+            print(f"Request {request_id} failed: {e}", file=sys.stderr)
+            response = error_response(request_id, -32603, f"Internal error: {e}")
+        if response is not None:
+            write_message(response)
+    
+    while True:
+        line = await loop.run_in_executor(reader, sys.stdin.readline)
+        if not line:
+            break
+        if not line.strip():
+            continue
+        
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"Malformed JSON-RPC line: {line.strip()[:200]}", file=sys.stderr)
+            write_message(error_response(None, -32700, f"Parse error: {e}"))
+            continue
+        
+        if isinstance(message, dict) and message.get("method") == "notifications/cancelled":
+            params = message.get("params")
+            task = in_flight.get(json.dumps(params.get("requestId"))) if isinstance(params, dict) else None
+            if task:
+                task.cancel()
+            continue
+        
+        task = asyncio.create_task(dispatch(message))
+        if isinstance(message, dict) and "id" in message:
+            key = json.dumps(message["id"])
+            in_flight[key] = task
+            task.add_done_callback(lambda _, key=key: in_flight.pop(key, None))
+    
+    # stdin closed: let outstanding requests finish before exiting
+    pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    workers.shutdown(wait=False)
+    reader.shutdown(wait=False)
+
 if __name__ == "__main__":
-    for line in sys.stdin:
-        if line.strip():
-            try:
-                request = json.loads(line.strip())
-                response = handle_request(request)
-                print(json.dumps(response))
-                sys.stdout.flush()
-            except:
-                continue
+    if sys.argv[1:] == ["--seed-tools-cache"]:
+        # Run by deploy.sh: persist the schema of the code just deployed
+        import lambda_handler
+        entry = refresh_tools_cache(tools=lambda_handler.get_available_tools())
+        print(f"✅ Cached {len(entry['tools'])} tool schemas for {FUNCTION_NAME} ({(entry['function_version'] or 'version unknown')[:12]})")
+    else:
+        asyncio.run(serve())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Persistent Jira issue key -> Bitbucket PR / commit / branch cross-reference index
+Stored as SQLite under /tmp so it survives warm Lambda invocations
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+
+XREF_INDEX_PATH = os.environ.get("XREF_INDEX_PATH", "/tmp/xref_index.sqlite3")
+XREF_INDEX_SNAPSHOT = os.environ.get(
+    "XREF_INDEX_SNAPSHOT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "xref_index.snapshot.sqlite3")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS refs (
+    issue_key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    ref_id TEXT NOT NULL,
+    title TEXT,
+    updated_on TEXT,
+    PRIMARY KEY (issue_key, kind, repo, ref_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS refs_by_ref ON refs (repo, kind, ref_id);
+CREATE TABLE IF NOT EXISTS issues (
+    issue_key TEXT PRIMARY KEY,
+    summary TEXT,
+    status TEXT,
+    updated_on TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sync_state (
+    repo TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    watermark TEXT,
+    synced_at REAL,
+    PRIMARY KEY (repo, kind)
+) WITHOUT ROWID;
+"""
+
+# Reference kinds stored in the index
+PULL_REQUEST = "pr"
+COMMIT = "commit"
+BRANCH = "branch"
+KINDS = (PULL_REQUEST, COMMIT, BRANCH)
+
+class XrefIndex:
+    """Inverted index from Jira issue key to the Bitbucket objects that mention it"""
+
+    def __init__(self, path, workspace):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+        # An index (or bundled snapshot) built for another workspace is useless
+        row = self.conn.execute("SELECT value FROM meta WHERE name = 'workspace'").fetchone()
+        if row is None or row[0] != workspace:
+            with self.lock:
+                self.conn.execute("BEGIN")
+                self.conn.execute("DELETE FROM refs")
+                self.conn.execute("DELETE FROM issues")
+                self.conn.execute("DELETE FROM sync_state")
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('workspace', ?)", (workspace,))
+                self.conn.execute("COMMIT")
+
+    def replace_refs(self, kind, repo, ref_id, issue_keys, title="", updated_on=None):
+        """Record which issue keys one PR / commit / branch mentions, replacing older rows"""
+        ref_id = str(ref_id)
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.execute(
+                    "DELETE FROM refs WHERE repo = ? AND kind = ? AND ref_id = ?",
+                    (repo, kind, ref_id)
+                )
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO refs VALUES (?, ?, ?, ?, ?, ?)",
+                    [(key, kind, repo, ref_id, title, updated_on) for key in issue_keys]
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def remove_ref(self, kind, repo, ref_id):
+        """Drop a PR / commit / branch from the index (e.g. deleted branch)"""
+        with self.lock:
+            self.conn.execute(
+                "DELETE FROM refs WHERE repo = ? AND kind = ? AND ref_id = ?",
+                (repo, kind, str(ref_id))
+            )
+
+    def lookup(self, issue_key):
+        """Return (kind, repo, ref_id, title, updated_on) rows for an issue key"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT kind, repo, ref_id, title, updated_on FROM refs "
+                "WHERE issue_key = ? ORDER BY kind, repo, updated_on DESC",
+                (issue_key,)
+            ).fetchall()
+
+    def upsert_issue(self, issue_key, summary, status=None, updated_on=None):
+        """Store the Jira issue details reported by a webhook"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?)",
+                (issue_key, summary, status, updated_on)
+            )
+
+    def remove_issue(self, issue_key):
+        with self.lock:
+            self.conn.execute("DELETE FROM issues WHERE issue_key = ?", (issue_key,))
+
+    def get_issue(self, issue_key):
+        """Return (summary, status, updated_on) stored for an issue, or None"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT summary, status, updated_on FROM issues WHERE issue_key = ?",
+                (issue_key,)
+            ).fetchone()
+
+    def get_sync_state(self, repo, kind):
+        """Return (watermark, synced_at) for a repo / kind, or (None, None) if never synced"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT watermark, synced_at FROM sync_state WHERE repo = ? AND kind = ?",
+                (repo, kind)
+            ).fetchone()
+        return row if row else (None, None)
+
+    def set_sync_state(self, repo, kind, watermark):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                (repo, kind, watermark, time.time())
+            )
+
+    def touch_sync_state(self, repo, kinds):
+        """Mark kinds of an already synced repo as fresh without moving their watermarks; returns rows touched.
+
+        Used when a webhook delivered the repo's latest changes of those kinds,
+        so the next refresh can skip them. Repos never synced are left alone,
+        since webhooks only carry new activity.
+        """
+        kinds = list(kinds)
+        with self.lock:
+            return self.conn.execute(
+                f"UPDATE sync_state SET synced_at = ? WHERE repo = ? AND kind IN ({', '.join('?' * len(kinds))})",
+                (time.time(), repo, *kinds)
+            ).rowcount
+
+    def export(self, path):
+        """Write a consistent copy of the index to path (used to build bundled snapshots)"""
+        with self.lock:
+            target = sqlite3.connect(path)
+            try:
+                self.conn.backup(target)
+            finally:
+                target.close()
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_index(workspace):
+    """Open the index for a workspace, seeding /tmp from the bundled snapshot on cold start"""
+    global _index
+    if _index is not None:
+        return _index
+
+    with _index_lock:
+        if _index is None:
+            if not os.path.exists(XREF_INDEX_PATH) and XREF_INDEX_SNAPSHOT and os.path.exists(XREF_INDEX_SNAPSHOT):
+                shutil.copyfile(XREF_INDEX_SNAPSHOT, XREF_INDEX_PATH)
+            _index = XrefIndex(XREF_INDEX_PATH, workspace)
+    return _index
+
+if __name__ == "__main__":
+    # Build a snapshot to bundle with the deployment:
+    #   python3 xref_index.py build-snapshot xref_index.snapshot.sqlite3
+    if len(sys.argv) != 3 or sys.argv[1] != "build-snapshot":
+        print("Usage: python3 xref_index.py build-snapshot OUTPUT_PATH")
+        sys.exit(1)
+
+    import lambda_handler
+
+    index = get_index(lambda_handler.BITBUCKET_WORKSPACE)
+    synced = lambda_handler.refresh_xref_index(index, max_age=0)
+    index.export(sys.argv[2])
+    print(f"✅ Indexed {synced.completed} repositories into {sys.argv[2]}")